@@ -1,6 +1,7 @@
 // frontend/src/api/pullingApi.js
 
 import axios from 'axios'
+import { guardarResultado, obtenerResultado } from './resultadosLocales'
 
 // Base URL según entorno (define VITE_API_URL en .env para producción)
 const api = axios.create({
@@ -8,11 +9,82 @@ const api = axios.create({
 })
 
 /**
- * Sube el Excel y recibe el JSON con el programa de maniobras.
+ * SHA-256 del contenido del archivo en hexadecimal (el mismo que usa el
+ * backend como clave), o null si el navegador no tiene Web Crypto
+ * (p. ej. página servida por http fuera de localhost).
+ * @param {File} file
+ */
+export async function hashFile(file) {
+  if (!globalThis.crypto?.subtle) return null
+  const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer())
+  return Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, '0')).join('')
+}
+
+// Versión de reglas y modelo con la que el backend calcula hoy los resultados
+const VERSION = 'x-version-reglas'
+
+/**
+ * HEAD /process/{sha256}: si el backend tiene el resultado y con qué versión
+ * de reglas calcularía hoy ese archivo (el header viene también en el 404).
+ */
+async function estadoEnBackend(hash) {
+  try {
+    const resp = await api.head(`/process/${hash}`)
+    return { disponible: true, version: resp.headers[VERSION] }
+  } catch (err) {
+    if (err.response?.status === 404) {
+      return { disponible: false, version: err.response.headers[VERSION] }
+    }
+    throw err
+  }
+}
+
+/**
+ * Respuesta con el resultado ya calculado por el backend para ese hash, o
+ * null si hay que subir el archivo (404).
+ */
+async function resultadoPorHash(hash) {
+  try {
+    return await api.get(`/process/${hash}`)
+  } catch (err) {
+    if (err.response?.status === 404) return null
+    throw err
+  }
+}
+
+/**
+ * Genera el programa de maniobras evitando subir el Excel si ya se procesó:
+ * 1) hash local del archivo (Web Crypto)
+ * 2) resultado guardado en el navegador (IndexedDB), solo si HEAD
+ *    /process/{sha256} confirma que el backend sigue con la misma versión
+ *    de reglas y modelo (si cambió, el programa guardado está desactualizado)
+ * 3) resultado en el backend por hash (GET /process/{sha256})
+ * 4) recién si no está, sube el archivo a /process/
  * @param {File} file – objeto File del input
+ * @param {(etapa: string) => void} [onEtapa] – avisa en qué paso está
  * @returns {Promise<Array>} – array de maniobras
  */
-export async function generateProgram(file) {
+export async function generateProgram(file, onEtapa = () => {}) {
+  onEtapa('hash')
+  const hash = await hashFile(file).catch(() => null)
+
+  if (hash) {
+    const local = await obtenerResultado(hash)
+    onEtapa('consulta')
+    let disponible = true
+    if (local) {
+      const backend = await estadoEnBackend(hash)
+      if (backend.version && backend.version === local.version) return local.resultado.program
+      disponible = backend.disponible
+    }
+    const remoto = disponible ? await resultadoPorHash(hash) : null
+    if (remoto) {
+      await guardarResultado(hash, remoto.data, remoto.headers[VERSION])
+      return remoto.data.program
+    }
+  }
+
+  onEtapa('subida')
   const formData = new FormData()
   formData.append('file', file)
 
@@ -20,5 +92,7 @@ export async function generateProgram(file) {
     headers: { 'Content-Type': 'multipart/form-data' },
   })
 
+  const clave = hash || resp.headers['x-resultado-id']
+  if (clave) await guardarResultado(clave, resp.data, resp.headers[VERSION])
   return resp.data.program
 }
@@ -0,0 +1,99 @@
+// frontend/src/api/resultadosLocales.js
+
+// Resultados recientes de /process/ guardados en IndexedDB, por SHA-256
+// del archivo, con la versión de reglas/modelo con la que se calcularon
+// (header X-Version-Reglas). Si el navegador no tiene IndexedDB (o falla),
+// todo sigue funcionando sin caché local.
+
+const DB = 'pulling'
+const STORE = 'resultados'
+const MAX_ENTRADAS = 20
+const TTL_MS = 24 * 60 * 60 * 1000
+
+let conexion = null
+
+function abrir() {
+  if (!conexion) {
+    conexion = new Promise((resolve, reject) => {
+      if (typeof indexedDB === 'undefined') {
+        reject(new Error('IndexedDB no disponible'))
+        return
+      }
+      const req = indexedDB.open(DB, 1)
+      req.onupgradeneeded = () => {
+        const store = req.result.createObjectStore(STORE, { keyPath: 'hash' })
+        store.createIndex('usado', 'usado')
+      }
+      req.onsuccess = () => resolve(req.result)
+      req.onerror = () => reject(req.error)
+    })
+    conexion.catch(() => { conexion = null })
+  }
+  return conexion
+}
+
+function completar(tx) {
+  return new Promise((resolve, reject) => {
+    tx.oncomplete = () => resolve()
+    tx.onerror = () => reject(tx.error)
+    tx.onabort = () => reject(tx.error)
+  })
+}
+
+/**
+ * { resultado, version } guardado para el hash, o null si no está o venció.
+ * Quien lo usa debe comparar `version` con la vigente en el backend.
+ * @param {string} hash – SHA-256 del archivo en hexadecimal
+ */
+export async function obtenerResultado(hash) {
+  try {
+    const db = await abrir()
+    const tx = db.transaction(STORE, 'readwrite')
+    const store = tx.objectStore(STORE)
+    const entrada = await new Promise((resolve, reject) => {
+      const req = store.get(hash)
+      req.onsuccess = () => resolve(req.result)
+      req.onerror = () => reject(req.error)
+    })
+    let resultado = null
+    if (entrada && Date.now() - entrada.guardado < TTL_MS) {
+      entrada.usado = Date.now()
+      store.put(entrada)
+      resultado = { resultado: entrada.resultado, version: entrada.version }
+    } else if (entrada) {
+      store.delete(hash)
+    }
+    await completar(tx)
+    return resultado
+  } catch (err) {
+    console.warn('Caché local no disponible:', err)
+    return null
+  }
+}
+
+/**
+ * Guarda el resultado (con la versión de reglas que lo generó) y deja solo
+ * las MAX_ENTRADAS usadas más recientemente.
+ */
+export async function guardarResultado(hash, resultado, version) {
+  try {
+    const db = await abrir()
+    const tx = db.transaction(STORE, 'readwrite')
+    const store = tx.objectStore(STORE)
+    const ahora = Date.now()
+    store.put({ hash, resultado, version, guardado: ahora, usado: ahora })
+
+    // Recorre de la más nueva a la más vieja y borra las que sobran
+    let vistas = 0
+    store.index('usado').openCursor(null, 'prev').onsuccess = (e) => {
+      const cursor = e.target.result
+      if (!cursor) return
+      vistas += 1
+      if (vistas > MAX_ENTRADAS) cursor.delete()
+      cursor.continue()
+    }
+    await completar(tx)
+  } catch (err) {
+    console.warn('No se pudo guardar el resultado local:', err)
+  }
+}
@@ -4,10 +4,18 @@ import React, { useState } from 'react'
 import { generateProgram } from '../api/pullingApi'
 import ProgramTable from './ProgramTable'
 
+// Texto del botón según el paso de generateProgram
+const ETAPAS = {
+  hash: 'Leyendo archivo…',
+  consulta: 'Buscando resultado…',
+  subida: 'Subiendo y generando…',
+}
+
 export default function UploadForm() {
   const [file, setFile] = useState(null)
   const [program, setProgram] = useState([])
   const [loading, setLoading] = useState(false)
+  const [etapa, setEtapa] = useState('')
   const [error, setError] = useState('')
 
   const handleFileChange = (e) => {
@@ -26,7 +34,7 @@ export default function UploadForm() {
     setError('')
 
     try {
-      const result = await generateProgram(file)
+      const result = await generateProgram(file, setEtapa)
       setProgram(result)
     } catch (err) {
       console.error(err)
@@ -36,6 +44,7 @@ export default function UploadForm() {
       )
     } finally {
       setLoading(false)
+      setEtapa('')
     }
   }
 
@@ -53,7 +62,7 @@ export default function UploadForm() {
           disabled={loading}
           className="bg-indigo-600 text-white rounded px-4 py-2 hover:bg-indigo-700 disabled:opacity-50"
         >
-          {loading ? 'Generando…' : 'Generar Programa'}
+          {loading ? (ETAPAS[etapa] || 'Generando…') : 'Generar Programa'}
         </button>
       </form>
 
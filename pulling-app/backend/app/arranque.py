@@ -0,0 +1,153 @@
+# pulling-app/backend/app/arranque.py
+
+import importlib
+import os
+import sys
+import threading
+import time
+
+from . import config
+
+# Momento en que se empezó a importar la app (primer módulo de app.* cargado)
+T_IMPORT = time.perf_counter()
+_RELOJ_IMPORT = time.time()
+
+# Módulos pesados en orden de dependencia: cada tiempo medido es el
+# incremental (lo que ya cargó el anterior no se vuelve a contar)
+MODULOS_PESADOS = (
+    "numpy",
+    "app.rules.ancla",
+    "pandas",
+    "openpyxl",
+    "app.respuestas",
+    "app.validacion",
+    "app.rules.pipeline",
+    "app.rules.duracion",
+    "app.reevaluacion",
+    "app.processing",
+    "app.batch",
+    "app.exportar",
+)
+
+_lock = threading.RLock()
+_cargas = {}            # módulo → {"seg", "origen", "thread"}
+_listo_seg = None       # desde T_IMPORT hasta el startup de la app
+_precalentado = None    # {"inicio_seg", "duracion_seg"} del thread de precalentamiento
+_primer_request = None
+
+
+def _inicio_proceso():
+    """
+    Epoch en que arrancó el proceso (Linux: /proc), para medir también
+    el intérprete y uvicorn. None si no se puede saber.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            campos = f.read().rsplit(")", 1)[1].split()
+        ticks = int(campos[19])   # starttime: campo 22 del stat
+        with open("/proc/stat") as f:
+            btime = next(int(l.split()[1]) for l in f if l.startswith("btime"))
+        return btime + ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, StopIteration, AttributeError):
+        return None
+
+
+_INICIO_PROCESO = _inicio_proceso()
+
+
+def cargar(nombre: str, origen: str = "primer_uso"):
+    """Importa un módulo registrando cuánto tardó y quién lo cargó."""
+    modulo = sys.modules.get(nombre)
+    if modulo is not None and nombre in _cargas:
+        return modulo
+    with _lock:
+        if nombre not in _cargas:
+            ya_cargado = nombre in sys.modules
+            t0 = time.perf_counter()
+            modulo = importlib.import_module(nombre)
+            _cargas[nombre] = {
+                "seg": 0.0 if ya_cargado else round(time.perf_counter() - t0, 4),
+                "origen": "ya_importado" if ya_cargado else origen,
+                "thread": threading.current_thread().name,
+            }
+        return sys.modules[nombre]
+
+
+def cargar_todo(origen: str) -> None:
+    for nombre in MODULOS_PESADOS:
+        cargar(nombre, origen)
+
+
+class Perezoso:
+    """
+    Módulo que se importa en el primer acceso a un atributo.
+    `processing = Perezoso("app.processing")` → `processing.procesar_excel`.
+    """
+
+    def __init__(self, nombre: str):
+        self._nombre = nombre
+        self._modulo = None
+
+    def __getattr__(self, atributo):
+        if self._modulo is None:
+            # Cargar dependencias pesadas primero para registrar sus tiempos
+            for nombre in MODULOS_PESADOS:
+                cargar(nombre)
+                if nombre == self._nombre:
+                    break
+            self._modulo = cargar(self._nombre)
+        return getattr(self._modulo, atributo)
+
+
+def marcar_listo() -> None:
+    global _listo_seg
+    _listo_seg = time.perf_counter() - T_IMPORT
+
+
+def precalentar() -> None:
+    """Importa los módulos pesados en segundo plano (modo 'precalentar')."""
+    global _precalentado
+    t0 = time.perf_counter()
+    try:
+        cargar_todo("precalentar")
+    except Exception as e:
+        print(f"ERROR al precalentar módulos: {e}", file=sys.stderr)
+    _precalentado = {
+        "inicio_seg": round(t0 - T_IMPORT, 4),
+        "duracion_seg": round(time.perf_counter() - t0, 4),
+    }
+
+
+def iniciar_precalentamiento() -> None:
+    if config.ARRANQUE == "precalentar":
+        threading.Thread(target=precalentar, name="precalentar", daemon=True).start()
+
+
+def marcar_request(endpoint: str, inicio: float) -> None:
+    """Registra el primer request atendido (llegada y duración)."""
+    global _primer_request
+    if _primer_request is not None:
+        return
+    fin = time.perf_counter()
+    _primer_request = {
+        "endpoint": endpoint,
+        "desde_import_seg": round(inicio - T_IMPORT, 4),
+        "duracion_seg": round(fin - inicio, 4),
+    }
+    if _INICIO_PROCESO is not None:
+        _primer_request["desde_proceso_seg"] = round(
+            _RELOJ_IMPORT + (fin - T_IMPORT) - _INICIO_PROCESO, 4)
+
+
+def reporte() -> dict:
+    return {
+        "modo": config.ARRANQUE,
+        "proceso_a_import_seg": (
+            round(_RELOJ_IMPORT - _INICIO_PROCESO, 4) if _INICIO_PROCESO is not None else None
+        ),
+        "hasta_listo_seg": round(_listo_seg, 4) if _listo_seg is not None else None,
+        "modulos": [{"modulo": n, **d} for n, d in _cargas.items()],
+        "pendientes": [n for n in MODULOS_PESADOS if n not in _cargas],
+        "precalentado": _precalentado,
+        "primer_request": _primer_request,
+    }
@@ -0,0 +1,209 @@
+# pulling-app/backend/app/batch.py
+
+import asyncio
+import io
+import json
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from . import config
+from .cache import VERSION_REGLAS, cache, clave_cache, hash_contenido
+from .processing import EXTENSIONES_EXCEL, procesar_archivo
+from .programas import guardar_desde_cache
+
+_pool = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Pool de procesos compartido, creado en el primer lote."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=config.BATCH_WORKERS)
+    return _pool
+
+
+def cerrar_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def reiniciar_pool(roto: ProcessPoolExecutor) -> None:
+    """
+    Descarta un pool roto (un worker murió: falta de memoria, crash de
+    openpyxl); el próximo get_pool crea otro. Si ya se reemplazó, no hace nada.
+    """
+    if _pool is roto:
+        cerrar_pool()
+
+
+def enviar(nombre: str, datos: bytes, sha256: str) -> tuple:
+    """(pool, futuro) de procesar_archivo; si el pool estaba roto, se reemplaza."""
+    pool = get_pool()
+    try:
+        return pool, pool.submit(procesar_archivo, nombre, datos, sha256)
+    except BrokenProcessPool:
+        reiniciar_pool(pool)
+        pool = get_pool()
+        return pool, pool.submit(procesar_archivo, nombre, datos, sha256)
+
+
+def resultado_caido(nombre: str) -> dict:
+    """Resultado de un archivo cuyo worker murió mientras lo procesaba."""
+    return {"archivo": nombre, "ok": False,
+            "error": "El proceso que leía el archivo terminó inesperadamente (memoria o archivo dañado)."}
+
+
+class LoteDemasiadoGrande(ValueError):
+    """El contenido descomprimido del lote supera LOTE_DESCOMPRIMIDO_MAX_BYTES."""
+
+
+def _tamano(n: int) -> str:
+    return f"{n / 1024 ** 2:g} MB"
+
+
+def _bytes(fuente) -> bytes:
+    if isinstance(fuente, (bytes, bytearray)):
+        return bytes(fuente)
+    fuente.seek(0)
+    return fuente.read()
+
+
+def expandir_archivos(nombre: str, fuente, disponible: int = None):
+    """
+    Devuelve los (nombre, bytes) de Excel contenidos en un upload (`fuente`:
+    bytes o archivo abierto; un ZIP se lee sin cargarlo entero a memoria):
+    el propio archivo, o cada miembro Excel si es un ZIP.
+    Los problemas de un archivo se devuelven como (nombre, error) con error str.
+    Cada miembro se descomprime con lectura acotada (el tamaño declarado en
+    el ZIP puede mentir): uno de más de LOTE_MIEMBRO_MAX_BYTES queda como
+    error y, si el total supera `disponible` bytes, lanza LoteDemasiadoGrande.
+    """
+    if not nombre.lower().endswith(".zip"):
+        if nombre.lower().endswith(EXTENSIONES_EXCEL):
+            return [(nombre, _bytes(fuente))]
+        return [(nombre, "Formato inválido: se requiere un archivo Excel (.xls/.xlsx/.xlsm) o .zip.")]
+
+    if disponible is None:
+        disponible = config.LOTE_DESCOMPRIMIDO_MAX_BYTES
+    maximo = config.LOTE_MIEMBRO_MAX_BYTES
+    try:
+        if isinstance(fuente, (bytes, bytearray)):
+            fuente = io.BytesIO(fuente)
+        fuente.seek(0)
+        zf = zipfile.ZipFile(fuente)
+    except zipfile.BadZipFile:
+        return [(nombre, "No pude abrir el ZIP.")]
+
+    archivos = []
+    with zf:
+        for info in zf.infolist():
+            miembro = info.filename
+            base = miembro.rsplit("/", 1)[-1]
+            if info.is_dir() or miembro.startswith("__MACOSX/") or base.startswith("~$"):
+                continue
+            if not miembro.lower().endswith(EXTENSIONES_EXCEL):
+                continue
+            ruta = f"{nombre}/{miembro}"
+            if info.file_size > maximo:
+                archivos.append((ruta, f"Archivo demasiado grande dentro del ZIP: el máximo es {_tamano(maximo)}."))
+                continue
+            try:
+                with zf.open(info) as f:
+                    datos = f.read(min(maximo, disponible) + 1)
+            except (zipfile.BadZipFile, NotImplementedError, RuntimeError) as e:
+                archivos.append((ruta, f"No pude descomprimir el archivo: {e}"))
+                continue
+            if len(datos) > disponible:
+                raise LoteDemasiadoGrande(
+                    f"El lote descomprimido supera el máximo de {_tamano(config.LOTE_DESCOMPRIMIDO_MAX_BYTES)}.")
+            if len(datos) > maximo:
+                archivos.append((ruta, f"Archivo demasiado grande dentro del ZIP: el máximo es {_tamano(maximo)}."))
+                continue
+            disponible -= len(datos)
+            archivos.append((ruta, datos))
+    if not archivos:
+        return [(nombre, "El ZIP no contiene archivos Excel.")]
+    return archivos
+
+
+def expandir_uploads(uploads: list) -> list:
+    """
+    expandir_archivos de cada (nombre, bytes | archivo) de un request, con
+    un solo tope de bytes descomprimidos para todos. Lanza LoteDemasiadoGrande.
+    """
+    disponible = config.LOTE_DESCOMPRIMIDO_MAX_BYTES
+    archivos = []
+    for nombre, fuente in uploads:
+        nuevos = expandir_archivos(nombre, fuente, disponible)
+        if nombre.lower().endswith(".zip"):
+            disponible -= sum(len(d) for _, d in nuevos if not isinstance(d, str))
+        archivos += nuevos
+    return archivos
+
+
+def _linea(archivo: str, cuerpo: bytes = None, error: str = None,
+           cache_hit: bool = False) -> bytes:
+    """Una línea NDJSON; el resultado ya serializado se inserta sin re-codificar."""
+    if cuerpo is None:
+        linea = {"archivo": archivo, "ok": False, "error": error}
+        return json.dumps(linea, ensure_ascii=False).encode("utf-8") + b"\n"
+    linea = {"archivo": archivo, "ok": True, "cache": cache_hit}
+    cabecera = json.dumps(linea, ensure_ascii=False).encode("utf-8")
+    return cabecera[:-1] + b', "resultado": ' + cuerpo + b"}\n"
+
+
+def buscar_en_cache(nombre: str, datos: bytes) -> tuple:
+    """
+    (sha256, clave de caché, resultado en caché o None) de un archivo del
+    lote; un resultado en caché que falta en el almacén de programas se guarda.
+    """
+    sha = hash_contenido(datos)
+    clave = clave_cache(sha)
+    cuerpo = cache.get(clave)
+    if cuerpo is not None:
+        guardar_desde_cache(clave, sha, nombre, VERSION_REGLAS, cuerpo)
+    return sha, clave, cuerpo
+
+
+async def procesar_lote(archivos: list):
+    """
+    Generador asíncrono de líneas NDJSON: reparte los archivos en el pool
+    de procesos y emite cada resultado apenas termina (orden de llegada).
+    Si un worker muere, los archivos que estaban en ese pool salen con error
+    y el pool se reemplaza. Si el cliente corta, se cancela lo pendiente.
+    """
+    loop = asyncio.get_running_loop()
+    en_vuelo = {}   # futuro → (nombre, clave, pool)
+
+    try:
+        for nombre, datos in archivos:
+            if isinstance(datos, str):
+                yield _linea(nombre, error=datos)
+                continue
+            sha, clave, cuerpo = await loop.run_in_executor(None, buscar_en_cache, nombre, datos)
+            if cuerpo is not None:
+                yield _linea(nombre, cuerpo=cuerpo, cache_hit=True)
+                continue
+            pool, fut = enviar(nombre, datos, sha)
+            en_vuelo[asyncio.wrap_future(fut)] = (nombre, clave, pool)
+
+        while en_vuelo:
+            listos, _ = await asyncio.wait(en_vuelo, return_when=asyncio.FIRST_COMPLETED)
+            for fut in listos:
+                nombre, clave, pool = en_vuelo.pop(fut)
+                try:
+                    r = fut.result()
+                except BrokenProcessPool:
+                    reiniciar_pool(pool)
+                    r = resultado_caido(nombre)
+                if r["ok"]:
+                    await loop.run_in_executor(None, cache.put, clave, r["cuerpo"])
+                    yield _linea(r["archivo"], cuerpo=r["cuerpo"])
+                else:
+                    yield _linea(r["archivo"], error=r["error"])
+    finally:
+        for fut in en_vuelo:
+            fut.cancel()
@@ -0,0 +1,252 @@
+# pulling-app/backend/app/cache.py
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from . import config
+
+_APP_DIR = Path(__file__).resolve().parent
+
+
+def _huella_reglas() -> str:
+    """
+    Huella de la versión de reglas: hash del código que transforma el Excel
+    en resultado (lector, layouts de template, pre-chequeo, procesamiento,
+    serialización y app/rules/*). Si cambia cualquiera, cambian las claves y
+    los resultados viejos dejan de usarse.
+    """
+    h = hashlib.sha256()
+    fuentes = [_APP_DIR / nombre for nombre in (
+        "datasheet.py", "plantillas.py", "validacion.py", "processing.py", "respuestas.py")]
+    fuentes += sorted((_APP_DIR / "rules").glob("*.py"))
+    for ruta in fuentes:
+        h.update(ruta.name.encode("utf-8"))
+        h.update(ruta.read_bytes())
+    return h.hexdigest()[:16]
+
+
+VERSION_REGLAS = _huella_reglas()
+
+
+def hash_contenido(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def hash_archivo(f) -> str:
+    """SHA-256 de un archivo abierto, leído por trozos; deja el puntero al inicio."""
+    f.seek(0)
+    h = hashlib.sha256()
+    for trozo in iter(lambda: f.read(1024 * 1024), b""):
+        h.update(trozo)
+    f.seek(0)
+    return h.hexdigest()
+
+
+def huella_modelo() -> str:
+    """
+    Identidad del artefacto del modelo de duración (mtime y tamaño): si se
+    reemplaza el modelo, cambian las claves. "0" si no hay modelo.
+    """
+    if not config.MODELO_DURACION:
+        return "0"
+    try:
+        st = os.stat(config.MODELO_DURACION)
+    except OSError:
+        return "0"
+    return f"{st.st_mtime_ns:x}{st.st_size:x}"
+
+
+def version_resultados() -> str:
+    """
+    Versión de reglas + modelo de duración vigentes (header X-Version-Reglas):
+    un resultado guardado con otra versión ya no es el que se calcularía hoy.
+    """
+    return f"{VERSION_REGLAS}-{huella_modelo()}"
+
+
+def clave_cache(sha256: str, version: str = None) -> str:
+    """Clave = SHA-256 del archivo subido + versión de reglas + modelo de duración."""
+    return f"{sha256}-{version or version_resultados()}"
+
+
+class ResultCache:
+    """
+    Caché de resultados serializados (JSON en bytes) en dos niveles:
+    – memoria: LRU acotada por cantidad de entradas, por bytes totales y TTL
+    – disco (opcional): un archivo por clave, sobrevive reinicios; vence a
+      los `disco_ttl_seg` sin usarse y, si pasa de `disco_max_bytes`, se
+      borran los menos usados (la purga corre al guardar, a lo sumo una vez
+      por minuto)
+    """
+
+    def __init__(self, max_entradas: int, ttl_seg: float, directorio=None, max_bytes: int = None,
+                 disco_ttl_seg: float = None, disco_max_bytes: int = None):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.ttl_seg = ttl_seg
+        self.directorio = Path(directorio) if directorio else None
+        if self.directorio:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+        self.disco_ttl_seg = disco_ttl_seg
+        self.disco_max_bytes = disco_max_bytes
+        self._memoria = OrderedDict()   # clave → (expira, bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._purga = threading.Lock()
+        self._purgado = 0.0
+        self.hits = 0
+        self.hits_disco = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expiraciones = 0
+        self.bytes_disco = None         # total en disco en la última purga
+        self.purgados_disco = 0
+
+    def _ruta(self, clave: str) -> Path:
+        return self.directorio / f"{clave}.json"
+
+    def _guardar_memoria(self, clave: str, datos: bytes) -> None:
+        self._quitar_memoria(clave)
+        if self.max_bytes is not None and len(datos) > self.max_bytes:
+            return  # más grande que toda la caché: solo queda en disco
+        self._memoria[clave] = (time.monotonic() + self.ttl_seg, datos)
+        self._bytes += len(datos)
+        while len(self._memoria) > self.max_entradas or (
+                self.max_bytes is not None and self._bytes > self.max_bytes):
+            _, (_, viejo) = self._memoria.popitem(last=False)
+            self._bytes -= len(viejo)
+            self.evictions += 1
+
+    def _quitar_memoria(self, clave: str) -> None:
+        entrada = self._memoria.pop(clave, None)
+        if entrada is not None:
+            self._bytes -= len(entrada[1])
+
+    def _leer_disco(self, clave: str):
+        """Resultado en disco o None; uno vencido se borra. Cada uso renueva su fecha."""
+        ruta = self._ruta(clave)
+        try:
+            if self.disco_ttl_seg and time.time() - ruta.stat().st_mtime > self.disco_ttl_seg:
+                ruta.unlink(missing_ok=True)
+                return None
+            datos = ruta.read_bytes()
+            os.utime(ruta)
+        except FileNotFoundError:
+            return None
+        return datos
+
+    def purgar_disco(self) -> int:
+        """
+        Borra del disco los resultados vencidos y, si el total pasa de
+        disco_max_bytes, los menos usados (fecha de modificación más vieja)
+        hasta quedar por debajo. Devuelve cuántos borró.
+        """
+        if not self.directorio or not self._purga.acquire(blocking=False):
+            return 0
+        try:
+            self._purgado = time.monotonic()
+            limite = time.time() - self.disco_ttl_seg if self.disco_ttl_seg else None
+            archivos, total, borrados = [], 0, 0
+            for ruta in self.directorio.glob("*.json"):
+                try:
+                    st = ruta.stat()
+                    if limite is not None and st.st_mtime < limite:
+                        ruta.unlink(missing_ok=True)
+                        borrados += 1
+                        continue
+                except FileNotFoundError:
+                    continue
+                archivos.append((st.st_mtime, st.st_size, ruta))
+                total += st.st_size
+            if self.disco_max_bytes is not None and total > self.disco_max_bytes:
+                archivos.sort(key=lambda a: a[0])
+                for _, tamano, ruta in archivos:
+                    if total <= self.disco_max_bytes:
+                        break
+                    ruta.unlink(missing_ok=True)
+                    total -= tamano
+                    borrados += 1
+            self.bytes_disco = total
+            self.purgados_disco += borrados
+            return borrados
+        finally:
+            self._purga.release()
+
+    def get(self, clave: str):
+        with self._lock:
+            entrada = self._memoria.get(clave)
+            if entrada is not None:
+                expira, datos = entrada
+                if expira > time.monotonic():
+                    self._memoria.move_to_end(clave)
+                    self.hits += 1
+                    return datos
+                self._quitar_memoria(clave)
+                self.expiraciones += 1
+
+        if self.directorio:
+            datos = self._leer_disco(clave)
+            if datos is not None:
+                with self._lock:
+                    self._guardar_memoria(clave, datos)
+                    self.hits += 1
+                    self.hits_disco += 1
+                return datos
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, clave: str, datos: bytes) -> None:
+        with self._lock:
+            self._guardar_memoria(clave, datos)
+
+        if self.directorio:
+            # Escritura atómica: archivo temporal propio de esta llamada (puede
+            # haber otro thread guardando la misma clave) + rename
+            fd, tmp = tempfile.mkstemp(dir=self.directorio, prefix=f"{clave}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(datos)
+                os.replace(tmp, self._ruta(clave))
+            except Exception:
+                os.remove(tmp)
+                raise
+            if time.monotonic() - self._purgado > 60:
+                self.purgar_disco()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "version_reglas": VERSION_REGLAS,
+                "entradas_memoria": len(self._memoria),
+                "bytes_memoria": self._bytes,
+                "max_entradas": self.max_entradas,
+                "max_bytes": self.max_bytes,
+                "ttl_seg": self.ttl_seg,
+                "disco": str(self.directorio) if self.directorio else None,
+                "bytes_disco": self.bytes_disco,
+                "disco_max_bytes": self.disco_max_bytes,
+                "disco_ttl_seg": self.disco_ttl_seg,
+                "purgados_disco": self.purgados_disco,
+                "hits": self.hits,
+                "hits_disco": self.hits_disco,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expiraciones": self.expiraciones,
+            }
+
+
+cache = ResultCache(
+    max_entradas=config.CACHE_MAX_ENTRADAS,
+    max_bytes=config.CACHE_MAX_BYTES,
+    ttl_seg=config.CACHE_TTL_SEG,
+    directorio=config.CACHE_DIR,
+    disco_ttl_seg=config.CACHE_DISCO_TTL_SEG,
+    disco_max_bytes=config.CACHE_DISCO_MAX_BYTES,
+)
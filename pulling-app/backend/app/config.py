@@ -0,0 +1,87 @@
+# pulling-app/backend/app/config.py
+
+import os
+import tempfile
+
+
+def _env_int(nombre: str, defecto: int) -> int:
+    valor = os.environ.get(nombre)
+    return int(valor) if valor not in (None, "") else defecto
+
+
+def _env_float(nombre: str, defecto: float) -> float:
+    valor = os.environ.get(nombre)
+    return float(valor) if valor not in (None, "") else defecto
+
+
+def _env_str(nombre: str, defecto=None):
+    valor = os.environ.get(nombre)
+    return valor if valor not in (None, "") else defecto
+
+
+# Uploads: hasta UPLOAD_MEMORIA_MAX en memoria, más grandes a un temporal en
+# disco; los requests que superan el máximo reciben 413 mientras suben
+UPLOAD_MEMORIA_MAX = _env_int("PULLING_UPLOAD_MEMORIA_MAX", 1024 * 1024)
+UPLOAD_MAX_BYTES   = _env_int("PULLING_UPLOAD_MAX_BYTES", 25 * 1024 * 1024)
+LOTE_MAX_BYTES     = _env_int("PULLING_LOTE_MAX_BYTES", 500 * 1024 * 1024)
+
+# ZIPs de un lote: tamaño descomprimido máximo de cada Excel y de todo el
+# request (LOTE_MAX_BYTES solo acota lo que se sube, comprimido)
+LOTE_MIEMBRO_MAX_BYTES      = _env_int("PULLING_LOTE_MIEMBRO_MAX_BYTES", UPLOAD_MAX_BYTES)
+LOTE_DESCOMPRIMIDO_MAX_BYTES = _env_int("PULLING_LOTE_DESCOMPRIMIDO_MAX_BYTES", 1024 * 1024 * 1024)
+
+# Pre-chequeo de estructura: tamaño máximo del XML de 'Data Sheet' descomprimido
+HOJA_MAX_BYTES = _env_int("PULLING_HOJA_MAX_BYTES", 50 * 1024 * 1024)
+
+# Caché de resultados por contenido del Excel
+CACHE_MAX_ENTRADAS    = _env_int("PULLING_CACHE_MAX_ENTRADAS", 256)
+CACHE_MAX_BYTES       = _env_int("PULLING_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+CACHE_TTL_SEG         = _env_float("PULLING_CACHE_TTL_SEG", 3600.0)
+CACHE_DIR             = _env_str("PULLING_CACHE_DIR")   # None → sin caché en disco
+CACHE_DISCO_TTL_SEG   = _env_float("PULLING_CACHE_DISCO_TTL_SEG", 30 * 24 * 3600.0)
+CACHE_DISCO_MAX_BYTES = _env_int("PULLING_CACHE_DISCO_MAX_BYTES", 2 * 1024 * 1024 * 1024)
+
+# Modelo de duración de maniobras (artefacto joblib); sin él, el campo
+# "tiempo" se estima con reglas fijas (ver app/rules/duracion.py)
+MODELO_DURACION = _env_str("PULLING_MODELO_DURACION")
+
+# Corpus de datasheets parseados para reproducir reglas (python -m app.replay)
+CORPUS_DIR = _env_str("PULLING_CORPUS_DIR")   # None → no se guardan snapshots
+
+# Programas generados, consultables por pozo/batería/equipo (/programs).
+# Opcional (guarda el cuerpo de cada programa): None → no se guardan. Los
+# programas más viejos que PROGRAMAS_TTL_SEG se borran
+PROGRAMAS_DB      = _env_str("PULLING_PROGRAMAS_DB")
+PROGRAMAS_TTL_SEG = _env_float("PULLING_PROGRAMAS_TTL_SEG", 90 * 24 * 3600.0)
+
+# Estados evaluados que se conservan para /reevaluar (LRU en memoria)
+REEVAL_MAX_ESTADOS = _env_int("PULLING_REEVAL_MAX_ESTADOS", 128)
+
+# Plan de equipos: horas de traslado entre pozos de la misma batería o de otra
+TRANSPORTE_MISMA_BATERIA_H = _env_float("PULLING_TRANSPORTE_MISMA_BATERIA_H", 1.0)
+TRANSPORTE_OTRA_BATERIA_H  = _env_float("PULLING_TRANSPORTE_OTRA_BATERIA_H", 4.0)
+
+# Procesamiento en lote (/process/batch)
+BATCH_WORKERS = _env_int("PULLING_BATCH_WORKERS", os.cpu_count() or 1)
+
+# Trabajos asíncronos (/jobs): cola persistente en SQLite y workers que la consumen
+JOBS_DB      = _env_str("PULLING_JOBS_DB", os.path.join(tempfile.gettempdir(), "pulling-jobs.sqlite3"))
+JOBS_WORKERS = _env_int("PULLING_JOBS_WORKERS", 2)
+JOBS_TTL_SEG = _env_float("PULLING_JOBS_TTL_SEG", 24 * 3600.0)
+# Un trabajo en curso sin novedades (resultado o latido) hace JOBS_LEASE_SEG
+# se da por abandonado y otro worker lo retoma; después de JOBS_MAX_INTENTOS
+# tomas queda fallido (p. ej. un archivo que tumba el proceso)
+JOBS_LEASE_SEG     = _env_float("PULLING_JOBS_LEASE_SEG", 60.0)
+JOBS_MAX_INTENTOS  = _env_int("PULLING_JOBS_MAX_INTENTOS", 3)
+
+# Ejecutor acotado para el parseo de /process/ (fuera del event loop)
+PARSE_CONCURRENCIA = _env_int("PULLING_PARSE_CONCURRENCIA", 2)
+PARSE_MAX_COLA     = _env_int("PULLING_PARSE_MAX_COLA", 8)
+PARSE_RETRY_AFTER  = _env_int("PULLING_PARSE_RETRY_AFTER", 5)
+
+# Arranque: "precalentar" (importa pandas/openpyxl/reglas en segundo plano
+# apenas arranca), "diferido" (en el primer request) o "inmediato" (al importar)
+ARRANQUE = _env_str("PULLING_ARRANQUE", "precalentar")
+
+# Observabilidad: una línea JSON por request en stderr
+LOG_JSON = bool(_env_int("PULLING_LOG_JSON", 0))
@@ -0,0 +1,145 @@
+# pulling-app/backend/app/corpus.py
+
+import datetime as dt
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from . import config
+from .cache import VERSION_REGLAS
+from .datasheet import TABLAS
+from .rules.catalogo import a_dicts
+
+FORMATO = 1
+
+
+def _codificar(obj):
+    """Tipos de celda que JSON no tiene: fechas y horas (se marcan para volver igual)."""
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, (pd.Timestamp, dt.datetime)):
+        return {"$fecha": obj.isoformat()}
+    if isinstance(obj, dt.date):
+        return {"$dia": obj.isoformat()}
+    if isinstance(obj, dt.time):
+        return {"$hora": obj.isoformat()}
+    if hasattr(obj, "item"):   # escalares numpy
+        return obj.item()
+    raise TypeError(f"Tipo no soportado en snapshot: {type(obj).__name__}")
+
+
+def _decodificar(obj: dict):
+    if len(obj) == 1:
+        if "$fecha" in obj:
+            return dt.datetime.fromisoformat(obj["$fecha"])
+        if "$dia" in obj:
+            return dt.date.fromisoformat(obj["$dia"])
+        if "$hora" in obj:
+            return dt.time.fromisoformat(obj["$hora"])
+    return obj
+
+
+def a_snapshot(resultado: dict, sha256: str, archivo: str = None) -> bytes:
+    """
+    Snapshot columnar de un datasheet ya parseado: metadatos, las 4 tablas
+    como listas por columna y el programa generado con la versión de reglas
+    actual (para detectar cambios al reproducir). JSON comprimido con gzip.
+    """
+    tablas = {
+        nombre: {
+            "columnas": list(resultado[nombre].columns),
+            "valores": [resultado[nombre][c].tolist() for c in resultado[nombre].columns],
+        }
+        for nombre in TABLAS
+    }
+    snapshot = {
+        "formato": FORMATO,
+        "sha256": sha256,
+        "archivo": archivo,
+        "guardado": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "version_reglas": VERSION_REGLAS,
+        "metadatos": resultado["metadatos"],
+        "tablas": tablas,
+        "program": a_dicts(resultado["program"]),
+    }
+    # NaN se guarda tal cual (json de Python lo lee de vuelta como float nan)
+    datos = json.dumps(snapshot, ensure_ascii=False, default=_codificar).encode("utf-8")
+    return gzip.compress(datos, compresslevel=6)
+
+
+def de_snapshot(data: bytes) -> dict:
+    """
+    Reconstruye un snapshot: mismas claves que read_datasheet ("metadatos" y
+    las tablas como DataFrame, armadas igual que slice_table) más "archivo",
+    "sha256", "version_reglas" y "program" (lista de dicts guardada).
+    """
+    snapshot = json.loads(gzip.decompress(data), object_hook=_decodificar)
+    if snapshot.get("formato") != FORMATO:
+        raise ValueError(f"Formato de snapshot no soportado: {snapshot.get('formato')}")
+    datos = {k: snapshot[k] for k in ("metadatos", "archivo", "sha256", "version_reglas", "program")}
+    for nombre, tabla in snapshot["tablas"].items():
+        filas = [list(fila) for fila in zip(*tabla["valores"])]
+        datos[nombre] = pd.DataFrame(filas, columns=tabla["columnas"]).infer_objects()
+    return datos
+
+
+class CorpusStore:
+    """
+    Corpus de datasheets parseados, un snapshot por hash de contenido:
+    <directorio>/<sha[:2]>/<sha>.json.gz. Se escribe una sola vez por
+    archivo; reproducirlo no requiere volver a leer el Excel.
+    """
+
+    def __init__(self, directorio):
+        self.directorio = Path(directorio)
+        self.directorio.mkdir(parents=True, exist_ok=True)
+
+    def ruta(self, sha256: str) -> Path:
+        return self.directorio / sha256[:2] / f"{sha256}.json.gz"
+
+    def existe(self, sha256: str) -> bool:
+        return self.ruta(sha256).exists()
+
+    def guardar(self, sha256: str, resultado: dict, archivo: str = None, reemplazar: bool = False) -> None:
+        ruta = self.ruta(sha256)
+        if ruta.exists() and not reemplazar:
+            return
+        ruta.parent.mkdir(exist_ok=True)
+        # Escritura atómica: archivo temporal propio de esta llamada (puede
+        # haber otro thread guardando el mismo sha) + rename
+        fd, tmp = tempfile.mkstemp(dir=ruta.parent, prefix=f"{sha256}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(a_snapshot(resultado, sha256, archivo))
+            os.replace(tmp, ruta)
+        except Exception:
+            os.remove(tmp)
+            raise
+
+    def cargar(self, sha256: str) -> dict:
+        return de_snapshot(self.ruta(sha256).read_bytes())
+
+    def claves(self) -> list:
+        return sorted(p.name[:-len(".json.gz")] for p in self.directorio.glob("*/*.json.gz"))
+
+    def __len__(self) -> int:
+        return len(self.claves())
+
+
+corpus = CorpusStore(config.CORPUS_DIR) if config.CORPUS_DIR else None
+
+
+def guardar_snapshot(sha256: str, resultado: dict, archivo: str = None) -> None:
+    """Guarda el snapshot si el corpus está habilitado; un error no corta el request."""
+    if corpus is None or sha256 is None:
+        return
+    try:
+        corpus.guardar(sha256, resultado, archivo)
+    except Exception as e:
+        print(f"ERROR al guardar snapshot {sha256[:12]}: {e}", file=sys.stderr)
@@ -0,0 +1,191 @@
+# pulling-app/backend/app/datasheet.py
+
+import io
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from .metricas import etapa
+from .plantillas import CachePlantillas
+
+HOJA = "Data Sheet"
+
+# Bloques de tablas: (fila_ini, fila_fin, col_ini, col_fin, columnas)
+# Índices 0-based, fin excluyente (mismo criterio que df.iloc)
+TABLAS = {
+    "tubing_actual": (
+        31, 54, 3, 8,
+        ["ELEMENTO","DIÁMETRO","PROFUNDIDAD","CANTIDAD","COMENTARIO"]
+    ),
+    "tubing_final": (
+        31, 54, 10, 17,
+        [
+            "ELEMENTO","CONDICIÓN","DIÁMETRO","PROFUNDIDAD",
+            "CANTIDAD","COMENTARIO","LONGITUD ELEMENTO"
+        ]
+    ),
+    "varillas_actual": (
+        55, 78, 3, 8,
+        ["ELEMENTO","DIÁMETRO","PROFUNDIDAD","CANTIDAD","COMENTARIO"]
+    ),
+    "varillas_final": (
+        55, 78, 10, 19,
+        [
+            "ELEMENTO","CONDICIÓN","DIÁMETRO","PROFUNDIDAD",
+            "ACERO V/B","CUPLA SH/FS","ACERO CUPLA","CANTIDAD","COMENTARIO"
+        ]
+    ),
+}
+
+# Metadatos en celdas fijas (col D=idx3 etiqueta, E=idx4 valor)
+META_POS = {
+    "POZO":               (2, 4),   # D3→E3
+    "BATERIA":            (4, 4),   # D5→E5
+    "EQUIPO":             (6, 4),   # D7→E7
+    "NETA_ASOCIADA":      (8, 4),   # D9→E9
+    "DEFINICION":         (10,4),   # D11→E11
+    "MANIOBRAS_MOTIVO":   (12,4),   # D13→E13
+    "PRIORIDAD_PROGRAMA": (14,4),   # D15→E15
+    "ANTECEDENTE_1":      (17,4),   # D18→E18
+    "ANTECEDENTE_2":      (18,4),
+    "ANTECEDENTE_3":      (19,4),
+    "ANTECEDENTE_4":      (20,4),
+    "REQ_ESP_1":          (22,4),   # D23→E23
+    "REQ_ESP_2":          (23,4),
+    "REQ_ESP_3":          (24,4),
+    "REQ_ESP_4":          (25,4),
+}
+
+# Etiquetas de la columna D del template estándar (a la izquierda de META_POS)
+ETIQUETAS = {
+    "POZO": "POZO",
+    "BATERIA": "BATERÍA",
+    "EQUIPO": "EQUIPO",
+    "NETA_ASOCIADA": "NETA ASOCIADA",
+    "DEFINICION": "DEFINICIÓN",
+    "MANIOBRAS_MOTIVO": "MANIOBRAS (MOTIVO)",
+    "PRIORIDAD_PROGRAMA": "PRIORIDAD PROGRAMA",
+    "ANTECEDENTE_1": "ANTECEDENTES",
+    "REQ_ESP_1": "REQUERIMIENTO ESPECIAL",
+}
+
+# Última fila y columna (excluyentes) que hace falta leer
+MAX_FILA = max(
+    max(t[1] for t in TABLAS.values()),
+    max(r for r, _ in META_POS.values()) + 1,
+)
+MAX_COL = max(
+    max(t[3] for t in TABLAS.values()),
+    max(c for _, c in META_POS.values()) + 1,
+)
+
+# Layouts de template conocidos; el estándar de arriba ya viene cargado y
+# no paga la detección en el primer request
+plantillas = CachePlantillas(TABLAS, META_POS, ETIQUETAS)
+
+
+def _convertir(valor):
+    """
+    Normaliza el valor de una celda como lo hace pandas con openpyxl:
+    floats enteros → int, strings vacíos → None.
+    """
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    if isinstance(valor, str) and valor == "":
+        return None
+    return valor
+
+
+def leer_celdas(fuente, max_fila: int = MAX_FILA, max_col: int = MAX_COL) -> list:
+    """
+    Lee en modo read-only solo el rango A1:S78 (o el pedido) de la hoja
+    'Data Sheet' y devuelve la grilla de valores (lista de filas).
+    `fuente` puede ser bytes o un objeto tipo archivo.
+    """
+    if isinstance(fuente, (bytes, bytearray, memoryview)):
+        fuente = io.BytesIO(fuente)
+    fuente.seek(0)
+
+    try:
+        with etapa("abrir_libro"):
+            wb = load_workbook(fuente, read_only=True, data_only=True, keep_links=False)
+    except Exception as e:
+        raise ValueError(f"No pude abrir el Excel: {e}")
+
+    try:
+        if HOJA not in wb.sheetnames:
+            raise ValueError(f"No encontré la pestaña '{HOJA}' en el Excel.")
+        ws = wb[HOJA]
+        try:
+            with etapa("leer_hoja"):
+                filas = [
+                    [_convertir(v) for v in fila]
+                    for fila in ws.iter_rows(
+                        min_row=1, max_row=max_fila,
+                        min_col=1, max_col=max_col,
+                        values_only=True,
+                    )
+                ]
+        except Exception as e:
+            raise ValueError(f"Error al parsear hoja '{HOJA}': {e}")
+    finally:
+        wb.close()
+
+    # Completar filas/columnas ausentes al final de la hoja
+    for fila in filas:
+        fila.extend([None] * (max_col - len(fila)))
+    filas.extend([[None] * max_col for _ in range(max_fila - len(filas))])
+    return filas
+
+
+def slice_table(celdas: list, r0: int, r1: int, c0: int, c1: int, cols: list) -> pd.DataFrame:
+    """
+    Arma la tabla del bloque [r0:r1, c0:c1] descartando filas sin ELEMENTO.
+    """
+    filas = [fila[c0:c1] for fila in celdas[r0:r1] if fila[c0] is not None]
+    return pd.DataFrame(filas, columns=cols).infer_objects()
+
+
+def ubicar(celdas: list, releer=None) -> tuple:
+    """
+    Layout del template de `celdas`: el ya conocido cuyo encabezado coincide
+    o, si no hay, uno detectado por etiquetas (se guarda para los próximos).
+    `releer(filas, cols)` vuelve a leer la hoja con una ventana más grande
+    cuando la detección no encuentra todo. Devuelve (layout, celdas).
+    """
+    layout = plantillas.buscar(celdas)
+    if layout is not None:
+        return layout, celdas
+    with etapa("detectar_layout"):
+        return plantillas.detectar(celdas, releer)
+
+
+def cortar(celdas: list, layout) -> dict:
+    """Metadatos y tablas de `celdas` según las coordenadas del layout."""
+    resultado = {
+        "metadatos": {key: celdas[r][c] for key, (r, c) in layout.meta.items()},
+    }
+    for nombre, (r0, r1, idx) in layout.tablas.items():
+        cols = TABLAS[nombre][4]
+        if idx[-1] - idx[0] == len(idx) - 1:
+            resultado[nombre] = slice_table(celdas, r0, r1, idx[0], idx[-1] + 1, cols)
+        else:
+            # Columnas no contiguas (template con columnas intercaladas)
+            filas = [[fila[j] for j in idx] for fila in celdas[r0:r1] if fila[idx[0]] is not None]
+            resultado[nombre] = pd.DataFrame(filas, columns=cols).infer_objects()
+    return resultado
+
+
+def read_datasheet(fuente) -> dict:
+    """
+    Lee la pestaña 'Data Sheet' materializando solo los rangos necesarios,
+    ubicados según el layout del template (ver app/plantillas.py).
+    Devuelve {"metadatos": dict, <tabla>: DataFrame, ...}.
+    Lanza ValueError si el Excel no se puede abrir o falta la pestaña.
+    """
+    if isinstance(fuente, (bytes, bytearray, memoryview)):
+        fuente = io.BytesIO(fuente)
+    celdas = leer_celdas(fuente, *plantillas.ventana())
+    layout, celdas = ubicar(celdas, lambda filas, cols: leer_celdas(fuente, filas, cols))
+    with etapa("cortar_tablas"):
+        return cortar(celdas, layout)
@@ -0,0 +1,103 @@
+# pulling-app/backend/app/ejecutor.py
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import config
+
+
+class Saturado(Exception):
+    """No hay lugar en ejecución ni en cola; el cliente debe reintentar."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Servidor saturado, reintentar más tarde.")
+        self.retry_after = retry_after
+
+
+class EjecutorAcotado:
+    """
+    Corre trabajo bloqueante (parseo + reglas) en un pool de threads para
+    no frenar el event loop, con:
+    – a lo sumo `max_concurrencia` tareas ejecutando a la vez
+    – a lo sumo `max_cola` tareas esperando; las demás → Saturado
+    – métricas de espera en cola vs. tiempo de ejecución
+    Los contadores solo se tocan desde el event loop, no necesitan lock.
+    """
+
+    def __init__(self, max_concurrencia: int, max_cola: int, retry_after: int):
+        self.max_concurrencia = max_concurrencia
+        self.max_cola = max_cola
+        self.retry_after = retry_after
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrencia,
+                                        thread_name_prefix="parse")
+        self._semaforo = None
+        self._en_vuelo = 0
+        self._ejecutando = 0
+        self.completadas = 0
+        self.fallidas = 0
+        self.rechazadas = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+        self.ejecucion_total = 0.0
+        self.ejecucion_max = 0.0
+
+    async def ejecutar(self, fn, *args):
+        if self._en_vuelo >= self.max_concurrencia + self.max_cola:
+            self.rechazadas += 1
+            raise Saturado(self.retry_after)
+        if self._semaforo is None:
+            self._semaforo = asyncio.Semaphore(self.max_concurrencia)
+
+        self._en_vuelo += 1
+        t_cola = time.perf_counter()
+        try:
+            async with self._semaforo:
+                t_ini = time.perf_counter()
+                espera = t_ini - t_cola
+                self.espera_total += espera
+                self.espera_max = max(self.espera_max, espera)
+                self._ejecutando += 1
+                try:
+                    ctx = contextvars.copy_context()
+                    loop = asyncio.get_running_loop()
+                    resultado = await loop.run_in_executor(self._pool, ctx.run, fn, *args)
+                except Exception:
+                    self.fallidas += 1
+                    raise
+                finally:
+                    self._ejecutando -= 1
+                    duracion = time.perf_counter() - t_ini
+                    self.ejecucion_total += duracion
+                    self.ejecucion_max = max(self.ejecucion_max, duracion)
+                self.completadas += 1
+                return resultado
+        finally:
+            self._en_vuelo -= 1
+
+    def cerrar(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        terminadas = self.completadas + self.fallidas
+        return {
+            "max_concurrencia": self.max_concurrencia,
+            "max_cola": self.max_cola,
+            "ejecutando": self._ejecutando,
+            "en_cola": self._en_vuelo - self._ejecutando,
+            "completadas": self.completadas,
+            "fallidas": self.fallidas,
+            "rechazadas": self.rechazadas,
+            "espera_prom_seg": self.espera_total / terminadas if terminadas else 0.0,
+            "espera_max_seg": self.espera_max,
+            "ejecucion_prom_seg": self.ejecucion_total / terminadas if terminadas else 0.0,
+            "ejecucion_max_seg": self.ejecucion_max,
+        }
+
+
+ejecutor = EjecutorAcotado(
+    max_concurrencia=config.PARSE_CONCURRENCIA,
+    max_cola=config.PARSE_MAX_COLA,
+    retry_after=config.PARSE_RETRY_AFTER,
+)
@@ -0,0 +1,170 @@
+# pulling-app/backend/app/exportar.py
+
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+# Mismo orden que la tabla del frontend (ProgramTable)
+COLUMNAS = (
+    ("Maniobra", "manobra_normalizada"),
+    ("Punto", "punto_programa"),
+    ("Descripción", "descripcion"),
+    ("Fase", "activity_phase"),
+    ("Código", "activity_code"),
+    ("Subcódigo", "activity_subcode"),
+    ("Tiempo", "tiempo"),
+)
+
+FORMATOS = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv; charset=utf-8",
+}
+
+TROZO = 64 * 1024
+
+
+def encabezado(lote: bool = False) -> list:
+    """Columnas del export; el de lote agrega pozo/archivo adelante y error al final."""
+    columnas = [titulo for titulo, _ in COLUMNAS]
+    return ["Pozo", "Archivo", *columnas, "Error"] if lote else columnas
+
+
+def filas(resultado: dict, archivo: str = None) -> list:
+    """Filas del programa de un resultado de /process/ (ya como dict)."""
+    if archivo is None:
+        return [[p[campo] for _, campo in COLUMNAS] for p in resultado["program"]]
+    pozo = resultado["metadatos"].get("POZO")
+    return [[pozo, archivo, *(p[campo] for _, campo in COLUMNAS), None] for p in resultado["program"]]
+
+
+def fila_error(archivo: str, error: str) -> list:
+    return [None, archivo, *([None] * len(COLUMNAS)), error]
+
+
+def filas_linea(linea: bytes) -> list:
+    """Filas de un archivo del lote a partir de su línea NDJSON de procesar_lote."""
+    r = json.loads(linea)
+    if r["ok"]:
+        return filas(r["resultado"], r["archivo"])
+    return [fila_error(r["archivo"], r["error"])]
+
+
+async def filas_lote(lineas):
+    """Filas de un lote a partir de las líneas NDJSON de procesar_lote (leídas en un thread)."""
+    loop = asyncio.get_running_loop()
+    async for linea in lineas:
+        for fila in await loop.run_in_executor(None, filas_linea, linea):
+            yield fila
+
+
+# --- CSV: se emite a medida que se generan las filas ---
+
+class _Csv:
+    """Acumula filas CSV y entrega bytes cada ~TROZO (con BOM para Excel)."""
+
+    def __init__(self, columnas: list):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._buffer.write("\ufeff")
+        self._writer.writerow(columnas)
+
+    def agregar(self, fila: list):
+        self._writer.writerow(fila)
+        if self._buffer.tell() >= TROZO:
+            return self.vaciar()
+        return None
+
+    def vaciar(self) -> bytes:
+        texto = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return texto.encode("utf-8")
+
+
+def csv_trozos(filas_programa: list, columnas: list):
+    salida = _Csv(columnas)
+    for fila in filas_programa:
+        trozo = salida.agregar(fila)
+        if trozo:
+            yield trozo
+    yield salida.vaciar()
+
+
+async def csv_trozos_lote(filas_async):
+    salida = _Csv(encabezado(lote=True))
+    async for fila in filas_async:
+        trozo = salida.agregar(fila)
+        if trozo:
+            yield trozo
+    yield salida.vaciar()
+
+
+# --- XLSX: libro write-only (filas a disco) y respuesta leída por trozos ---
+
+class LibroXlsx:
+    """
+    Libro en modo write-only de openpyxl: cada fila se escribe a un
+    temporal y no queda en memoria. `guardar` arma el .xlsx en disco.
+    """
+
+    ANCHOS = {"Pozo": 16, "Archivo": 30, "Maniobra": 28, "Descripción": 90, "Error": 50}
+
+    def __init__(self, columnas: list):
+        self.libro = Workbook(write_only=True)
+        self.hoja = self.libro.create_sheet("Programa")
+        for i, titulo in enumerate(columnas):
+            self.hoja.column_dimensions[get_column_letter(i + 1)].width = self.ANCHOS.get(titulo, 12)
+        self.hoja.freeze_panes = "A2"
+        titulos = []
+        for titulo in columnas:
+            celda = WriteOnlyCell(self.hoja, value=titulo)
+            celda.font = Font(bold=True)
+            titulos.append(celda)
+        self.hoja.append(titulos)
+
+    def agregar(self, fila: list) -> None:
+        self.hoja.append(fila)
+
+    def agregar_linea(self, linea: bytes) -> None:
+        """Filas de un archivo del lote (línea NDJSON); pensado para correr en un thread."""
+        for fila in filas_linea(linea):
+            self.hoja.append(fila)
+
+    def guardar(self) -> str:
+        """Escribe el libro en un temporal y devuelve su ruta."""
+        fd, ruta = tempfile.mkstemp(prefix="programa_", suffix=".xlsx")
+        os.close(fd)
+        try:
+            self.libro.save(ruta)
+        except Exception:
+            os.remove(ruta)
+            raise
+        return ruta
+
+
+def xlsx_a_archivo(filas_programa: list, columnas: list) -> str:
+    libro = LibroXlsx(columnas)
+    for fila in filas_programa:
+        libro.agregar(fila)
+    return libro.guardar()
+
+
+def trozos_archivo(ruta: str):
+    """Lee el archivo por trozos y lo borra al terminar (o si se corta la descarga)."""
+    try:
+        with open(ruta, "rb") as f:
+            while True:
+                trozo = f.read(TROZO)
+                if not trozo:
+                    break
+                yield trozo
+    finally:
+        os.remove(ruta)
@@ -0,0 +1,100 @@
+# pulling-app/backend/app/limites.py
+
+import json
+
+from starlette.formparsers import MultiPartParser
+
+
+def configurar_spool(maximo: int) -> None:
+    """
+    Tamaño hasta el que un archivo subido queda en memoria; más grande,
+    Starlette lo pasa a un temporal en disco (SpooledTemporaryFile).
+    Starlette no lo recibe por request: es el atributo de clase
+    MultiPartParser.spool_max_size, así que vale para todo el proceso (todas
+    las apps). Se cambia solo aquí, lo llama main.py al crear la app, y
+    solo si difiere del valor de Starlette (1 MB).
+    """
+    if MultiPartParser.spool_max_size != maximo:
+        MultiPartParser.spool_max_size = maximo
+
+
+class CuerpoDemasiadoGrande(Exception):
+    pass
+
+
+class LimiteUpload:
+    """
+    Middleware ASGI que corta los requests más grandes que el límite:
+    rechaza de entrada si Content-Length lo supera y, si no viene (o miente),
+    corta mientras se recibe el cuerpo, sin esperar a que termine de subir.
+    Responde 413 en ambos casos.
+    """
+
+    def __init__(self, app, limites: dict, defecto: int):
+        self.app = app
+        self.limites = limites   # prefijo de ruta → bytes máximos
+        self.defecto = defecto
+
+    def limite(self, ruta: str) -> int:
+        for prefijo, maximo in self.limites.items():
+            if ruta.startswith(prefijo):
+                return maximo
+        return self.defecto
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        maximo = self.limite(scope["path"])
+        if maximo <= 0:
+            return await self.app(scope, receive, send)
+
+        largo = dict(scope["headers"]).get(b"content-length")
+        if largo is not None and largo.isdigit() and int(largo) > maximo:
+            return await _rechazar(send, maximo)
+
+        estado = {"recibidos": 0, "excedido": False, "iniciada": False}
+
+        async def recibir():
+            mensaje = await receive()
+            if mensaje["type"] == "http.request":
+                estado["recibidos"] += len(mensaje.get("body", b""))
+                if estado["recibidos"] > maximo:
+                    estado["excedido"] = True
+                    raise CuerpoDemasiadoGrande()
+            return mensaje
+
+        async def enviar(mensaje):
+            # Si el parser convirtió el corte en otro error (p. ej. 400),
+            # se reemplaza por el 413
+            if estado["excedido"]:
+                if mensaje["type"] == "http.response.start" and not estado["iniciada"]:
+                    estado["iniciada"] = True
+                    await _rechazar(send, maximo)
+                return
+            if mensaje["type"] == "http.response.start":
+                estado["iniciada"] = True
+            await send(mensaje)
+
+        try:
+            await self.app(scope, recibir, enviar)
+        except CuerpoDemasiadoGrande:
+            if not estado["iniciada"]:
+                await _rechazar(send, maximo)
+
+
+async def _rechazar(send, maximo: int) -> None:
+    tamano = f"{maximo / 1024 ** 2:g} MB" if maximo >= 1024 ** 2 else f"{maximo / 1024:.0f} KB"
+    cuerpo = json.dumps({
+        "detail": f"Archivo demasiado grande: el máximo es {tamano}."
+    }, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 413,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(cuerpo)).encode()),
+            (b"connection", b"close"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": cuerpo})
+
@@ -1,126 +1,588 @@
 # pulling-app/backend/app/main.py
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
-import pandas as pd
-import io
+from . import arranque  # primero: marca el inicio del import de la app
+
+from pathlib import Path
+from typing import List
+from urllib.parse import quote
+import asyncio
+import json
+import re
+
+from fastapi import Body, FastAPI, File, Query, Request, UploadFile, HTTPException
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 import traceback
 import sys
+import time
+
+from . import config, metricas, trabajos
+
+from .cache import VERSION_REGLAS, cache, clave_cache, hash_archivo, version_resultados
+from .ejecutor import Saturado, ejecutor
+from .limites import LimiteUpload, configurar_spool
+from .planificacion import planificador, programa_desde_resultado
+from .programas import almacen, guardar_desde_cache
+
+# pandas/openpyxl y las reglas se cargan en el primer uso (o en segundo
+# plano al arrancar, ver config.ARRANQUE) para no demorar el cold start.
+processing = arranque.Perezoso("app.processing")
+batch = arranque.Perezoso("app.batch")
+pipeline = arranque.Perezoso("app.rules.pipeline")
+respuestas = arranque.Perezoso("app.respuestas")
+reevaluacion = arranque.Perezoso("app.reevaluacion")
+exportar = arranque.Perezoso("app.exportar")
+validacion = arranque.Perezoso("app.validacion")
+ancla = arranque.Perezoso("app.rules.ancla")
+if config.ARRANQUE == "inmediato":
+    arranque.cargar_todo("inmediato")
 
 app = FastAPI(title="Generador de Programas de Pulling")
+configurar_spool(config.UPLOAD_MEMORIA_MAX)
+app.add_middleware(
+    LimiteUpload,
+    limites={"/process/batch": config.LOTE_MAX_BYTES, "/jobs": config.LOTE_MAX_BYTES},
+    defecto=config.UPLOAD_MAX_BYTES,
+)
+
 
 @app.post("/process/")
 async def process(file: UploadFile = File(...)):
-    # 1) Validar extensión
-    if not file.filename.lower().endswith((".xls", ".xlsx", ".xlsm")):
+    """
+    Procesa un datasheet. La respuesta lleva Server-Timing con la duración
+    de cada etapa (lectura, apertura, hoja, tablas, modelo, reglas, JSON).
+    """
+    tiempos = metricas.iniciar()
+    estado, cache_estado, tamano, error = 500, "-", None, None
+    try:
+        respuesta = await _process(file)
+        estado = respuesta.status_code
+        cache_estado = respuesta.headers.get("X-Cache", "-")
+        tamano = len(respuesta.body)
+        respuesta.headers["Server-Timing"] = _server_timing(tiempos)
+        return respuesta
+    except HTTPException as e:
+        estado, error = e.status_code, e.detail
+        e.headers = {**(e.headers or {}), "Server-Timing": _server_timing(tiempos)}
+        raise
+    finally:
+        total = tiempos.total()
+        arranque.marcar_request("/process/", tiempos.inicio)
+        metricas.REQUESTS.sumar("/process/", str(estado))
+        metricas.REQUEST_SEG.observar(total, "/process/", cache_estado)
+        metricas.log_request(
+            endpoint="/process/", archivo=file.filename, estado=estado,
+            cache=cache_estado, respuesta_bytes=tamano, total_ms=round(total * 1000, 2),
+            etapas={n: round(s * 1000, 2) for n, s in tiempos.etapas}, error=error,
+        )
+
+
+def _server_timing(tiempos: metricas.Tiempos) -> str:
+    return ", ".join(filter(None, [tiempos.server_timing(), f"total;dur={tiempos.total() * 1000:.2f}"]))
+
+
+def _validar_excel(file: UploadFile) -> None:
+    if not file.filename.lower().endswith(processing.EXTENSIONES_EXCEL):
         raise HTTPException(
             status_code=400,
             detail="Formato inválido: se requiere un archivo Excel (.xls/.xlsx/.xlsm)."
         )
 
-    content = await file.read()
 
-    # 2) Abrir como ExcelFile y verificar que exista la hoja "Data Sheet"
+async def _process(file: UploadFile):
+    # 1) Validar extensión
+    _validar_excel(file)
+
+    # El upload ya está en un SpooledTemporaryFile (memoria o disco según
+    # su tamaño): se hashea por trozos y se le pasa el handle al lector
+    metricas.UPLOAD_BYTES.observar(file.size, "/process/")
+
+    # 2) Resultado ya calculado para este mismo archivo y versión de reglas
+    #    (hash por trozos y caché en disco: en un thread, no en el event loop)
+    with metricas.etapa("cache"):
+        sha, version, cuerpo = await run_in_threadpool(_buscar_en_cache, file.file, file.filename)
+    clave = clave_cache(sha, version)
+    if cuerpo is not None:
+        # Sin estado no se puede re-evaluar este resultado (el LRU lo
+        # descartó o el proceso se reinició): se rearma desde el archivo
+        # subido después de enviar la respuesta, que sale ya con el JSON guardado
+        tarea = BackgroundTask(_reconstruir_estado, file, sha) if _sin_estado(sha) else None
+        return Response(
+            content=cuerpo, media_type="application/json", background=tarea,
+            headers={"X-Cache": "HIT", "X-Resultado-Id": sha, "X-Version-Reglas": version})
+
+    # 3) Leer solo los rangos de "Data Sheet" y serializar, fuera del event loop
+    cuerpo = await _procesar_excel(processing.procesar_a_json, file.file, sha, file.filename, True)
+
+    # 4) Guardar en caché y devolver
+    await run_in_threadpool(cache.put, clave, cuerpo)
+    return respuestas.ResultadoResponse(
+        content=cuerpo, headers={"X-Cache": "MISS", "X-Resultado-Id": sha, "X-Version-Reglas": version})
+
+
+async def _procesar_excel(funcion, *args):
+    """Corre `funcion` (processing.procesar_*) en el ejecutor; sus errores como HTTPException."""
     try:
-        xls = pd.ExcelFile(io.BytesIO(content), engine="openpyxl")
-    except Exception:
-        print("ERROR al abrir el Excel:", file=sys.stderr)
+        return await ejecutor.ejecutar(funcion, *args)
+    except Saturado as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except validacion.EstructuraInvalida as e:
+        # Rechazado en el pre-chequeo: no es un error del lector
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        print("ERROR al leer el Excel:", file=sys.stderr)
         traceback.print_exc(file=sys.stderr)
-        raise HTTPException(status_code=400, detail="No pude abrir el Excel.")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _buscar_en_cache(f, archivo: str) -> tuple:
+    """
+    (sha256, versión de reglas, resultado en caché o None) de un upload. Un
+    resultado en caché que todavía no está en el almacén de programas se guarda.
+    """
+    sha = hash_archivo(f)
+    version = version_resultados()
+    clave = clave_cache(sha, version)
+    cuerpo = cache.get(clave)
+    if cuerpo is not None:
+        guardar_desde_cache(clave, sha, archivo, VERSION_REGLAS, cuerpo)
+    return sha, version, cuerpo
+
+
+# Hashes cuyo estado para /reevaluar se está rearmando (uno a la vez por hash)
+_reconstruyendo = set()
+
+
+def _sin_estado(sha: str) -> bool:
+    # Sin el módulo cargado no hay estados: no hace falta importarlo (pandas) para saberlo
+    return "app.reevaluacion" not in sys.modules or not reevaluacion.estados.contiene(sha)
 
-    if "Data Sheet" not in xls.sheet_names:
-        print("ERROR hoja faltante 'Data Sheet':", file=sys.stderr)
+
+async def _reconstruir_estado(file: UploadFile, sha: str) -> None:
+    """Tarea de fondo de un HIT: el upload sigue abierto hasta que termina."""
+    if sha in _reconstruyendo or not _sin_estado(sha):
+        return
+    _reconstruyendo.add(sha)
+    try:
+        await ejecutor.ejecutar(processing.reconstruir_estado, file.file, sha)
+    except Saturado:
+        pass   # el próximo HIT lo vuelve a intentar
+    except ValueError:
+        print(f"ERROR al reconstruir el estado de {sha[:12]}:", file=sys.stderr)
+        traceback.print_exc(file=sys.stderr)
+    finally:
+        _reconstruyendo.discard(sha)
+
+
+_SHA256 = re.compile(r"[0-9a-f]{64}")
+
+
+@app.api_route("/process/{sha256}", methods=["GET", "HEAD"])
+def process_por_hash(sha256: str, request: Request):
+    """
+    Resultado de /process/ para un archivo ya procesado, por el SHA-256 de
+    su contenido (el cliente lo calcula antes de subir). 404 si no está en
+    caché: recién ahí hace falta subir el Excel. HEAD responde sin cuerpo.
+    X-Version-Reglas (también en el 404) le dice al cliente si su copia
+    local se calculó con las reglas y el modelo vigentes.
+    """
+    sha256 = sha256.lower()
+    if not _SHA256.fullmatch(sha256):
+        raise HTTPException(status_code=400, detail="Hash inválido: se espera el SHA-256 en hexadecimal.")
+    version = version_resultados()
+    cuerpo = cache.get(clave_cache(sha256, version))
+    if cuerpo is None:
+        metricas.REQUESTS.sumar("/process/{sha256}", "404")
+        raise HTTPException(status_code=404, detail="No hay un resultado para ese archivo; subirlo a /process/.",
+                            headers={"X-Version-Reglas": version})
+    metricas.REQUESTS.sumar("/process/{sha256}", "200")
+    headers = {"X-Cache": "HIT", "X-Resultado-Id": sha256, "X-Version-Reglas": version}
+    if request.method == "HEAD":
+        return Response(headers={**headers, "Content-Length": str(len(cuerpo))},
+                        media_type="application/json")
+    return Response(content=cuerpo, headers=headers, media_type="application/json")
+
+
+async def _expandir(files: List[UploadFile], endpoint: str) -> list:
+    """
+    Excel de los uploads (ZIPs expandidos) con los topes de descompresión;
+    413 si se superan. Los ZIPs se leen desde el temporal del upload, sin
+    copiarlos enteros a memoria; solo quedan en memoria los Excel extraídos.
+    """
+    uploads = []
+    for f in files:
+        metricas.UPLOAD_BYTES.observar(f.size, endpoint)
+        uploads.append((f.filename, f.file))
+    try:
+        return await run_in_threadpool(batch.expandir_uploads, uploads)
+    except batch.LoteDemasiadoGrande as e:
+        metricas.REQUESTS.sumar(endpoint, "413")
+        raise HTTPException(status_code=413, detail=str(e))
+
+
+@app.post("/process/batch")
+async def process_batch(files: List[UploadFile] = File(...)):
+    """
+    Procesa varios datasheets (ZIP y/o lista multipart) en paralelo.
+    Devuelve NDJSON: una línea por pozo a medida que termina, con los
+    errores de cada archivo en su propia línea sin abortar el lote.
+    """
+    inicio = time.perf_counter()
+    archivos = await _expandir(files, "/process/batch")
+    metricas.REQUESTS.sumar("/process/batch", "200")
+    arranque.marcar_request("/process/batch", inicio)
+
+    return StreamingResponse(batch.procesar_lote(archivos), media_type="application/x-ndjson")
+
+
+@app.post("/jobs", status_code=202)
+async def jobs_crear(files: List[UploadFile] = File(...)):
+    """
+    Encola uno o varios datasheets (ZIP y/o lista multipart) y responde de
+    inmediato con el id del trabajo. Los workers lo procesan en segundo
+    plano; el estado queda en GET /jobs/{id} y el progreso en /jobs/{id}/events.
+    """
+    archivos = await _expandir(files, "/jobs")
+    id = await run_in_threadpool(trabajos.cola.encolar, archivos)
+    metricas.REQUESTS.sumar("/jobs", "202")
+    return {"id": id, "estado": trabajos.PENDIENTE, "total": len(archivos),
+            "estado_url": f"/jobs/{id}", "eventos_url": f"/jobs/{id}/events"}
+
+
+@app.get("/jobs/{job_id}")
+async def jobs_estado(job_id: str):
+    """Estado, progreso y resultados (los ya terminados, en orden de entrada)."""
+    cuerpo = await run_in_threadpool(trabajos.cuerpo_estado, trabajos.cola, job_id)
+    if cuerpo is None:
+        raise HTTPException(status_code=404, detail=f"No existe el trabajo {job_id}.")
+    return Response(content=cuerpo, media_type="application/json")
+
+
+@app.get("/jobs/{job_id}/events")
+async def jobs_eventos(job_id: str):
+    """
+    Server-Sent Events: un evento "progreso" cada vez que termina un
+    archivo y "fin" con el estado final; comentarios de keep-alive mientras
+    no hay cambios.
+    """
+    estado = await run_in_threadpool(trabajos.cola.estado, job_id)
+    if estado is None:
+        raise HTTPException(status_code=404, detail=f"No existe el trabajo {job_id}.")
+
+    async def eventos():
+        anterior, silencio = None, 0.0
+        while True:
+            estado = await run_in_threadpool(trabajos.cola.estado, job_id)
+            if estado is None:
+                return
+            clave = (estado["estado"], estado["hechos"])
+            if clave != anterior:
+                anterior, silencio = clave, 0.0
+                tipo = "fin" if estado["estado"] in trabajos.FINALES else "progreso"
+                yield f"event: {tipo}\ndata: {json.dumps(estado, ensure_ascii=False)}\n\n"
+                if tipo == "fin":
+                    return
+            elif silencio >= 15:
+                silencio = 0.0
+                yield ": sigue\n\n"
+            await asyncio.sleep(0.5)
+            silencio += 0.5
+
+    return StreamingResponse(eventos(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.get("/jobs")
+def jobs_stats():
+    return trabajos.cola.stats()
+
+
+@app.post("/validate")
+def validate(file: UploadFile = File(...)):
+    """
+    Pre-chequeo de estructura sin procesar el datasheet (milisegundos):
+    hojas, pestaña 'Data Sheet', tamaño, macros y encabezados del template.
+    Devuelve todos los problemas juntos; `valido` indica si /process/ lo aceptaría.
+    """
+    if not file.filename.lower().endswith(processing.EXTENSIONES_EXCEL):
         raise HTTPException(
             status_code=400,
-            detail="No encontré la pestaña 'Data Sheet' en el Excel."
+            detail="Formato inválido: se requiere un archivo Excel (.xls/.xlsx/.xlsm)."
         )
+    metricas.REQUESTS.sumar("/validate", "200")
+    return validacion.validar_estructura(file.file)
+
 
-    # 3) Parsear solo la hoja "Data Sheet" sin cabeceras
+def _formato_export(formato: str) -> str:
+    if formato not in ("xlsx", "csv"):
+        raise HTTPException(status_code=400, detail="Formato de export inválido: usar xlsx o csv.")
+    return formato
+
+
+def _adjunto(nombre: str, formato: str) -> dict:
+    nombre = f"{Path(nombre).stem}_programa.{formato}"
+    return {"Content-Disposition": f"attachment; filename*=UTF-8''{quote(nombre)}"}
+
+
+async def _guardar_xlsx(funcion, *args) -> str:
     try:
-        df0 = xls.parse("Data Sheet", header=None)
-    except Exception:
-        print("ERROR al parsear Data Sheet:", file=sys.stderr)
-        traceback.print_exc(file=sys.stderr)
+        return await ejecutor.ejecutar(funcion, *args)
+    except Saturado as e:
         raise HTTPException(
-            status_code=400,
-            detail="Error al parsear hoja 'Data Sheet'."
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
         )
-    df = df0.copy()
 
-    # 4) Helper para trocear tablas
-    def slice_table(r0, r1, c0, c1, cols):
-        try:
-            t = df.iloc[r0:r1, c0:c1].copy()
-            t.columns = cols
-            return t.dropna(subset=[cols[0]])
-        except Exception:
-            print(f"ERROR extrayendo tabla filas[{r0}:{r1}] cols[{c0}:{c1}]:", file=sys.stderr)
-            traceback.print_exc(file=sys.stderr)
-            raise
-
-    # 5) Extracción de las 4 tablas
-    tubing_act = slice_table(
-        r0=31, r1=54, c0=3,  c1=8,
-        cols=["ELEMENTO","DIÁMETRO","PROFUNDIDAD","CANTIDAD","COMENTARIO"]
-    )
-    tubing_fin = slice_table(
-        r0=31, r1=54, c0=10, c1=17,
-        cols=[
-            "ELEMENTO","CONDICIÓN","DIÁMETRO","PROFUNDIDAD",
-            "CANTIDAD","COMENTARIO","LONGITUD ELEMENTO"
-        ]
-    )
-    varillas_act = slice_table(
-        r0=55, r1=78, c0=3,  c1=8,
-        cols=["ELEMENTO","DIÁMETRO","PROFUNDIDAD","CANTIDAD","COMENTARIO"]
-    )
-    varillas_fin = slice_table(
-        r0=55, r1=78, c0=10, c1=19,
-        cols=[
-            "ELEMENTO","CONDICIÓN","DIÁMETRO","PROFUNDIDAD",
-            "ACERO V/B","CUPLA SH/FS","ACERO CUPLA","CANTIDAD","COMENTARIO"
-        ]
+
+@app.post("/process/export")
+async def process_export(file: UploadFile = File(...), formato: str = Query("xlsx", alias="format")):
+    """
+    Programa de un datasheet como planilla (xlsx) o CSV, con las columnas de
+    la tabla del frontend. Se envía por trozos; el xlsx se arma en disco.
+    """
+    _formato_export(formato)
+    _validar_excel(file)
+    metricas.iniciar()
+    metricas.UPLOAD_BYTES.observar(file.size, "/process/export")
+    with metricas.etapa("cache"):
+        sha, version, cuerpo = await run_in_threadpool(_buscar_en_cache, file.file, file.filename)
+    if cuerpo is not None:
+        # En caché solo está el JSON: se lee en un thread
+        resultado = await run_in_threadpool(respuestas.loads, cuerpo)
+    else:
+        # Las filas salen del resultado recién calculado, sin leer su JSON
+        cuerpo, resultado = await _procesar_excel(
+            processing.procesar_para_export, file.file, sha, file.filename)
+        await run_in_threadpool(cache.put, clave_cache(sha, version), cuerpo)
+    metricas.REQUESTS.sumar("/process/export", "200")
+
+    filas = exportar.filas(resultado)
+    if formato == "csv":
+        cuerpo = exportar.csv_trozos(filas, exportar.encabezado())
+    else:
+        ruta = await _guardar_xlsx(exportar.xlsx_a_archivo, filas, exportar.encabezado())
+        cuerpo = exportar.trozos_archivo(ruta)
+    return StreamingResponse(
+        cuerpo, media_type=exportar.FORMATOS[formato],
+        headers={**_adjunto(file.filename, formato), "X-Resultado-Id": sha},
     )
 
-    # 6) Lectura de metadatos en celdas fijas (col D=idx3, E=idx4)
-    meta_pos = {
-        "POZO":               (2, 4),   # D3→E3
-        "BATERIA":            (4, 4),   # D5→E5
-        "EQUIPO":             (6, 4),   # D7→E7
-        "NETA_ASOCIADA":      (8, 4),   # D9→E9
-        "DEFINICION":         (10,4),   # D11→E11
-        "MANIOBRAS_MOTIVO":   (12,4),   # D13→E13
-        "PRIORIDAD_PROGRAMA": (14,4),   # D15→E15
-        "ANTECEDENTE_1":      (17,4),   # D18→E18
-        "ANTECEDENTE_2":      (18,4),
-        "ANTECEDENTE_3":      (19,4),
-        "ANTECEDENTE_4":      (20,4),
-        "REQ_ESP_1":          (22,4),   # D23→E23
-        "REQ_ESP_2":          (23,4),
-        "REQ_ESP_3":          (24,4),
-        "REQ_ESP_4":          (25,4),
-    }
-    meta = {}
-    for key, (r, c) in meta_pos.items():
+
+@app.post("/process/batch/export")
+async def process_batch_export(files: List[UploadFile] = File(...),
+                               formato: str = Query("xlsx", alias="format")):
+    """
+    Programas de varios datasheets (ZIP y/o lista multipart) en una sola
+    planilla, una fila por paso con pozo y archivo; los archivos con error
+    quedan en una fila con la columna Error. El CSV se emite a medida que
+    termina cada pozo.
+    """
+    _formato_export(formato)
+    archivos = await _expandir(files, "/process/batch/export")
+    metricas.REQUESTS.sumar("/process/batch/export", "200")
+
+    nombre = files[0].filename if len(files) == 1 else "lote"
+    lineas = batch.procesar_lote(archivos)
+    if formato == "csv":
+        cuerpo = exportar.csv_trozos_lote(exportar.filas_lote(lineas))
+    else:
+        # Leer cada resultado y escribir sus filas con openpyxl, en un thread
+        libro = exportar.LibroXlsx(exportar.encabezado(lote=True))
+        async for linea in lineas:
+            await run_in_threadpool(libro.agregar_linea, linea)
+        ruta = await _guardar_xlsx(libro.guardar)
+        cuerpo = exportar.trozos_archivo(ruta)
+    return StreamingResponse(cuerpo, media_type=exportar.FORMATOS[formato],
+                             headers=_adjunto(nombre, formato))
+
+
+@app.on_event("startup")
+def startup():
+    arranque.iniciar_precalentamiento()
+    trabajos.workers.iniciar()
+    arranque.marcar_listo()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    trabajos.workers.detener()
+    if "app.batch" in sys.modules:
+        batch.cerrar_pool()
+    ejecutor.cerrar()
+
+
+@app.post("/reevaluar/{resultado_id}")
+def reevaluar(resultado_id: str, parche: dict = Body(...)):
+    """
+    Re-evalúa un resultado previo (X-Resultado-Id de /process/ o
+    resultado_id de un /reevaluar anterior) con un parche de metadatos y/o
+    celdas, recalculando solo los módulos que dependen de lo que cambió.
+    Devuelve el programa nuevo, el diff paso a paso y un nuevo resultado_id.
+    """
+    try:
+        return respuestas.ResultadoResponse(reevaluacion.reevaluar(resultado_id, parche))
+    except reevaluacion.ResultadoNoDisponible:
+        raise HTTPException(
+            status_code=404,
+            detail="Resultado no disponible para re-evaluar; volver a subir el Excel a /process/.",
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/anchor/sweep")
+def anchor_sweep(parametros: dict = Body(...)):
+    """
+    Tensión y estiramiento de fijación del ancla para toda la grilla
+    profundidades × niveles dinámicos × diámetros × temperaturas en una
+    sola llamada (cálculo vectorizado, mismo que usa bajada_tubing).
+    """
+    try:
+        return respuestas.ResultadoResponse(ancla.barrido(parametros))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.put("/schedule/rigs")
+def schedule_rigs(equipos: list = Body(...)):
+    """Equipos disponibles ([{"nombre", "bateria"}]); re-planifica todo el backlog."""
+    try:
+        return planificador.definir_equipos(equipos)
+    except (ValueError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=str(e) if isinstance(e, ValueError)
+                            else "Cada equipo debe ser un objeto {nombre, bateria}.")
+
+
+@app.post("/schedule/programs")
+def schedule_programs(programas: list = Body(...)):
+    """
+    Agrega programas al backlog del plan: resultados de /process/ (con "id"
+    opcional, por defecto el POZO) o {"resultado_id"} de un resultado que
+    sigue en memoria. Re-planifica desde el primero que entra en el orden.
+    """
+    nuevos = []
+    for item in programas:
+        if isinstance(item, dict) and "resultado_id" in item and "program" not in item:
+            estado = reevaluacion.estados.obtener(str(item["resultado_id"]))
+            if estado is None:
+                raise HTTPException(status_code=404,
+                                    detail=f"Resultado {item['resultado_id']} no disponible; volver a subir el Excel a /process/.")
+            item = {"id": item.get("id"), "metadatos": estado.datos["metadatos"],
+                    "program": [p.a_dict() for pasos in estado.modulos.values() for p in pasos]}
         try:
-            meta[key] = df0.iat[r, c]
-        except IndexError:
-            meta[key] = None
+            nuevos.append(programa_desde_resultado(item, item.get("id") if isinstance(item, dict) else None))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return {"agregados": len(nuevos), "replan": planificador.agregar(nuevos)}
+
+
+@app.delete("/schedule/programs/{programa_id}")
+def schedule_cancel(programa_id: str):
+    try:
+        return {"cancelado": programa_id, "replan": planificador.cancelar(programa_id)}
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"No hay un programa '{programa_id}' en el plan.")
+
+
+@app.get("/schedule")
+def schedule():
+    """Plan vigente: pozos por equipo con inicio/fin (horas), traslados y horas ociosas."""
+    return respuestas.ResultadoResponse(planificador.plan())
+
+
+def _almacen():
+    if almacen is None:
+        raise HTTPException(status_code=404, detail="El almacén de programas no está habilitado.")
+    return almacen
+
+
+@app.get("/programs")
+def programs_listar(pozo: str = None, bateria: str = None, equipo: str = None,
+                    prioridad: float = None, desde: float = None, hasta: float = None,
+                    limit: int = 50, cursor: str = None):
+    """
+    Programas guardados, del más nuevo al más viejo, filtrados por pozo,
+    batería, equipo y/o prioridad (y rango de fecha, epoch). Paginado por
+    cursor: pasar `siguiente` de la respuesta como `cursor`.
+    """
+    filtros = {"pozo": pozo, "bateria": bateria, "equipo": equipo, "prioridad": prioridad}
+    try:
+        return _almacen().listar(filtros, desde, hasta, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/programs/latest")
+def programs_ultimo(pozo: str):
+    """Último programa generado para el pozo (metadatos y pasos)."""
+    cuerpo = _almacen().obtener(pozo=pozo)
+    if cuerpo is None:
+        raise HTTPException(status_code=404, detail=f"No hay programas para el pozo {pozo}.")
+    return Response(content=cuerpo, media_type="application/json")
+
+
+@app.get("/programs/stats")
+def programs_stats():
+    return _almacen().stats()
+
+
+@app.get("/programs/{programa_id}")
+def programs_obtener(programa_id: int):
+    cuerpo = _almacen().obtener(id=programa_id)
+    if cuerpo is None:
+        raise HTTPException(status_code=404, detail=f"No existe el programa {programa_id}.")
+    return Response(content=cuerpo, media_type="application/json")
+
+
+@app.get("/reevaluar/stats")
+def reevaluar_stats():
+    return reevaluacion.estados.stats()
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return cache.stats()
+
+
+@app.get("/executor/stats")
+def executor_stats():
+    return ejecutor.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Histogramas y contadores en formato de texto de Prometheus."""
+    return PlainTextResponse(metricas.exponer(), media_type="text/plain; version=0.0.4")
 
-    # 7) Armar resultado y devolver
-    resultado = {
-        "metadatos":       meta,
-        "tubing_actual":   tubing_act.to_dict(orient="records"),
-        "tubing_final":    tubing_fin.to_dict(orient="records"),
-        "varillas_actual": varillas_act.to_dict(orient="records"),
-        "varillas_final":  varillas_fin.to_dict(orient="records"),
-    }
-    return JSONResponse(content=resultado)
 
+@app.get("/debug/startup")
+def debug_startup():
+    """
+    Arranque: modo, tiempo de import de la app, tiempo de import de cada
+    módulo pesado (y quién lo cargó) y tiempo hasta el primer request.
+    """
+    return arranque.reporte()
 
 
+@app.get("/debug/plantillas")
+def debug_plantillas():
+    """Layouts de template detectados (huella, origen, usos y coordenadas)."""
+    return arranque.cargar("app.datasheet").plantillas.stats()
 
-    
 
+@app.get("/debug/duracion")
+def debug_duracion():
+    """Estimador del campo tiempo: modelo cargado (versión) o reglas de respaldo."""
+    return arranque.cargar("app.rules.duracion").info()
 
 
+@app.get("/rules/plan")
+def rules_plan():
+    """Plan de evaluación compilado: módulos, orden, puntos y datos que leen."""
+    return pipeline.PLAN.describir()
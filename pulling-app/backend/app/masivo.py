@@ -0,0 +1,232 @@
+# pulling-app/backend/app/masivo.py
+"""
+Generación masiva de programas sobre un árbol de datasheets (offline).
+
+Uso (desde pulling-app/backend):
+    python -m app.masivo /unidad/datasheets --salida programas.jsonl
+                         [--workers N] [--formato jsonl|parquet]
+
+Recorre el directorio, procesa cada Excel en un pool de procesos y agrega
+una línea JSON por archivo a --salida. El avance queda en
+<salida>.checkpoint: si la corrida se interrumpe, la próxima retoma donde
+quedó y saltea los archivos sin cambios (mismo mtime/tamaño o mismo hash).
+Si un archivo cambió se agrega una línea nueva; vale la última por ruta.
+Con --formato parquet, al terminar se exporta además <salida>.parquet
+(requiere pyarrow).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from . import config
+from .processing import EXTENSIONES_EXCEL, procesar_archivo
+
+
+def buscar_archivos(raiz: Path):
+    """Excel bajo `raiz` (recursivo), sin temporales de Office (~$...)."""
+    for dirpath, dirnames, filenames in os.walk(raiz):
+        dirnames.sort()
+        for nombre in sorted(filenames):
+            if nombre.lower().endswith(EXTENSIONES_EXCEL) and not nombre.startswith("~$"):
+                yield Path(dirpath) / nombre
+
+
+def cargar_checkpoint(ruta: Path) -> dict:
+    """{ruta: registro} del checkpoint; una última línea cortada se ignora."""
+    estado = {}
+    if not ruta.exists():
+        return estado
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            try:
+                registro = json.loads(linea)
+            except json.JSONDecodeError:
+                continue
+            estado[registro["ruta"]] = registro
+    return estado
+
+
+def procesar_ruta(ruta: str, sha_anterior: str = None) -> dict:
+    """
+    Worker: lee y procesa un archivo. Si su hash coincide con el de la
+    corrida anterior no lo vuelve a procesar.
+    """
+    t0 = time.perf_counter()
+    try:
+        content = Path(ruta).read_bytes()
+    except OSError as e:
+        return {"ruta": ruta, "estado": "error", "error": f"No pude leer el archivo: {e}"}
+
+    sha = hashlib.sha256(content).hexdigest()
+    base = {"ruta": ruta, "sha256": sha, "bytes": len(content)}
+    if sha == sha_anterior:
+        return {**base, "estado": "sin_cambios"}
+
+    r = procesar_archivo(ruta, content, sha)
+    base["seg"] = round(time.perf_counter() - t0, 4)
+    if r["ok"]:
+        return {**base, "estado": "ok", "cuerpo": r["cuerpo"]}
+    return {**base, "estado": "error", "error": r["error"]}
+
+
+def _linea_salida(r: dict) -> bytes:
+    """Línea JSONL del resultado; el cuerpo ya serializado se inserta tal cual."""
+    cabecera = {"ruta": r["ruta"], "sha256": r.get("sha256"), "ok": r["estado"] == "ok"}
+    if r["estado"] != "ok":
+        cabecera["error"] = r["error"]
+        return json.dumps(cabecera, ensure_ascii=False).encode("utf-8") + b"\n"
+    texto = json.dumps(cabecera, ensure_ascii=False).encode("utf-8")
+    return texto[:-1] + b', "resultado": ' + r["cuerpo"] + b"}\n"
+
+
+def exportar_parquet(salida: Path) -> Path:
+    """Una fila por ruta (la última) con el resultado como texto JSON."""
+    import pandas as pd
+
+    filas = {}
+    with open(salida, encoding="utf-8") as f:
+        for linea in f:
+            try:
+                r = json.loads(linea)
+            except json.JSONDecodeError:
+                continue
+            resultado = r.pop("resultado", None) or {}
+            filas[r["ruta"]] = {
+                **r,
+                "pozo": (resultado.get("metadatos") or {}).get("POZO"),
+                "pasos": len(resultado.get("program") or []),
+                "resultado": json.dumps(resultado, ensure_ascii=False) if resultado else None,
+            }
+    destino = salida.with_suffix(".parquet")
+    pd.DataFrame(list(filas.values())).to_parquet(destino, index=False)
+    return destino
+
+
+def _argumentos(argv=None):
+    p = argparse.ArgumentParser(prog="python -m app.masivo", description=__doc__,
+                                formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("raiz", help="directorio con los datasheets")
+    p.add_argument("--salida", required=True, help="archivo JSONL de resultados (se agrega)")
+    p.add_argument("--workers", type=int, default=config.BATCH_WORKERS)
+    p.add_argument("--formato", choices=("jsonl", "parquet"), default="jsonl")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _argumentos(argv)
+    raiz = Path(args.raiz)
+    if not raiz.is_dir():
+        print(f"No existe el directorio {raiz}.", file=sys.stderr)
+        return 2
+    salida = Path(args.salida)
+    ruta_checkpoint = salida.with_name(salida.name + ".checkpoint")
+    previo = cargar_checkpoint(ruta_checkpoint)
+
+    conteo = {"vistos": 0, "salteados": 0, "sin_cambios": 0, "ok": 0, "error": 0}
+    errores = []
+    bytes_procesados = 0
+    t0 = time.perf_counter()
+
+    # 1) Armar la lista de trabajo: sin cambios por mtime/tamaño se saltea acá
+    pendientes = []
+    for ruta in buscar_archivos(raiz):
+        conteo["vistos"] += 1
+        try:
+            st = ruta.stat()
+        except OSError:
+            continue
+        clave = str(ruta)
+        anterior = previo.get(clave)
+        if anterior and anterior.get("mtime_ns") == st.st_mtime_ns and anterior.get("size") == st.st_size:
+            conteo["salteados"] += 1
+            continue
+        pendientes.append((clave, st, anterior.get("sha256") if anterior else None))
+
+    print(f"{conteo['vistos']} archivos, {conteo['salteados']} sin cambios según checkpoint, "
+          f"{len(pendientes)} a procesar con {args.workers} workers.", file=sys.stderr)
+
+    # 2) Procesar en paralelo, con pocas tareas en vuelo para cortar rápido
+    interrumpido = False
+    with open(salida, "ab") as f_salida, open(ruta_checkpoint, "a", encoding="utf-8") as f_ck, \
+            ProcessPoolExecutor(max_workers=args.workers) as pool:
+        en_vuelo = {}
+        avisados = 0
+        cola = iter(pendientes)
+        try:
+            while True:
+                while len(en_vuelo) < args.workers * 2:
+                    siguiente = next(cola, None)
+                    if siguiente is None:
+                        break
+                    clave, st, sha_anterior = siguiente
+                    en_vuelo[pool.submit(procesar_ruta, clave, sha_anterior)] = st
+                if not en_vuelo:
+                    break
+
+                listos, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                for fut in listos:
+                    st = en_vuelo.pop(fut)
+                    r = fut.result()
+                    conteo[r["estado"]] += 1
+                    bytes_procesados += r.get("bytes", 0)
+                    if r["estado"] != "sin_cambios":
+                        f_salida.write(_linea_salida(r))
+                        f_salida.flush()
+                    if r["estado"] == "error":
+                        errores.append((r["ruta"], r["error"]))
+                    # El checkpoint se escribe después de la salida: si se corta
+                    # en el medio, el archivo se reprocesa (la última línea vale)
+                    f_ck.write(json.dumps({
+                        "ruta": r["ruta"], "mtime_ns": st.st_mtime_ns, "size": st.st_size,
+                        "sha256": r.get("sha256"), "ok": r["estado"] != "error",
+                    }, ensure_ascii=False) + "\n")
+                    f_ck.flush()
+
+                hechos = conteo["ok"] + conteo["error"] + conteo["sin_cambios"]
+                if hechos // 100 > avisados:
+                    avisados = hechos // 100
+                    print(f"  {hechos}/{len(pendientes)}", file=sys.stderr)
+        except KeyboardInterrupt:
+            interrumpido = True
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # 3) Resumen
+    seg = time.perf_counter() - t0
+    procesados = conteo["ok"] + conteo["error"]
+    resumen = {
+        **conteo,
+        "interrumpido": interrumpido,
+        "segundos": round(seg, 2),
+        "archivos_por_seg": round(procesados / seg, 2) if seg else None,
+        "mb_por_seg": round(bytes_procesados / 1e6 / seg, 2) if seg else None,
+        "errores_detalle": [{"ruta": r, "error": e} for r, e in errores],
+    }
+    if args.formato == "parquet" and not interrumpido:
+        try:
+            resumen["parquet"] = str(exportar_parquet(salida))
+        except ImportError:
+            print("No se pudo exportar a Parquet: falta pyarrow (el JSONL quedó completo).",
+                  file=sys.stderr)
+
+    salida.with_name(salida.name + ".resumen.json").write_text(
+        json.dumps(resumen, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    print(
+        f"{procesados} procesados en {seg:.1f}s ({resumen['archivos_por_seg']} archivos/s): "
+        f"{conteo['ok']} ok, {conteo['error']} con error, "
+        f"{conteo['salteados'] + conteo['sin_cambios']} sin cambios."
+        + (" INTERRUMPIDO: volver a correr para retomar." if interrumpido else ""),
+        file=sys.stderr,
+    )
+    for ruta, error in errores[:20]:
+        print(f"  ERROR {ruta}: {error}", file=sys.stderr)
+    return 130 if interrumpido else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
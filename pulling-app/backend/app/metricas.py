@@ -0,0 +1,174 @@
+# pulling-app/backend/app/metricas.py
+
+import contextvars
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from . import config
+
+# Buckets (Prometheus: límite superior inclusivo, +Inf implícito)
+BUCKETS_SEG = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_BYTES = (16_384, 65_536, 262_144, 1_048_576, 4_194_304, 16_777_216, 67_108_864)
+BUCKETS_FILAS = (0, 1, 2, 5, 10, 15, 20, 25)
+
+
+class Histograma:
+    """Histograma acumulado por combinación de etiquetas, en formato Prometheus."""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: tuple, buckets: tuple):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.buckets = buckets
+        self._series = {}   # valores de etiquetas → [conteos por bucket, suma, total]
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, *etiquetas) -> None:
+        with self._lock:
+            serie = self._series.get(etiquetas)
+            if serie is None:
+                serie = self._series[etiquetas] = [[0] * len(self.buckets), 0.0, 0]
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[0][i] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def exponer(self) -> list:
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        with self._lock:
+            series = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._series.items())
+        for valores, (conteos, suma, total) in series:
+            base = _etiquetas(self.etiquetas, valores)
+            for limite, conteo in zip(self.buckets, conteos):
+                le = _etiquetas(self.etiquetas + ("le",), valores + (_num(limite),))
+                lineas.append(f"{self.nombre}_bucket{le} {conteo}")
+            le = _etiquetas(self.etiquetas + ("le",), valores + ("+Inf",))
+            lineas.append(f"{self.nombre}_bucket{le} {total}")
+            lineas.append(f"{self.nombre}_sum{base} {_num(suma)}")
+            lineas.append(f"{self.nombre}_count{base} {total}")
+        return lineas
+
+
+class Contador:
+    """Contador monótono por combinación de etiquetas."""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: tuple):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def sumar(self, *etiquetas, valor: float = 1) -> None:
+        with self._lock:
+            self._series[etiquetas] = self._series.get(etiquetas, 0) + valor
+
+    def exponer(self) -> list:
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} counter"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for valores, total in series:
+            lineas.append(f"{self.nombre}{_etiquetas(self.etiquetas, valores)} {_num(total)}")
+        return lineas
+
+
+def _num(valor: float) -> str:
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas(nombres: tuple, valores: tuple) -> str:
+    if not nombres:
+        return ""
+    return "{" + ",".join(f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)) + "}"
+
+
+# --- Métricas del servicio ---
+ETAPA_SEG = Histograma(
+    "pulling_etapa_segundos", "Duración de cada etapa de /process/", ("etapa",), BUCKETS_SEG)
+REGLA_SEG = Histograma(
+    "pulling_regla_segundos", "Duración de cada módulo de reglas", ("regla",), BUCKETS_SEG)
+REQUEST_SEG = Histograma(
+    "pulling_request_segundos", "Duración total del request", ("endpoint", "cache"), BUCKETS_SEG)
+UPLOAD_BYTES = Histograma(
+    "pulling_upload_bytes", "Tamaño de los archivos subidos", ("endpoint",), BUCKETS_BYTES)
+FILAS_TABLA = Histograma(
+    "pulling_filas_tabla", "Filas con ELEMENTO por tabla del datasheet", ("tabla",), BUCKETS_FILAS)
+MODULOS = Contador(
+    "pulling_modulos_activados_total", "Veces que se activó cada módulo de reglas", ("modulo",))
+REQUESTS = Contador(
+    "pulling_requests_total", "Requests por endpoint y código de estado", ("endpoint", "estado"))
+TIEMPOS_ESTIMADOS = Contador(
+    "pulling_tiempos_estimados_total", "Pasos con tiempo estimado, por origen (modelo/reglas)", ("origen",))
+
+REGISTRO = (ETAPA_SEG, REGLA_SEG, REQUEST_SEG, UPLOAD_BYTES, FILAS_TABLA, MODULOS, REQUESTS,
+            TIEMPOS_ESTIMADOS)
+
+
+def exponer() -> str:
+    """Todas las métricas en formato de texto de Prometheus."""
+    lineas = []
+    for metrica in REGISTRO:
+        lineas += metrica.exponer()
+    return "\n".join(lineas) + "\n"
+
+
+# --- Tiempos por request ---
+class Tiempos:
+    """Etapas medidas durante un request, en el orden en que terminaron."""
+
+    def __init__(self):
+        self.etapas = []   # [(nombre, segundos)]
+        self.inicio = time.perf_counter()
+
+    def server_timing(self) -> str:
+        """Valor del header Server-Timing (duraciones en ms)."""
+        return ", ".join(f"{nombre};dur={seg * 1000:.2f}" for nombre, seg in self.etapas)
+
+    def total(self) -> float:
+        return time.perf_counter() - self.inicio
+
+
+# El ejecutor corre el parseo con una copia del contexto: el mismo objeto
+# Tiempos queda visible en el thread y recibe las etapas medidas allá.
+_tiempos = contextvars.ContextVar("tiempos", default=None)
+
+
+def iniciar() -> Tiempos:
+    """Empieza a juntar los tiempos del request actual."""
+    tiempos = Tiempos()
+    _tiempos.set(tiempos)
+    return tiempos
+
+
+@contextmanager
+def etapa(nombre: str, histograma: Histograma = ETAPA_SEG):
+    """
+    Mide un bloque: lo suma al histograma y, si hay un request en curso,
+    a su Server-Timing. Fuera de un request (lote, bench) solo al histograma.
+    """
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracion = time.perf_counter() - t0
+        histograma.observar(duracion, nombre)
+        tiempos = _tiempos.get()
+        if tiempos is not None:
+            prefijo = "regla." if histograma is REGLA_SEG else ""
+            tiempos.etapas.append((prefijo + nombre, duracion))
+
+
+def log_request(**campos) -> None:
+    """Línea JSON por request en stderr (solo con PULLING_LOG_JSON=1)."""
+    if not config.LOG_JSON:
+        return
+    campos = {"ts": time.strftime("%Y-%m-%dT%H:%M:%S%z"), **campos}
+    print(json.dumps(campos, ensure_ascii=False, default=str), file=sys.stderr, flush=True)
@@ -0,0 +1,260 @@
+# pulling-app/backend/app/planificacion.py
+
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import NamedTuple
+
+from . import config
+
+# Maniobra que el plan reemplaza por el traslado real entre pozos
+TRANSPORTE = "EQUIPO EN TRANSPORTE"
+
+_SIN_PRIORIDAD = float("inf")
+
+
+class Programa(NamedTuple):
+    """Programa pendiente de un pozo, con su duración estimada (horas)."""
+    id: str
+    pozo: str
+    bateria: str
+    equipo: str            # equipo pedido en el datasheet ("" = cualquiera)
+    prioridad: float       # menor = antes; sin prioridad va al final
+    horas: float
+
+
+class Asignacion(NamedTuple):
+    programa: Programa
+    equipo: int            # índice del equipo
+    inicio: float          # horas desde el inicio del plan (incluye traslado)
+    fin: float
+    transporte: float
+
+
+def _numero(valor):
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def programa_desde_resultado(resultado: dict, id: str = None) -> Programa:
+    """
+    Programa a partir de un resultado de /process/ (metadatos + program con
+    tiempo estimado). La duración es la suma de los tiempos sin el traslado,
+    que lo calcula el plan. Lanza ValueError si falta el pozo o el programa.
+    """
+    if not isinstance(resultado, dict) or not isinstance(resultado.get("program"), list):
+        raise ValueError("Cada programa debe traer 'metadatos' y 'program' (resultado de /process/).")
+    meta = resultado.get("metadatos") or {}
+    pozo = str(meta.get("POZO") or "").strip()
+    id = str(id or pozo).strip()
+    if not id:
+        raise ValueError("Programa sin POZO ni 'id'.")
+    horas = sum(
+        _numero(p.get("tiempo")) or 0.0
+        for p in resultado["program"] if p.get("manobra_normalizada") != TRANSPORTE
+    )
+    prioridad = _numero(meta.get("PRIORIDAD_PROGRAMA"))
+    return Programa(
+        id=id,
+        pozo=pozo or id,
+        bateria=str(meta.get("BATERIA") or "").strip().upper(),
+        equipo=str(meta.get("EQUIPO") or "").strip().upper(),
+        prioridad=_SIN_PRIORIDAD if prioridad is None else prioridad,
+        horas=round(horas, 3),
+    )
+
+
+class Planificador:
+    """
+    Plan de equipos de pulling: asigna los programas pendientes en orden
+    de prioridad (y de llegada) al equipo con el que terminan antes,
+    contando el traslado desde el último pozo del equipo (misma batería o
+    no). Un programa con EQUIPO que coincide con un equipo del plan va a
+    ese equipo.
+
+    El mejor equipo se elige con heaps por disponibilidad (uno general y uno
+    por batería, con invalidación perezosa), O(log equipos) por programa.
+    Al agregar o cancelar un programa solo se re-planifica desde su
+    posición en el orden: lo anterior no cambia.
+    """
+
+    def __init__(self, transporte_misma: float = None, transporte_otra: float = None):
+        self.transporte_misma = (config.TRANSPORTE_MISMA_BATERIA_H
+                                 if transporte_misma is None else transporte_misma)
+        self.transporte_otra = (config.TRANSPORTE_OTRA_BATERIA_H
+                                if transporte_otra is None else transporte_otra)
+        self.equipos = []            # [(nombre, batería inicial)]
+        self._indice = {}            # nombre → índice
+        self._programas = {}         # id → (clave de orden, Programa)
+        self._orden = []             # claves (prioridad, llegada, id), ordenadas
+        self._asignaciones = []      # Asignacion por posición de _orden
+        self._por_equipo = []        # índice → posiciones asignadas (crecientes)
+        self._llegadas = 0
+        self._lock = threading.Lock()
+        self.ultimo_replan = {"desde": 0, "programas": 0, "ms": 0.0}
+
+    # --- Cambios ---
+    def definir_equipos(self, equipos: list) -> dict:
+        """Reemplaza los equipos ([{"nombre", "bateria"}]) y re-planifica todo."""
+        nuevos = []
+        for e in equipos:
+            nombre = str((e or {}).get("nombre") or "").strip().upper()
+            if not nombre:
+                raise ValueError("Cada equipo necesita 'nombre'.")
+            nuevos.append((nombre, str(e.get("bateria") or "").strip().upper()))
+        if len({n for n, _ in nuevos}) != len(nuevos):
+            raise ValueError("Hay equipos con el mismo nombre.")
+        with self._lock:
+            self.equipos = nuevos
+            self._indice = {n: i for i, (n, _) in enumerate(nuevos)}
+            return self._replanificar(0)
+
+    def agregar(self, programas: list) -> dict:
+        """Agrega (o reemplaza, por id) programas y re-planifica desde el primero afectado."""
+        with self._lock:
+            desde = len(self._orden)
+            for p in programas:
+                anterior = self._programas.pop(p.id, None)
+                if anterior is not None:
+                    pos = bisect_left(self._orden, anterior[0])
+                    del self._orden[pos]
+                    desde = min(desde, pos)
+                self._llegadas += 1
+                clave = (p.prioridad, self._llegadas, p.id)
+                self._programas[p.id] = (clave, p)
+                insort(self._orden, clave)
+                desde = min(desde, bisect_left(self._orden, clave))
+            return self._replanificar(desde)
+
+    def cancelar(self, id: str) -> dict:
+        """Quita un programa (KeyError si no está) y re-planifica desde su posición."""
+        with self._lock:
+            clave, _ = self._programas.pop(id)
+            pos = bisect_left(self._orden, clave)
+            del self._orden[pos]
+            return self._replanificar(pos)
+
+    # --- Re-planificación ---
+    def _transporte(self, desde: str, hasta: str) -> float:
+        return self.transporte_misma if desde and desde == hasta else self.transporte_otra
+
+    def _replanificar(self, desde: int) -> dict:
+        """
+        Descarta las asignaciones desde la posición `desde` y las vuelve a
+        calcular partiendo del estado de cada equipo en ese punto.
+        """
+        t0 = time.perf_counter()
+        del self._asignaciones[desde:]
+        if len(self._por_equipo) != len(self.equipos):
+            self._por_equipo = [[] for _ in self.equipos]
+        for posiciones in self._por_equipo:
+            del posiciones[bisect_left(posiciones, desde):]
+
+        # 1) Estado de cada equipo antes de `desde`: fin y batería de su último pozo
+        disponible, bateria, version = [], [], []
+        for i, (_, bateria_inicial) in enumerate(self.equipos):
+            posiciones = self._por_equipo[i]
+            if posiciones:
+                ultima = self._asignaciones[posiciones[-1]]
+                disponible.append(ultima.fin)
+                bateria.append(ultima.programa.bateria)
+            else:
+                disponible.append(0.0)
+                bateria.append(bateria_inicial)
+            version.append(0)
+
+        # 2) Heaps (disponible, índice, versión): general y por batería
+        general = [(disponible[i], i, 0) for i in range(len(self.equipos))]
+        heapq.heapify(general)
+        por_bateria = {}
+        for i, b in enumerate(bateria):
+            por_bateria.setdefault(b, []).append((disponible[i], i, 0))
+        for heap in por_bateria.values():
+            heapq.heapify(heap)
+
+        def tope(heap):
+            while heap and heap[0][2] != version[heap[0][1]]:
+                heapq.heappop(heap)
+            return heap[0] if heap else None
+
+        # 3) Asignar en orden de prioridad
+        if self.equipos:
+            for pos in range(desde, len(self._orden)):
+                p = self._programas[self._orden[pos][2]][1]
+                fijo = self._indice.get(p.equipo)
+                if fijo is not None:
+                    i = fijo
+                else:
+                    candidatos = []
+                    g = tope(general)
+                    candidatos.append((g[0] + self._transporte(bateria[g[1]], p.bateria), g[1]))
+                    misma = tope(por_bateria.get(p.bateria, [])) if p.bateria else None
+                    if misma is not None:
+                        candidatos.append((misma[0] + self.transporte_misma, misma[1]))
+                    i = min(candidatos)[1]
+
+                traslado = self._transporte(bateria[i], p.bateria)
+                inicio = disponible[i]
+                fin = inicio + traslado + p.horas
+                self._asignaciones.append(Asignacion(p, i, inicio, fin, traslado))
+                self._por_equipo[i].append(pos)
+
+                disponible[i], bateria[i] = fin, p.bateria
+                version[i] += 1
+                heapq.heappush(general, (fin, i, version[i]))
+                heapq.heappush(por_bateria.setdefault(p.bateria, []), (fin, i, version[i]))
+
+        self.ultimo_replan = {
+            "desde": desde,
+            "programas": len(self._orden) - desde,
+            "ms": round((time.perf_counter() - t0) * 1000, 3),
+        }
+        return self.ultimo_replan
+
+    # --- Consulta ---
+    def plan(self) -> dict:
+        with self._lock:
+            equipos = []
+            fines = []
+            transporte_total = 0.0
+            for i, (nombre, bateria_inicial) in enumerate(self.equipos):
+                asignaciones = [self._asignaciones[pos] for pos in self._por_equipo[i]] if self._por_equipo else []
+                fin = asignaciones[-1].fin if asignaciones else 0.0
+                transporte = sum(a.transporte for a in asignaciones)
+                fines.append(fin)
+                transporte_total += transporte
+                equipos.append({
+                    "equipo": nombre,
+                    "bateria_inicial": bateria_inicial,
+                    "fin_h": round(fin, 3),
+                    "transporte_h": round(transporte, 3),
+                    "pozos": [
+                        {
+                            "id": a.programa.id,
+                            "pozo": a.programa.pozo,
+                            "bateria": a.programa.bateria,
+                            "prioridad": None if a.programa.prioridad == _SIN_PRIORIDAD else a.programa.prioridad,
+                            "inicio_h": round(a.inicio, 3),
+                            "transporte_h": round(a.transporte, 3),
+                            "fin_h": round(a.fin, 3),
+                        }
+                        for a in asignaciones
+                    ],
+                })
+            horizonte = max(fines, default=0.0)
+            return {
+                "programas": len(self._orden),
+                "sin_asignar": len(self._orden) - len(self._asignaciones),
+                "horizonte_h": round(horizonte, 3),
+                "transporte_h": round(transporte_total, 3),
+                # Horas de equipo parado desde que termina su último pozo hasta el horizonte
+                "ocioso_h": round(sum(horizonte - f for f in fines), 3),
+                "ultimo_replan": dict(self.ultimo_replan),
+                "equipos": equipos,
+            }
+
+
+planificador = Planificador()
@@ -0,0 +1,286 @@
+# pulling-app/backend/app/plantillas.py
+
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+from typing import NamedTuple
+
+# Ventana más grande que se lee para detectar un template desconocido
+VENTANA_DETECCION = (200, 40)
+
+# Etiquetas de metadatos (prefijo normalizado). Los campos numerados
+# (ANTECEDENTE_1..4, REQ_ESP_1..4) cuelgan de una sola etiqueta, uno por fila.
+ETIQUETAS_META = {
+    "POZO": ("POZO",),
+    "BATERIA": ("BATERIA",),
+    "EQUIPO": ("EQUIPO",),
+    "NETA_ASOCIADA": ("NETA",),
+    "DEFINICION": ("DEFINICION",),
+    "MANIOBRAS_MOTIVO": ("MANIOBRA", "MOTIVO"),
+    "PRIORIDAD_PROGRAMA": ("PRIORIDAD",),
+    "ANTECEDENTE": ("ANTECEDENTE",),
+    "REQ_ESP": ("REQUERIMIENTO",),
+}
+
+_NUMERADO = re.compile(r"(.+)_(\d+)$")
+
+
+@lru_cache(maxsize=4096)
+def _norm_texto(texto: str) -> str:
+    texto = unicodedata.normalize("NFKD", texto)
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).upper()
+    return " ".join(texto.split()).rstrip(":.").strip()
+
+
+def normalizar(valor) -> str:
+    """Texto de una celda para comparar etiquetas (sin acentos, mayúsculas)."""
+    return _norm_texto(valor) if isinstance(valor, str) else ""
+
+
+def _celda(celdas: list, r: int, c: int):
+    if r < len(celdas) and c < len(celdas[r]):
+        return celdas[r][c]
+    return None
+
+
+class Layout(NamedTuple):
+    """
+    Posiciones del datasheet en un template:
+      tablas: {nombre: (r0, r1, (índices de columna...))}  (0-based, r1 excluyente)
+      meta:   {campo: (fila, col)}
+      firma:  ((fila, col, texto normalizado), ...) celdas de encabezado que
+              identifican al template; un libro usa este layout si coinciden todas
+      origen: "estandar" | "detectado" | "parcial" | "fijo"
+    """
+    tablas: dict
+    meta: dict
+    firma: tuple
+    origen: str
+
+    @property
+    def huella(self) -> str:
+        return hashlib.sha1(repr(self.firma).encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def ventana(self) -> tuple:
+        filas = max([r1 for r0, r1, _ in self.tablas.values()] + [r + 1 for r, _ in self.meta.values()])
+        cols = max([max(idx) + 1 for *_, idx in self.tablas.values()] + [c + 1 for _, c in self.meta.values()])
+        return filas, cols
+
+    def coincide(self, celdas: list) -> bool:
+        return all(normalizar(_celda(celdas, r, c)) == t for r, c, t in self.firma)
+
+
+def layout_fijo(tablas: dict, meta: dict) -> dict:
+    """tablas/meta en el formato de Layout a partir de TABLAS y META_POS."""
+    return (
+        {n: (r0, r1, tuple(range(c0, c1))) for n, (r0, r1, c0, c1, _) in tablas.items()},
+        dict(meta),
+    )
+
+
+def layout_estandar(tablas: dict, meta: dict, etiquetas: dict) -> Layout:
+    """
+    Layout del template estándar sin leer ningún libro: las posiciones de
+    TABLAS / META_POS, con los encabezados de cada tabla en la fila anterior
+    y las `etiquetas` ({campo: texto}) a la izquierda de cada valor como firma.
+    """
+    fijas, meta_fija = layout_fijo(tablas, meta)
+    firma = [
+        (r0 - 1, j, normalizar(col))
+        for nombre, (r0, _, idx) in fijas.items()
+        for j, col in zip(idx, tablas[nombre][4])
+    ]
+    firma += [(meta_fija[campo][0], meta_fija[campo][1] - 1, normalizar(texto))
+              for campo, texto in etiquetas.items()]
+    return Layout(fijas, meta_fija, tuple(sorted(set(firma))), "estandar")
+
+
+def detectar(celdas: list, tablas_base: dict, meta_base: dict) -> Layout:
+    """
+    Ubica las 4 tablas por sus encabezados (fila con ELEMENTO y el resto de
+    las columnas esperadas) y los metadatos por su etiqueta (valor a la
+    derecha). Lo que no se encuentra queda en la posición fija de TABLAS /
+    META_POS; la firma incluye también esas celdas tal como están.
+    """
+    fijas, meta_fija = layout_fijo(tablas_base, meta_base)
+    esperadas = {n: [normalizar(c) for c in t[4]] for n, t in tablas_base.items()}
+    ancho_max = max(len(c) for c in esperadas.values()) + 3
+
+    # 1) Encabezados candidatos: cada ELEMENTO con las celdas a su derecha
+    candidatos = []
+    for r, fila in enumerate(celdas):
+        for c, valor in enumerate(fila):
+            if normalizar(valor) != "ELEMENTO":
+                continue
+            encabezado = {}
+            for j in range(c, min(c + ancho_max, len(fila))):
+                texto = normalizar(fila[j])
+                if not texto or (j > c and texto == "ELEMENTO"):
+                    break
+                encabezado.setdefault(texto, j)
+            # Tablas cuyas columnas están todas en este encabezado (la más específica)
+            tipos = [n for n, cols in esperadas.items() if all(col in encabezado for col in cols)]
+            if tipos:
+                ancho = max(len(esperadas[n]) for n in tipos)
+                tipos = [n for n in tipos if len(esperadas[n]) == ancho]
+                candidatos.append((r, c, encabezado, tipos))
+
+    # 2) Asignar: las tablas con columnas únicas primero; las "actual" (mismas
+    #    columnas en tubing y varillas) por la fila de su "final", o de arriba abajo
+    asignadas = {}
+    for r, c, encabezado, tipos in candidatos:
+        if len(tipos) == 1 and tipos[0] not in asignadas:
+            asignadas[tipos[0]] = (r, c, encabezado)
+    for r, c, encabezado, tipos in candidatos:
+        libres = [n for n in tipos if n not in asignadas]
+        if len(tipos) < 2 or not libres:
+            continue
+        por_fila = [n for n in libres
+                    if asignadas.get(n.replace("_actual", "_final"), (None,))[0] == r]
+        asignadas[(por_fila or libres)[0]] = (r, c, encabezado)
+
+    tablas, firma = {}, []
+    filas_encabezado = sorted({(r, c) for r, c, _ in asignadas.values()})
+    for nombre, (r0, r1, idx) in fijas.items():
+        if nombre not in asignadas:
+            tablas[nombre] = (r0, r1, idx)
+            firma.append((r0 - 1, idx[0], normalizar(_celda(celdas, r0 - 1, idx[0]))))
+            continue
+        r, c, encabezado = asignadas[nombre]
+        indices = tuple(encabezado[col] for col in esperadas[nombre])
+        # Termina donde empieza el bloque de abajo (misma columna) o con el largo original
+        fin = r + 1 + (r1 - r0)
+        for r_otro, c_otro in filas_encabezado:
+            if r_otro > r and c_otro == c:
+                fin = min(fin, r_otro)
+                break
+        tablas[nombre] = (r + 1, fin, indices)
+        firma.extend((r, j, texto) for texto, j in encabezado.items() if j in indices)
+
+    # 3) Metadatos: etiquetas por encima de las tablas, en la columna que
+    #    reúne más etiquetas distintas (evita confundir un valor con una etiqueta)
+    limite = min([r0 - 1 for r0, _, _ in tablas.values()] + [len(celdas)])
+    apariciones = {}   # columna → {grupo: (fila, texto)} (primera aparición)
+    for r in range(limite):
+        for c, valor in enumerate(celdas[r]):
+            texto = normalizar(valor)
+            if not texto:
+                continue
+            for grupo, prefijos in ETIQUETAS_META.items():
+                if texto.startswith(prefijos):
+                    apariciones.setdefault(c, {}).setdefault(grupo, (r, texto))
+                    break
+    etiquetas = {}
+    if apariciones:
+        c = max(apariciones, key=lambda col: (len(apariciones[col]), -col))
+        etiquetas = {g: (r, c, texto) for g, (r, texto) in apariciones[c].items()}
+
+    meta, encontrados = {}, 0
+    for campo, (r_fijo, c_fijo) in meta_fija.items():
+        m = _NUMERADO.match(campo)
+        grupo, n = (m.group(1), int(m.group(2))) if m and m.group(1) in ETIQUETAS_META else (campo, 1)
+        if grupo in etiquetas:
+            r, c, texto = etiquetas[grupo]
+            meta[campo] = (r + n - 1, c + 1)
+            encontrados += 1
+            if n == 1:
+                firma.append((r, c, texto))
+        else:
+            meta[campo] = (r_fijo, c_fijo)
+            firma.append((r_fijo, c_fijo - 1, normalizar(_celda(celdas, r_fijo, c_fijo - 1))))
+
+    if len(asignadas) == len(fijas) and encontrados == len(meta_fija):
+        origen = "detectado"
+    elif asignadas or encontrados:
+        origen = "parcial"
+    else:
+        origen = "fijo"
+    return Layout(tablas, meta, tuple(sorted(set(firma))), origen)
+
+
+class CachePlantillas:
+    """
+    Layouts conocidos por huella de template. Un libro cuyo encabezado
+    coincide con un layout ya visto usa sus coordenadas directamente; solo
+    el primero de cada versión de template paga la detección.
+    """
+
+    def __init__(self, tablas: dict, meta: dict, etiquetas: dict = None, max_entradas: int = 32):
+        self.tablas = tablas
+        self.meta = meta
+        self.max_entradas = max_entradas
+        self._layouts = OrderedDict()   # huella → Layout
+        self._info = {}                 # huella → {"hits", "detectado_en", "detectar_ms"}
+        self._lock = threading.Lock()
+        fijas, meta_fija = layout_fijo(tablas, meta)
+        self._ventana = Layout(fijas, meta_fija, (), "fijo").ventana
+        self.detecciones = 0
+        if etiquetas:
+            estandar = layout_estandar(tablas, meta, etiquetas)
+            self._layouts[estandar.huella] = estandar
+            self._info[estandar.huella] = {"hits": 0, "detectado_en": None, "detectar_ms": 0.0}
+
+    def ventana(self) -> tuple:
+        """Filas y columnas a leer: alcanza para todos los layouts conocidos."""
+        return self._ventana
+
+    def buscar(self, celdas: list):
+        with self._lock:
+            for huella, layout in self._layouts.items():
+                if layout.coincide(celdas):
+                    self._layouts.move_to_end(huella, last=False)
+                    self._info[huella]["hits"] += 1
+                    return layout
+        return None
+
+    def detectar(self, celdas: list, releer=None) -> tuple:
+        """
+        Detecta el layout y lo guarda. Si con `celdas` no se encuentra todo,
+        `releer(filas, cols)` vuelve a leer la hoja con VENTANA_DETECCION.
+        Devuelve (layout, celdas usadas).
+        """
+        t0 = time.perf_counter()
+        layout = detectar(celdas, self.tablas, self.meta)
+        if layout.origen != "detectado" and releer is not None and len(celdas) < VENTANA_DETECCION[0]:
+            celdas = releer(*VENTANA_DETECCION)
+            layout = detectar(celdas, self.tablas, self.meta)
+        with self._lock:
+            self.detecciones += 1
+            huella = layout.huella
+            if huella not in self._layouts:
+                self._layouts[huella] = layout
+                self._layouts.move_to_end(huella, last=False)
+                self._info[huella] = {
+                    "hits": 0,
+                    "detectado_en": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                    "detectar_ms": round((time.perf_counter() - t0) * 1000, 3),
+                }
+                while len(self._layouts) > self.max_entradas:
+                    viejo, _ = self._layouts.popitem()
+                    del self._info[viejo]
+                filas, cols = layout.ventana
+                self._ventana = (max(self._ventana[0], filas), max(self._ventana[1], cols))
+        return layout, celdas
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "detecciones": self.detecciones,
+                "ventana": {"filas": self._ventana[0], "columnas": self._ventana[1]},
+                "layouts": [
+                    {
+                        "huella": huella,
+                        "origen": layout.origen,
+                        **self._info[huella],
+                        "tablas": {n: {"fila_inicio": r0 + 1, "fila_fin": r1, "columnas": [c + 1 for c in idx]}
+                                   for n, (r0, r1, idx) in layout.tablas.items()},
+                        "metadatos": {k: [r + 1, c + 1] for k, (r, c) in layout.meta.items()},
+                    }
+                    for huella, layout in self._layouts.items()
+                ],
+            }
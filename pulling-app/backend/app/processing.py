@@ -0,0 +1,127 @@
+# pulling-app/backend/app/processing.py
+
+from .cache import VERSION_REGLAS, clave_cache
+from .corpus import guardar_snapshot
+from .datasheet import read_datasheet, TABLAS
+from .metricas import FILAS_TABLA, etapa
+from .programas import guardar_programa
+from .rules.catalogo import a_dicts
+from .rules.duracion import completar
+from .rules.modelo import WellDatasheet
+from .rules.pipeline import evaluar_modulos
+from .respuestas import dumps, dumps_partes, unir
+from .reevaluacion import estados
+from .validacion import verificar
+
+EXTENSIONES_EXCEL = (".xls", ".xlsx", ".xlsm")
+
+
+def evaluar_excel(fuente) -> tuple:
+    """
+    Lee el datasheet, evalúa los módulos de reglas y estima el tiempo de
+    cada paso. Devuelve (datos de read_datasheet, WellDatasheet, {módulo: [Paso]}).
+    Lanza ValueError si el Excel es inválido o faltan datos para las reglas
+    (EstructuraInvalida, con todos los problemas, si falla el pre-chequeo).
+    """
+    verificar(fuente)
+    datos = read_datasheet(fuente)
+    for nombre in TABLAS:
+        FILAS_TABLA.observar(len(datos[nombre]), nombre)
+    with etapa("modelo"):
+        ds = WellDatasheet.desde_datos(datos)
+    modulos = evaluar_modulos(ds)
+    with etapa("duracion"):
+        modulos, = completar([(ds, modulos)])
+    return datos, ds, modulos
+
+
+def armar_resultado(datos: dict, modulos: dict) -> dict:
+    """
+    Resultado de /process/: metadatos, las 4 tablas (DataFrame) y el
+    programa (lista de Paso); se convierten a JSON recién en a_json.
+    """
+    resultado = {"metadatos": datos["metadatos"]}
+    for nombre in TABLAS:
+        resultado[nombre] = datos[nombre]
+    resultado["program"] = [p for pasos in modulos.values() for p in pasos]
+    return resultado
+
+
+def procesar_excel(fuente) -> dict:
+    """
+    Extrae metadatos y las 4 tablas del datasheet, arma el programa de
+    maniobras y devuelve el resultado de /process/.
+    Lanza ValueError si el Excel es inválido o faltan datos para las reglas.
+    """
+    datos, _, modulos = evaluar_excel(fuente)
+    return armar_resultado(datos, modulos)
+
+
+def a_json(resultado: dict) -> bytes:
+    """Serializa el resultado a JSON (NaN → null, numpy nativo, fechas ISO)."""
+    with etapa("serializar"):
+        return dumps(resultado)
+
+
+def _procesar(fuente, sha256: str, archivo: str, conservar_estado: bool) -> tuple:
+    """(resultado, JSON de la respuesta) de procesar_a_json / procesar_para_export."""
+    datos, ds, modulos = evaluar_excel(fuente)
+    resultado = armar_resultado(datos, modulos)
+    with etapa("serializar"):
+        partes = dumps_partes(resultado)
+        cuerpo = unir(partes)
+    guardar_snapshot(sha256, resultado, archivo)
+    if sha256 is not None:
+        guardar_programa(
+            clave_cache(sha256), sha256, archivo, resultado["metadatos"], len(resultado["program"]),
+            VERSION_REGLAS, unir({"metadatos": partes["metadatos"], "program": partes["program"]}),
+        )
+    if conservar_estado and sha256 is not None:
+        estados.guardar(sha256, datos, ds, modulos)
+    return resultado, cuerpo
+
+
+def procesar_a_json(fuente, sha256: str = None, archivo: str = None,
+                    conservar_estado: bool = False) -> bytes:
+    """
+    procesar_excel + a_json (`fuente`: bytes o archivo abierto). Además, con el hash del archivo:
+    – guarda el snapshot del datasheet si el corpus está habilitado
+    – guarda metadatos y programa en el almacén de programas (/programs),
+      con las mismas partes ya serializadas de la respuesta
+    – con `conservar_estado`, deja el estado evaluado para /reevaluar
+    """
+    return _procesar(fuente, sha256, archivo, conservar_estado)[1]
+
+
+def procesar_para_export(fuente, sha256: str = None, archivo: str = None) -> tuple:
+    """
+    Como procesar_a_json, para /process/export: (JSON para la caché,
+    {"metadatos", "program"} con los pasos como dicts), así las filas del
+    export salen del resultado sin volver a leer el JSON.
+    """
+    resultado, cuerpo = _procesar(fuente, sha256, archivo, False)
+    return cuerpo, {"metadatos": resultado["metadatos"], "program": a_dicts(resultado["program"])}
+
+
+def reconstruir_estado(fuente, sha256: str) -> None:
+    """
+    Vuelve a evaluar el datasheet solo para dejar su estado para /reevaluar
+    (el resultado ya estaba en caché pero el estado salió del LRU o no
+    sobrevivió un reinicio). Lanza ValueError como procesar_excel.
+    """
+    datos, ds, modulos = evaluar_excel(fuente)
+    estados.guardar(sha256, datos, ds, modulos)
+
+
+def procesar_archivo(nombre: str, content: bytes, sha256: str = None) -> dict:
+    """
+    Procesa un archivo dentro de un worker del pool de lote.
+    Nunca lanza: los errores vuelven como {"ok": False, "error": ...}
+    para no abortar el resto del lote.
+    """
+    try:
+        return {"archivo": nombre, "ok": True, "cuerpo": procesar_a_json(content, sha256, nombre)}
+    except ValueError as e:
+        return {"archivo": nombre, "ok": False, "error": str(e)}
+    except Exception as e:
+        return {"archivo": nombre, "ok": False, "error": f"Error inesperado: {e}"}
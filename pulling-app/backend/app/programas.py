@@ -0,0 +1,239 @@
+# pulling-app/backend/app/programas.py
+
+import base64
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from . import config
+
+# Solo sqlite3/json: las consultas no cargan pandas ni openpyxl
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS programas (
+    id             INTEGER PRIMARY KEY,
+    clave          TEXT NOT NULL UNIQUE,     -- clave de caché: archivo + reglas + modelo
+    sha256         TEXT NOT NULL,
+    archivo        TEXT,
+    pozo           TEXT COLLATE NOCASE,
+    bateria        TEXT COLLATE NOCASE,
+    equipo         TEXT COLLATE NOCASE,
+    prioridad      REAL,
+    pasos          INTEGER NOT NULL,
+    creado         REAL NOT NULL,
+    version_reglas TEXT NOT NULL,
+    cuerpo         BLOB NOT NULL             -- JSON {"metadatos", "program"}
+);
+CREATE INDEX IF NOT EXISTS programas_pozo      ON programas (pozo, creado, id);
+CREATE INDEX IF NOT EXISTS programas_bateria   ON programas (bateria, creado, id);
+CREATE INDEX IF NOT EXISTS programas_equipo    ON programas (equipo, creado, id);
+CREATE INDEX IF NOT EXISTS programas_prioridad ON programas (prioridad, creado, id);
+CREATE INDEX IF NOT EXISTS programas_creado    ON programas (creado, id);
+"""
+
+# Filtros por igualdad (parámetro de la API → columna indexada)
+FILTROS = {"pozo": "pozo", "bateria": "bateria", "equipo": "equipo", "prioridad": "prioridad"}
+_COLUMNAS = "id, sha256, archivo, pozo, bateria, equipo, prioridad, pasos, creado, version_reglas"
+
+MAX_LIMITE = 500
+
+
+def _texto(valor):
+    texto = "" if valor is None else str(valor).strip()
+    return texto or None
+
+
+def _numero(valor):
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def cursor_codificar(creado: float, id: int) -> str:
+    return base64.urlsafe_b64encode(f"{creado!r}:{id}".encode()).decode().rstrip("=")
+
+
+def cursor_decodificar(cursor: str) -> tuple:
+    """(creado, id) del último elemento de la página anterior; ValueError si no es válido."""
+    try:
+        texto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        creado, id = texto.split(":")
+        return float(creado), int(id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Cursor inválido.")
+
+
+class AlmacenProgramas:
+    """
+    Programas generados, uno por archivo y versión de reglas/modelo, en
+    SQLite con índices por POZO, BATERIA, EQUIPO, PRIORIDAD_PROGRAMA y
+    fecha. Los listados van del más nuevo al más viejo con paginación por
+    cursor (creado, id): cada página es una búsqueda en el índice, sin OFFSET.
+    Los programas más viejos que `ttl_seg` se borran al guardar (a lo sumo
+    una vez por minuto y por proceso).
+    """
+
+    def __init__(self, ruta: str, ttl_seg: float = None):
+        self.ruta = ruta
+        self.ttl_seg = ttl_seg
+        self._local = threading.local()
+        self._purgado = 0.0
+        self.purgados = 0
+        with self._conexion() as con:
+            con.executescript(_ESQUEMA)
+
+    def _conexion(self) -> sqlite3.Connection:
+        # Una conexión por thread y por proceso: los workers del lote (fork)
+        # no deben usar la conexión heredada del proceso padre
+        con, pid = getattr(self._local, "con", (None, None))
+        if con is None or pid != os.getpid():
+            con = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = (con, os.getpid())
+        return con
+
+    def guardar(self, clave: str, sha256: str, archivo: str, metadatos: dict,
+                pasos: int, version_reglas: str, cuerpo: bytes) -> None:
+        """Guarda el programa; si ya existe la misma clave no hace nada."""
+        self._conexion().execute(
+            "INSERT OR IGNORE INTO programas (clave, sha256, archivo, pozo, bateria, equipo, "
+            "prioridad, pasos, creado, version_reglas, cuerpo) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                clave, sha256, archivo,
+                _texto(metadatos.get("POZO")),
+                _texto(metadatos.get("BATERIA")),
+                _texto(metadatos.get("EQUIPO")),
+                _numero(metadatos.get("PRIORIDAD_PROGRAMA")),
+                pasos, time.time(), version_reglas, cuerpo,
+            ),
+        )
+        if self.ttl_seg and time.monotonic() - self._purgado > 60:
+            self.purgar()
+
+    def purgar(self) -> int:
+        """Borra los programas guardados hace más de ttl_seg (por el índice de fecha)."""
+        self._purgado = time.monotonic()
+        n = self._conexion().execute(
+            "DELETE FROM programas WHERE creado < ?", (time.time() - self.ttl_seg,)).rowcount
+        self.purgados += n
+        return n
+
+    def existe(self, clave: str) -> bool:
+        return self._conexion().execute(
+            "SELECT 1 FROM programas WHERE clave = ?", (clave,)).fetchone() is not None
+
+    def listar(self, filtros: dict = None, desde: float = None, hasta: float = None,
+               limite: int = 50, cursor: str = None) -> dict:
+        """
+        Página de programas (sin el cuerpo) que cumplen los filtros, del más
+        nuevo al más viejo. `siguiente` es el cursor de la página que sigue.
+        """
+        if not 1 <= limite <= MAX_LIMITE:
+            raise ValueError(f"'limit' debe estar entre 1 y {MAX_LIMITE}.")
+        condiciones, valores = [], []
+        for nombre, valor in (filtros or {}).items():
+            if valor is None:
+                continue
+            if nombre not in FILTROS:
+                raise ValueError(f"Filtro desconocido: {nombre}")
+            if nombre == "prioridad":
+                valor = _numero(valor)
+                if valor is None:
+                    raise ValueError("'prioridad' debe ser numérica.")
+            condiciones.append(f"{FILTROS[nombre]} = ?")
+            valores.append(valor)
+        if desde is not None:
+            condiciones.append("creado >= ?")
+            valores.append(desde)
+        if hasta is not None:
+            condiciones.append("creado < ?")
+            valores.append(hasta)
+        if cursor:
+            creado, id = cursor_decodificar(cursor)
+            condiciones.append("(creado < ? OR (creado = ? AND id < ?))")
+            valores += [creado, creado, id]
+
+        donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        filas = self._conexion().execute(
+            f"SELECT {_COLUMNAS} FROM programas {donde} ORDER BY creado DESC, id DESC LIMIT ?",
+            (*valores, limite + 1),
+        ).fetchall()
+        items = [self._item(f) for f in filas[:limite]]
+        siguiente = None
+        if len(filas) > limite:
+            ultima = filas[limite - 1]
+            siguiente = cursor_codificar(ultima[8], ultima[0])
+        return {"items": items, "siguiente": siguiente}
+
+    @staticmethod
+    def _item(fila: tuple) -> dict:
+        id, sha256, archivo, pozo, bateria, equipo, prioridad, pasos, creado, version = fila
+        return {
+            "id": id, "sha256": sha256, "archivo": archivo, "pozo": pozo,
+            "bateria": bateria, "equipo": equipo, "prioridad": prioridad, "pasos": pasos,
+            "creado": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(creado)),
+            "version_reglas": version,
+        }
+
+    def obtener(self, id: int = None, pozo: str = None):
+        """
+        JSON (bytes) de un programa: por id, o el más reciente del pozo.
+        Datos del listado + metadatos y programa guardados. None si no existe.
+        """
+        if id is not None:
+            sql, valores = f"SELECT {_COLUMNAS}, cuerpo FROM programas WHERE id = ?", (id,)
+        else:
+            sql = f"SELECT {_COLUMNAS}, cuerpo FROM programas WHERE pozo = ? ORDER BY creado DESC, id DESC LIMIT 1"
+            valores = (pozo,)
+        fila = self._conexion().execute(sql, valores).fetchone()
+        if fila is None:
+            return None
+        cabecera = json.dumps(self._item(fila[:-1]), ensure_ascii=False).encode("utf-8")
+        cuerpo = bytes(fila[-1])
+        return cabecera[:-1] + b", " + cuerpo[1:]
+
+    def stats(self) -> dict:
+        total, pozos = self._conexion().execute(
+            "SELECT count(*), count(DISTINCT pozo) FROM programas").fetchone()
+        return {"db": self.ruta, "programas": total, "pozos": pozos,
+                "ttl_seg": self.ttl_seg, "purgados": self.purgados}
+
+
+almacen = AlmacenProgramas(config.PROGRAMAS_DB, config.PROGRAMAS_TTL_SEG) if config.PROGRAMAS_DB else None
+
+
+def guardar_programa(clave: str, sha256: str, archivo: str, metadatos: dict,
+                     pasos: int, version_reglas: str, cuerpo: bytes) -> None:
+    """Guarda el programa si el almacén está habilitado; un error no corta el request."""
+    if almacen is None or sha256 is None:
+        return
+    try:
+        almacen.guardar(clave, sha256, archivo, metadatos, pasos, version_reglas, cuerpo)
+    except sqlite3.Error as e:
+        print(f"ERROR al guardar el programa {sha256[:12]}: {e}", file=sys.stderr)
+
+
+def guardar_desde_cache(clave: str, sha256: str, archivo: str, version_reglas: str, cuerpo: bytes) -> None:
+    """
+    Guarda el programa de un resultado servido desde la caché si todavía no
+    está (p. ej. caché en disco anterior al almacén o a su TTL). Solo en ese
+    caso se lee el JSON del resultado; un error no corta el request.
+    """
+    if almacen is None:
+        return
+    try:
+        if almacen.existe(clave):
+            return
+        resultado = json.loads(cuerpo)
+        metadatos, programa = resultado["metadatos"], resultado["program"]
+        almacen.guardar(
+            clave, sha256, archivo, metadatos, len(programa), version_reglas,
+            json.dumps({"metadatos": metadatos, "program": programa}, ensure_ascii=False).encode("utf-8"),
+        )
+    except (sqlite3.Error, ValueError, KeyError, TypeError) as e:
+        print(f"ERROR al guardar el programa {sha256[:12]}: {e}", file=sys.stderr)
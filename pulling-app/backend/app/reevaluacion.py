@@ -0,0 +1,233 @@
+# pulling-app/backend/app/reevaluacion.py
+
+import difflib
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+import pandas as pd
+
+from . import config
+from .corpus import corpus
+from .datasheet import META_POS, TABLAS, _convertir, slice_table
+from .rules.catalogo import a_dicts
+from .rules.duracion import completar
+from .rules.modelo import COLUMNAS_CANONICAS, WellDatasheet
+from .rules.pipeline import PLAN
+
+# Nombre canónico → encabezado del Excel, para aceptar ambos en un parche
+_ENCABEZADOS = {v: k for k, v in COLUMNAS_CANONICAS.items()}
+
+
+class ResultadoNoDisponible(Exception):
+    """El resultado base ya no está en memoria ni en el corpus."""
+
+
+class Estado(NamedTuple):
+    """Datasheet evaluado: datos crudos, modelo y maniobras por módulo."""
+    datos: dict
+    ds: WellDatasheet
+    modulos: dict
+
+
+class AlmacenEstados:
+    """
+    Estados evaluados recientes por id de resultado (LRU en memoria),
+    base de las re-evaluaciones incrementales.
+    """
+
+    def __init__(self, max_entradas: int):
+        self.max_entradas = max_entradas
+        self._estados = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def guardar(self, clave: str, datos: dict, ds: WellDatasheet, modulos: dict) -> None:
+        with self._lock:
+            self._estados[clave] = Estado(datos, ds, modulos)
+            self._estados.move_to_end(clave)
+            while len(self._estados) > self.max_entradas:
+                self._estados.popitem(last=False)
+
+    def contiene(self, clave: str) -> bool:
+        """Si el estado está guardado (sin tocar el orden LRU ni los contadores)."""
+        with self._lock:
+            return clave in self._estados
+
+    def obtener(self, clave: str):
+        with self._lock:
+            estado = self._estados.get(clave)
+            if estado is None:
+                self.misses += 1
+                return None
+            self._estados.move_to_end(clave)
+            self.hits += 1
+            return estado
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entradas": len(self._estados),
+                "max_entradas": self.max_entradas,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+estados = AlmacenEstados(config.REEVAL_MAX_ESTADOS)
+
+
+def diff_programas(antes: list, despues: list) -> list:
+    """
+    Diferencias paso a paso entre dos programas (listas de dicts):
+    [{"op": "cambia" | "agrega" | "quita", "antes": [...], "despues": [...]}].
+    """
+    a = [tuple(p[k] for k in sorted(p)) for p in antes]
+    b = [tuple(p[k] for k in sorted(p)) for p in despues]
+    cambios = []
+    for op, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if op == "equal":
+            continue
+        cambios.append({
+            "op": {"replace": "cambia", "insert": "agrega", "delete": "quita"}[op],
+            "antes": antes[i1:i2],
+            "despues": despues[j1:j2],
+        })
+    return cambios
+
+
+def _filas(t) -> list:
+    """
+    Filas crudas de una tabla como las entrega leer_celdas: vacíos como None
+    y floats enteros como int (una columna float64 los guarda como 1.0).
+    """
+    columnas = [
+        [None if pd.isna(v) else _convertir(v) for v in t[c].tolist()]
+        for c in t.columns
+    ]
+    return [list(fila) for fila in zip(*columnas)]
+
+
+def aplicar_parche(estado: Estado, parche: dict) -> tuple:
+    """
+    Aplica un parche de metadatos y/o celdas sobre los datos crudos:
+      {"metadatos": {"MANIOBRAS_MOTIVO": "..."},
+       "celdas": [{"tabla": "tubing_actual", "fila": 0,
+                   "columna": "COMENTARIO", "valor": "SACA EN DOBLE"}]}
+    `fila` es la posición en la tabla devuelta por /process/ (0 = primera).
+    Las tablas tocadas se rearman como en slice_table (una fila que queda
+    sin ELEMENTO desaparece). Devuelve (datos, ds, {tablas/campos cambiados}).
+    Lanza ValueError si el parche no es válido.
+    """
+    if not isinstance(parche, dict) or set(parche) - {"metadatos", "celdas"}:
+        raise ValueError("El parche admite solo 'metadatos' y 'celdas'.")
+
+    datos = dict(estado.datos)
+    cambios = set()
+
+    # 1) Metadatos
+    meta = parche.get("metadatos") or {}
+    if not isinstance(meta, dict):
+        raise ValueError("'metadatos' debe ser un objeto {campo: valor}.")
+    desconocidos = set(meta) - set(META_POS)
+    if desconocidos:
+        raise ValueError(f"Metadatos desconocidos: {', '.join(sorted(desconocidos))}")
+    nuevos_meta = None
+    if meta:
+        nuevos_meta = dict(datos["metadatos"])
+        for campo, valor in meta.items():
+            valor = _convertir(valor)
+            if nuevos_meta.get(campo) != valor:
+                nuevos_meta[campo] = valor
+                cambios.add(campo)
+        datos["metadatos"] = nuevos_meta
+
+    # 2) Celdas, agrupadas por tabla
+    por_tabla = {}
+    for celda in parche.get("celdas") or []:
+        try:
+            tabla, fila, columna = celda["tabla"], celda["fila"], celda["columna"]
+            valor = celda.get("valor")
+        except (TypeError, KeyError):
+            raise ValueError("Cada celda necesita 'tabla', 'fila', 'columna' y 'valor'.")
+        if tabla not in TABLAS:
+            raise ValueError(f"Tabla desconocida: {tabla}")
+        columnas = TABLAS[tabla][4]
+        columna = _ENCABEZADOS.get(columna, columna)
+        if columna not in columnas:
+            raise ValueError(f"La tabla {tabla} no tiene la columna {columna}.")
+        por_tabla.setdefault(tabla, []).append((fila, columnas.index(columna), _convertir(valor)))
+
+    tablas = {}
+    for tabla, celdas in por_tabla.items():
+        filas = _filas(datos[tabla])
+        for fila, j, valor in celdas:
+            if not isinstance(fila, int) or not 0 <= fila < len(filas):
+                raise ValueError(f"Fila fuera de rango en {tabla}: {fila} (tiene {len(filas)}).")
+            filas[fila][j] = valor
+        columnas = TABLAS[tabla][4]
+        nueva = slice_table(filas, 0, len(filas), 0, len(columnas), columnas)
+        if not nueva.equals(datos[tabla]):
+            datos[tabla] = tablas[tabla] = nueva
+            cambios.add(tabla)
+
+    ds = estado.ds.derivar(metadatos=nuevos_meta, tablas=tablas) if cambios else estado.ds
+    return datos, ds, cambios
+
+
+def _id_derivado(base: str, parche: dict) -> str:
+    canonico = json.dumps(parche, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{base}:{canonico}".encode("utf-8")).hexdigest()
+
+
+def _programa(modulos: dict) -> list:
+    return a_dicts([p for pasos in modulos.values() for p in pasos])
+
+
+def _desde_corpus(resultado_id: str):
+    """Estado reconstruido desde el snapshot del corpus (si está habilitado)."""
+    if corpus is None or not corpus.existe(resultado_id):
+        return None
+    datos = corpus.cargar(resultado_id)
+    datos = {k: datos[k] for k in ("metadatos", *TABLAS)}
+    ds = WellDatasheet.desde_datos(datos)
+    modulos, = completar([(ds, PLAN.evaluar(ds))])
+    estados.guardar(resultado_id, datos, ds, modulos)
+    return Estado(datos, ds, modulos)
+
+
+def reevaluar(resultado_id: str, parche: dict) -> dict:
+    """
+    Aplica `parche` al resultado `resultado_id` y recalcula solo los módulos
+    de reglas que leen lo que cambió. El nuevo estado queda guardado con
+    otro id, así los parches se pueden encadenar.
+    Lanza ResultadoNoDisponible si el resultado ya no está en memoria ni en
+    el corpus, y ValueError si el parche no es válido.
+    """
+    t0 = time.perf_counter()
+    estado = estados.obtener(resultado_id) or _desde_corpus(resultado_id)
+    if estado is None:
+        raise ResultadoNoDisponible(resultado_id)
+
+    datos, ds, cambios = aplicar_parche(estado, parche)
+    modulos, recalculados = PLAN.reevaluar(ds, estado.modulos, cambios)
+    # Los tiempos dependen de todo el datasheet: se re-estiman todos los pasos
+    modulos, = completar([(ds, modulos)])
+    nuevo_id = _id_derivado(resultado_id, parche)
+    estados.guardar(nuevo_id, datos, ds, modulos)
+
+    antes = _programa(estado.modulos)
+    despues = _programa(modulos)
+    return {
+        "resultado_id": nuevo_id,
+        "base_id": resultado_id,
+        "cambios": sorted(cambios),
+        "modulos_recalculados": recalculados,
+        "program": despues,
+        "diff": diff_programas(antes, despues),
+        "duracion_ms": round((time.perf_counter() - t0) * 1000, 3),
+    }
@@ -0,0 +1,122 @@
+# pulling-app/backend/app/replay.py
+"""
+Reproduce las reglas actuales sobre el corpus de snapshots, sin leer Excel.
+
+Uso (desde pulling-app/backend):
+    python -m app.replay --corpus /datos/corpus [--salida reporte.json]
+                         [--workers N] [--actualizar]
+
+Para cada pozo del corpus vuelve a correr build_program con el código de
+app/rules/* actual y lo compara con el programa guardado en el snapshot.
+El reporte lista los pozos cuyo programa cambió, con el detalle por paso.
+Con --actualizar los snapshots cambiados pasan a guardar el programa nuevo.
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import config
+from .cache import VERSION_REGLAS
+from .corpus import CorpusStore
+from .reevaluacion import diff_programas
+from .rules.catalogo import a_dicts
+from .rules.modelo import WellDatasheet
+from .rules.pipeline import build_program
+
+
+def reproducir(directorio: str, sha256: str, actualizar: bool = False) -> dict:
+    """Corre las reglas actuales sobre un snapshot (en un worker del pool)."""
+    store = CorpusStore(directorio)
+    try:
+        datos = store.cargar(sha256)
+    except Exception as e:
+        return {"sha256": sha256, "estado": "error", "error": f"Snapshot ilegible: {e}"}
+
+    base = {
+        "sha256": sha256,
+        "archivo": datos["archivo"],
+        "pozo": datos["metadatos"].get("POZO"),
+        "version_anterior": datos["version_reglas"],
+    }
+    try:
+        program = build_program(WellDatasheet.desde_datos(datos))
+    except Exception as e:
+        return {**base, "estado": "error", "error": str(e)}
+
+    # Solo se comparan las reglas: el tiempo estimado depende del modelo vigente
+    nuevo = a_dicts(program)
+    anterior = [{**p, "tiempo": ""} for p in datos["program"]]
+    cambios = diff_programas(anterior, nuevo)
+    if not cambios:
+        return {**base, "estado": "igual"}
+
+    if actualizar:
+        store.guardar(sha256, {**datos, "program": program}, datos["archivo"], reemplazar=True)
+    return {**base, "estado": "cambia", "pasos_antes": len(datos["program"]),
+            "pasos_despues": len(nuevo), "cambios": cambios}
+
+
+def _argumentos(argv=None):
+    p = argparse.ArgumentParser(prog="python -m app.replay", description=__doc__,
+                                formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--corpus", default=config.CORPUS_DIR,
+                   help="directorio del corpus (default: PULLING_CORPUS_DIR)")
+    p.add_argument("--salida", help="archivo JSON del reporte (default: stdout)")
+    p.add_argument("--workers", type=int, default=config.BATCH_WORKERS)
+    p.add_argument("--actualizar", action="store_true",
+                   help="guardar el programa nuevo en los snapshots que cambiaron")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _argumentos(argv)
+    if not args.corpus:
+        print("Falta --corpus (o PULLING_CORPUS_DIR).", file=sys.stderr)
+        return 2
+
+    # 1) Listar snapshots
+    claves = CorpusStore(args.corpus).claves()
+    t0 = time.perf_counter()
+
+    # 2) Reproducir en paralelo (cada worker lee su snapshot)
+    resultados = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futuros = pool.map(reproducir, [args.corpus] * len(claves), claves,
+                           [args.actualizar] * len(claves),
+                           chunksize=max(1, len(claves) // (args.workers * 4)))
+        for r in futuros:
+            resultados.append(r)
+
+    # 3) Reporte: solo pozos que cambiaron o fallaron
+    seg = time.perf_counter() - t0
+    conteo = {e: sum(r["estado"] == e for r in resultados) for e in ("igual", "cambia", "error")}
+    reporte = {
+        "version_reglas": VERSION_REGLAS,
+        "corpus": str(args.corpus),
+        "total": len(resultados),
+        "sin_cambios": conteo["igual"],
+        "cambiados": conteo["cambia"],
+        "errores": conteo["error"],
+        "segundos": round(seg, 3),
+        "pozos": [r for r in resultados if r["estado"] != "igual"],
+    }
+    texto = json.dumps(reporte, ensure_ascii=False, indent=2, default=str)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+
+    print(
+        f"{len(resultados)} pozos en {seg:.2f}s: {conteo['igual']} sin cambios, "
+        f"{conteo['cambia']} cambiados, {conteo['error']} con error.",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
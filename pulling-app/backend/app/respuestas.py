@@ -0,0 +1,131 @@
+# pulling-app/backend/app/respuestas.py
+
+import datetime as dt
+import json
+import math
+
+import numpy as np
+import pandas as pd
+from fastapi.responses import Response
+
+from .rules.catalogo import Paso
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa json de la stdlib
+    orjson = None
+
+
+def _registros(t: pd.DataFrame) -> list:
+    """Tabla anidada dentro de otro valor (no pasa en /process/): lista de registros."""
+    cols = list(t.columns)
+    return [dict(zip(cols, fila)) for fila in zip(*t.to_numpy(dtype=object).T.tolist())]
+
+
+def _default(obj):
+    """Tipos que el encoder no conoce: tablas, pasos, numpy y fechas."""
+    if isinstance(obj, pd.DataFrame):
+        return _registros(obj)
+    if isinstance(obj, Paso):
+        return obj.a_dict()
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, (pd.Timestamp, dt.datetime, dt.date, dt.time)):
+        return obj.isoformat()
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return None if np.isnan(obj) else float(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+
+def _sin_nan(obj):
+    """NaN → None, para reintentar con la stdlib un valor que trajo NaN fuera de las tablas."""
+    if isinstance(obj, float) and math.isnan(obj):
+        return None
+    if isinstance(obj, dict):
+        return {k: _sin_nan(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_sin_nan(v) for v in obj]
+    if isinstance(obj, (pd.DataFrame, Paso)):
+        return _sin_nan(_default(obj))
+    return obj
+
+
+def _codificar(obj) -> bytes:
+    """Un valor a JSON compacto con orjson o, si no está, con la stdlib."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    try:
+        texto = json.dumps(obj, ensure_ascii=False, default=_default, allow_nan=False, separators=(",", ":"))
+    except ValueError:
+        # La stdlib no escribe NaN como null: solo en ese caso se recorre el valor
+        texto = json.dumps(_sin_nan(obj), ensure_ascii=False, default=_default,
+                           allow_nan=False, separators=(",", ":"))
+    return texto.encode("utf-8")
+
+
+_NUMEROS = (int, float, bool)
+
+
+def _columna(valores: list) -> list:
+    """
+    Celdas de una columna ya en JSON, una por fila. Una columna numérica se
+    codifica con una sola llamada (NaN → null antes) y se corta por comas;
+    las de texto u objetos, celda por celda.
+    """
+    if valores and all(type(v) in _NUMEROS for v in valores):
+        return _codificar([None if v != v else v for v in valores])[1:-1].split(b",")
+    return [b"null" if isinstance(v, float) and v != v else _codificar(v) for v in valores]
+
+
+def _tabla(t: pd.DataFrame) -> bytes:
+    """
+    JSON de una tabla como lista de registros, armado por columnas: una
+    sola conversión del DataFrame y las filas pegando las celdas ya
+    codificadas, sin dicts ni to_dict intermedios.
+    """
+    claves = [_codificar(str(c)) + b":" for c in t.columns]
+    celdas = [_columna(valores) for valores in t.to_numpy(dtype=object).T.tolist()]
+    filas = [b"{" + b",".join([k + v for k, v in zip(claves, fila)]) + b"}" for fila in zip(*celdas)]
+    return b"[" + b",".join(filas) + b"]"
+
+
+def dumps_partes(obj: dict) -> dict:
+    """{campo: JSON (bytes) de su valor}; las tablas se serializan por columnas."""
+    return {k: _tabla(v) if isinstance(v, pd.DataFrame) else _codificar(v) for k, v in obj.items()}
+
+
+def unir(partes: dict) -> bytes:
+    """Objeto JSON a partir de {campo: valor ya serializado}, sin volver a codificar."""
+    return b"{" + b",".join([_codificar(str(k)) + b":" + v for k, v in partes.items()]) + b"}"
+
+
+def dumps(obj) -> bytes:
+    """
+    Serializa resultados con DataFrames, pasos y escalares numpy:
+    NaN → null, enteros/floats numpy nativos, fechas en ISO 8601.
+    Las tablas de primer nivel (resultado de /process/) se insertan ya
+    serializadas por columnas.
+    """
+    if isinstance(obj, dict) and any(isinstance(v, pd.DataFrame) for v in obj.values()):
+        return unir(dumps_partes(obj))
+    return _codificar(obj)
+
+
+def loads(datos: bytes):
+    """JSON (bytes) a objetos de Python, con orjson si está."""
+    return orjson.loads(datos) if orjson is not None else json.loads(datos)
+
+
+class ResultadoResponse(Response):
+    """Respuesta JSON que serializa directamente tablas y programas con `dumps`."""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        if isinstance(content, (bytes, bytearray)):
+            return bytes(content)
+        return dumps(content)
@@ -0,0 +1,141 @@
+# pulling-app/backend/app/rules/ancla.py
+
+import numpy as np
+
+# Cálculo de tensión y estiramiento para fijar el ancla de tubing.
+# Todas las funciones aceptan escalares o arrays de NumPy y devuelven
+# arrays con la forma del broadcast de los argumentos.
+
+COEF_POISSON = 0.3
+MODULO_YOUNG = 30_000_000       # psi
+COEF_EXPANSION = 0.0000069      # 1/°F
+GRADIENTE_FLUIDO = 0.5          # psi/ft
+CONV_PM = 3.28084               # ft por m
+TEMP_SUP = 30
+TEMP_MED = 15
+
+# Sin dato de nivel dinámico se asume 200 m por encima del ancla
+NIVEL_SOBRE_ANCLA_M = 200
+
+# Tope de escenarios por barrido (celdas de la grilla)
+MAX_ESCENARIOS = 1_000_000
+
+
+def area_tubing(diametro):
+    """Área (in²) a partir del diámetro del tubing (in)."""
+    # float_power usa pow() como el cálculo escalar (** 2 sobre arrays es x*x
+    # y puede diferir en el último bit)
+    return np.pi * np.float_power(np.asarray(diametro, dtype=float), 2) / 4
+
+
+def tension(profundidad_m, nivel_dinamico_m, diametro, temp_sup=TEMP_SUP,
+            temp_med=TEMP_MED, seccion_pared=0.0) -> tuple:
+    """
+    Tensión (lbs) y estiramiento (in) para fijar el ancla:
+      F1: efecto pistón/balloning por la columna de fluido hasta el nivel dinámico
+      F2: efecto térmico, E·α·ΔT/2·sección de pared (in²); 0 mientras no
+          se informe `seccion_pared`, como en el cálculo original
+      F3: pendiente de definir (0)
+    """
+    profundidad_m = np.asarray(profundidad_m, dtype=float)
+    nivel_dyn_ft = np.asarray(nivel_dinamico_m, dtype=float) * CONV_PM
+    area = area_tubing(diametro)
+
+    F1 = area * nivel_dyn_ft * GRADIENTE_FLUIDO * (
+        (COEF_POISSON * nivel_dyn_ft / profundidad_m) + (1 - 2 * COEF_POISSON)
+    )
+    F2 = MODULO_YOUNG * COEF_EXPANSION * ((np.asarray(temp_sup, dtype=float) - temp_med) / 2) * seccion_pared
+    F3 = 0
+    total = F1 + F2 - F3
+    estiramiento = 0.22 * (nivel_dyn_ft / 1000) * (total / 1000)
+    return total, estiramiento
+
+
+def _eje(nombre: str, valor, requerido: bool = True):
+    """Eje del barrido: lista de números o {"desde", "hasta", "paso"} (inclusive)."""
+    if valor is None:
+        if requerido:
+            raise ValueError(f"Falta '{nombre}'.")
+        return None
+    if isinstance(valor, dict):
+        try:
+            desde, hasta, paso = (float(valor[k]) for k in ("desde", "hasta", "paso"))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"'{nombre}' como rango necesita 'desde', 'hasta' y 'paso' numéricos.")
+        if paso <= 0 or hasta < desde:
+            raise ValueError(f"Rango inválido en '{nombre}'.")
+        n = int(np.floor((hasta - desde) / paso + 1e-9)) + 1
+        if n > MAX_ESCENARIOS:
+            raise ValueError(f"'{nombre}' tiene demasiados valores.")
+        return desde + paso * np.arange(n)
+    if isinstance(valor, (int, float)):
+        valor = [valor]
+    try:
+        eje = np.asarray(valor, dtype=float)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{nombre}' debe ser una lista de números.")
+    if eje.ndim != 1 or eje.size == 0 or not np.isfinite(eje).all():
+        raise ValueError(f"'{nombre}' debe ser una lista de números no vacía.")
+    return eje
+
+
+def barrido(parametros: dict) -> dict:
+    """
+    Evalúa la grilla completa profundidades × niveles × diámetros × temperaturas:
+      {"profundidades": [...] (m), "diametros": [...] (in),
+       "niveles": [...] (m, opcional: profundidad - 200),
+       "temperaturas": [...] (°C en superficie, opcional: 30),
+       "temp_media": 15, "seccion_pared": 0}
+    Cada eje es una lista o {"desde", "hasta", "paso"}. Devuelve los ejes,
+    la forma de la grilla y tensión/estiramiento como arrays anidados
+    en ese orden de ejes. Lanza ValueError si los parámetros no son válidos.
+    """
+    if not isinstance(parametros, dict):
+        raise ValueError("Se espera un objeto JSON con los ejes del barrido.")
+    desconocidos = set(parametros) - {
+        "profundidades", "niveles", "diametros", "temperaturas", "temp_media", "seccion_pared"}
+    if desconocidos:
+        raise ValueError(f"Parámetros desconocidos: {', '.join(sorted(desconocidos))}")
+
+    profundidades = _eje("profundidades", parametros.get("profundidades"))
+    diametros = _eje("diametros", parametros.get("diametros"))
+    niveles = _eje("niveles", parametros.get("niveles"), requerido=False)
+    temperaturas = _eje("temperaturas", parametros.get("temperaturas"), requerido=False)
+    if temperaturas is None:
+        temperaturas = np.array([float(TEMP_SUP)])
+    try:
+        temp_media = float(parametros.get("temp_media", TEMP_MED))
+        seccion_pared = float(parametros.get("seccion_pared", 0.0))
+    except (TypeError, ValueError):
+        raise ValueError("'temp_media' y 'seccion_pared' deben ser numéricos.")
+    if (profundidades <= 0).any():
+        raise ValueError("Las profundidades deben ser mayores a 0.")
+    if (diametros <= 0).any():
+        raise ValueError("Los diámetros deben ser mayores a 0.")
+
+    n_niveles = 1 if niveles is None else niveles.size
+    forma = (profundidades.size, n_niveles, diametros.size, temperaturas.size)
+    if np.prod(forma, dtype=np.int64) > MAX_ESCENARIOS:
+        raise ValueError(f"Demasiados escenarios ({int(np.prod(forma, dtype=np.int64))}); el máximo es {MAX_ESCENARIOS}.")
+
+    # Ejes como arrays broadcasteables: (P,1,1,1), (1,N,1,1), (1,1,D,1), (1,1,1,T)
+    prof = profundidades[:, None, None, None]
+    nivel = (prof - NIVEL_SOBRE_ANCLA_M) if niveles is None else niveles[None, :, None, None]
+    diam = diametros[None, None, :, None]
+    temp = temperaturas[None, None, None, :]
+    tension_lbs, estiramiento_in = tension(prof, nivel, diam, temp, temp_media, seccion_pared)
+    tension_lbs = np.broadcast_to(tension_lbs, forma)
+    estiramiento_in = np.broadcast_to(estiramiento_in, forma)
+
+    return {
+        "ejes": {
+            "profundidades": profundidades.tolist(),
+            "niveles": None if niveles is None else niveles.tolist(),
+            "diametros": diametros.tolist(),
+            "temperaturas": temperaturas.tolist(),
+        },
+        "orden": ["profundidades", "niveles", "diametros", "temperaturas"],
+        "forma": list(forma),
+        "tension_lbs": np.round(tension_lbs, 1).tolist(),
+        "estiramiento_in": np.round(estiramiento_in, 3).tolist(),
+    }
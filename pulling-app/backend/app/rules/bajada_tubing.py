@@ -1,8 +1,47 @@
-from pandas import DataFrame
 import pandas as pd
-import math
 
-def bajada_tubing(df: DataFrame) -> list:
+from . import ancla
+from .modelo import WellDatasheet
+from .diseno import cantidades, con_cantidad, opcional, primera_coincidencia, texto, unir
+from .registro import registrar
+from .catalogo import PH_BAJADA_TUBING, PH_BAJADA_TUBING_SHEAR_OUT, paso
+
+
+def profundidad_ancla(ds: WellDatasheet):
+    """
+    Profundidad de fijación del ancla en la instalación final de tubing:
+    ANCLA, si no ZAPATO, si no BOMBA. None si ninguna tiene profundidad.
+    """
+    section = ds.tubing_final
+    for mask in (
+        ds.igual("tubing_final", "elemento", "ANCLA"),
+        ds.igual("tubing_final", "elemento", "ZAPATO"),
+        ds.mascara("tubing_final", "elemento", "BOMBA"),
+    ):
+        rows = section[mask]
+        if not rows.empty and pd.notna(rows.iloc[0]["profundidad"]):
+            return float(rows.iloc[0]["profundidad"])
+    return None
+
+
+def tension_ancla(ds: WellDatasheet, anchor_depth: float) -> tuple:
+    """Tensión (lbs) y estiramiento (in) para fijar el ancla a `anchor_depth`."""
+    section = ds.tubing_final
+    tubing_rows = section[ds.igual("tubing_final", "elemento", "TUBING")]
+    diam = float(tubing_rows.iloc[0]["diametro"]) if not tubing_rows.empty else 0.0
+    nivel_dyn_m = anchor_depth - ancla.NIVEL_SOBRE_ANCLA_M
+    tension, estiramiento = ancla.tension(anchor_depth, nivel_dyn_m, diam)
+    return float(tension), float(estiramiento)
+
+@registrar(
+    "bajada_tubing", orden=30, puntos=(36, 49),
+    activar=lambda ds: ds.hay("tubing_final", "comentario", "BAJA"),
+    requiere=("tubing_final",),
+    tablas=("tubing_final",),
+    campos=("REQ_ESP_1", "REQ_ESP_2", "REQ_ESP_3", "REQ_ESP_4"),
+    mascaras=(("tubing_final", "comentario", "BAJA"),),
+)
+def bajada_tubing(ds: WellDatasheet) -> list:
     """
     Módulo BAJADA DE TUBING:
     – Se activa si en INSTALACIÓN FINAL TUBING hay 'BAJA' en COMENTARIO.
@@ -17,126 +56,46 @@ def bajada_tubing(df: DataFrame) -> list:
 
     program = []
 
-    # --- Extraer sección final de tubing ---
-    # Filtrar columnas de instalación final tubing
-    final_cols = df.filter(like="INSTALACIÓN FINAL TUBING").columns
-    section = df[final_cols].copy()
-    # Renombrar a nombres uniformes
-    col_map = {}
-    for c in section.columns:
-        uc = c.upper()
-        if "ELEMENTO" in uc:       col_map[c] = "elemento"
-        elif "CONDICIÓN" in uc:    col_map[c] = "condicion"
-        elif "DIÁMETRO" in uc:     col_map[c] = "diametro"
-        elif "PROFUNDIDAD" in uc:  col_map[c] = "profundidad"
-        elif "CANTIDAD" in uc:     col_map[c] = "cantidad"
-        elif "COMENTARIO" in uc:   col_map[c] = "comentario"
-    section.rename(columns=col_map, inplace=True)
+    # --- Sección final de tubing (columnas canónicas) ---
+    section = ds.tubing_final
 
     # Activación del módulo
-    if not section["comentario"].str.contains("BAJA", na=False).any():
+    if not ds.hay("tubing_final", "comentario", "BAJA"):
         return program
 
     # --- Maniobras obligatorias ---
-    program.append({
-        "manobra_normalizada": "ACONDICIONAMIENTO PARA BAJAR CAÑOS",
-        "punto_programa": 36,
-        "descripcion": "Completar pozo con ASDF y retirar BOP. Empaquetar pozo.",
-        "activity_phase": "SP04",
-        "activity_code": "SP16",
-        "activity_subcode": "256",
-        "tiempo": ""
-    })
-    program.append({
-        "manobra_normalizada": "BAJA TUBING",
-        "punto_programa": 37,
-        "descripcion": "Tareas generales durante la bajada de tubing.",
-        "activity_phase": "SP04",
-        "activity_code": "SP16",
-        "activity_subcode": "257",
-        "tiempo": ""
-    })
+    program.append(paso("ACONDICIONAMIENTO PARA BAJAR CAÑOS", 36))
+    program.append(paso("BAJA TUBING", 37))
 
     # Prefijo por ancla en cualquier maniobra de bajada
-    anchor_present = section["elemento"].str.upper().eq("ANCLA").any()
+    anchor_present = ds.igual("tubing_final", "elemento", "ANCLA").any()
     anchor_prefix = "Librar ANCLA. " if anchor_present else ""
 
     # Helper: construir diseño a bajar en orden inverso
     def build_design(df_sec: pd.DataFrame) -> str:
-        parts = []
-        for _, row in df_sec.iloc[::-1].iterrows():
-            elem = str(row["elemento"]).strip()
-            cant = int(row["cantidad"]) if pd.notna(row["cantidad"]) else None
-            dia = row.get("diametro")
-            cond = row.get("condicion")
-            prof = row.get("profundidad")
-            comm = str(row.get("comentario") or "")
-            if cant:
-                part = f"{cant} {elem}"
-                if pd.notna(dia):
-                    part += f" {dia}"
-                if elem.upper() == "ANCLA" and pd.notna(prof):
-                    part += f" EN {int(prof)}"
-                if pd.notna(cond) and elem.upper() != "ANCLA":
-                    part += f" {cond}"
-                # incluir comentario entre paréntesis (solo para 'BAJA EN ...')
-                if "BAJA" in comm.upper():
-                    part += f" ({comm})"
-                parts.append(part)
-        return " + ".join(parts)
+        es_ancla = df_sec["elemento_u"].eq("ANCLA")
+        partes = (
+            texto(cantidades(df_sec)) + " " + df_sec["elemento"]
+            + opcional(df_sec["diametro"])
+            + opcional(df_sec["profundidad"], " EN {}", cuando=es_ancla, convertir=int)
+            + opcional(df_sec["condicion"], cuando=~es_ancla)
+            # incluir comentario entre paréntesis (solo para 'BAJA EN ...')
+            + opcional(df_sec["comentario"], " ({})",
+                       cuando=df_sec["comentario_u"].str.contains("BAJA", regex=False))
+        )
+        return unir(partes, con_cantidad(df_sec), invertir=True)
 
     # --- BAJA TUBING DESAGOTANDO (M.1) ---
-    req_esp = str(df.iloc[0].get("REQUERIMIENTO ESPECIAL") or "").upper()
-    if "SACAR/BAJAR TUBING DESAGOTANDO" in req_esp:
+    if ds.desagotando:
         design = build_design(section)
 
-        # Determinar profundidad de ancla
-        anchor_row = section[section["elemento"].str.upper() == "ANCLA"]
-        if not anchor_row.empty and pd.notna(anchor_row.iloc[0]["profundidad"]):
-            anchor_depth = float(anchor_row.iloc[0]["profundidad"])
-        else:
-            # fallback zapato
-            zap = section[section["elemento"].str.upper() == "ZAPATO"]
-            if not zap.empty and pd.notna(zap.iloc[0]["profundidad"]):
-                anchor_depth = float(zap.iloc[0]["profundidad"])
-            else:
-                # fallback bomba
-                bomb = section[section["elemento"].str.upper().str.contains("BOMBA", na=False)]
-                if not bomb.empty and pd.notna(bomb.iloc[0]["profundidad"]):
-                    anchor_depth = float(bomb.iloc[0]["profundidad"])
-                else:
-                    raise ValueError(
-                        "No se detectó profundidad de ANCLA ni de ZAPATO ni de BOMBA; "
-                        "por favor indicar manualmente profundidad de ancla."
-                    )
-
-        # Cálculo de tensión y estiramiento
-        COEF_POISSON = 0.3
-        MODULO_YOUNG = 30_000_000
-        COEF_EXPANSION = 0.0000069
-        GRADIENTE_FLUIDO = 0.5
-        CONV_PM = 3.28084
-        NIV_EL_EST = 656.17
-        TEMP_SUP = 30
-        TEMP_MED = 15
-
-        nivel_dyn_m = anchor_depth - 200
-        nivel_dyn_ft = nivel_dyn_m * CONV_PM
-
-        tubing_rows = section[section["elemento"].str.upper() == "TUBING"]
-        if not tubing_rows.empty:
-            diam = float(tubing_rows.iloc[0]["diametro"])
-            area = math.pi * (diam ** 2) / 4
-        else:
-            area = 0
-
-        F1 = area * nivel_dyn_ft * GRADIENTE_FLUIDO * (
-            (COEF_POISSON * nivel_dyn_ft / anchor_depth) + (1 - 2 * COEF_POISSON)
-        )
-        F2 = MODULO_YOUNG * COEF_EXPANSION * ((TEMP_SUP - TEMP_MED) / 2) * area * 0  # pendiente definir sección paredes
-        F3 = 0  # pendiente cálculo exacto
-        tension = F1 + F2 - F3
-        estiramiento = 0.22 * (nivel_dyn_ft / 1000) * (tension / 1000)
+        anchor_depth = profundidad_ancla(ds)
+        if anchor_depth is None:
+            raise ValueError(
+                "No se detectó profundidad de ANCLA ni de ZAPATO ni de BOMBA; "
+                "por favor indicar manualmente profundidad de ancla."
+            )
+        tension, estiramiento = tension_ancla(ds, anchor_depth)
 
         desc = (
             f"{anchor_prefix}"
@@ -145,27 +104,15 @@ def bajada_tubing(df: DataFrame) -> list:
             "Asentar en OW observaciones significativas. "
             f"Fijar ancla con {tension:.0f} lbs y {estiramiento:.2f} in de estiramiento."
         )
-        program.append({
-            "manobra_normalizada": "BAJA TUBING DESAGOTANDO",
-            "punto_programa": 38,
-            "descripcion": desc,
-            "activity_phase": "SP04",
-            "activity_code": "SP16",
-            "activity_subcode": "257",
-            "tiempo": ""
-        })
+        program.append(paso("BAJA TUBING DESAGOTANDO", 38, desc))
 
     else:
         # --- M.2 Selección DOBLE / SIMPLE ---
         design = build_design(section)
-        mode = None
-        for comm in section["comentario"].str.upper():
-            if "BAJA EN DOBLE" in comm:
-                mode = "DOBLE"
-                break
-            if "BAJA EN SIMPLE" in comm:
-                mode = "SIMPLE"
-                break
+        mode = primera_coincidencia([
+            (ds.mascara("tubing_final", "comentario", "BAJA EN DOBLE"), "DOBLE"),
+            (ds.mascara("tubing_final", "comentario", "BAJA EN SIMPLE"), "SIMPLE"),
+        ])
         if mode:
             desc = (
                 f"{anchor_prefix}"
@@ -173,53 +120,19 @@ def bajada_tubing(df: DataFrame) -> list:
                 f"Bajar columna de tubing en tiro {mode.lower()}. Diseño a bajar: {design}. "
                 "Asentar en OW observaciones significativas."
             )
-            # agregar tensión de ancla si corresponde
-            if anchor_present:
-                # reusar tension/estiramiento previo o recalcular brevemente
+            # agregar tensión de ancla si corresponde (y hay profundidad de referencia)
+            anchor_depth = profundidad_ancla(ds) if anchor_present else None
+            if anchor_depth is not None:
+                tension, estiramiento = tension_ancla(ds, anchor_depth)
                 desc += f" Fijar ancla con {tension:.0f} lbs y {estiramiento:.2f} in de estiramiento."
-            program.append({
-                "manobra_normalizada": f"BAJA TUBING EN {mode}",
-                "punto_programa": 38,
-                "descripcion": desc,
-                "activity_phase": "SP04",
-                "activity_code": "SP16",
-                "activity_subcode": "257",
-                "tiempo": ""
-            })
+            program.append(paso(f"BAJA TUBING EN {mode}", 38, desc))
 
     # --- M.4 Finalización del módulo de bajada ---
     # ACONDICIONA PARA PH
-    program.append({
-        "manobra_normalizada": "ACONDICIONA PARA PH",
-        "punto_programa": 47,
-        "descripcion": "Acondicionar superficie para realizar prueba hidráulica.",
-        "activity_phase": "SP03",
-        "activity_code": "SP13",
-        "activity_subcode": "259",
-        "tiempo": ""
-    })
+    program.append(paso("ACONDICIONA PARA PH", 47))
     # PRUEBA DE HERMETICIDAD (variante si hay SHEAR OUT)
-    shear_present = section["elemento"].str.upper().eq("SHEAR OUT").any()
-    if shear_present:
-        descripcion_ph = (
-            "Realizar PH inicial, final 1000 psi. Expulsar SO de 4 pines con 2023 psi. "
-            "Junto a la prueba final, realizar prueba de funcionamiento de bomba. "
-            "Registrar la misma en OpenWells. Si la prueba es deficiente, informar a Supervisor de Pulling."
-        )
-    else:
-        descripcion_ph = (
-            "Realizar PH inicial, intermedia y final con 1000, 900 y 800 psi respectivamente. "
-            "Junto a la prueba final, realizar prueba de funcionamiento de bomba. "
-            "Registrar la misma en OpenWells. Si la prueba es deficiente, informar a Supervisor de Pulling."
-        )
-    program.append({
-        "manobra_normalizada": "PRUEBA DE HERMETICIDAD",
-        "punto_programa": 49,
-        "descripcion": descripcion_ph,
-        "activity_phase": "SP03",
-        "activity_code": "SP13",
-        "activity_subcode": "205",
-        "tiempo": ""
-    })
+    shear_present = ds.igual("tubing_final", "elemento", "SHEAR OUT").any()
+    descripcion_ph = PH_BAJADA_TUBING_SHEAR_OUT if shear_present else PH_BAJADA_TUBING
+    program.append(paso("PRUEBA DE HERMETICIDAD", 49, descripcion_ph))
 
     return program
@@ -1,7 +1,18 @@
-from pandas import DataFrame
 import pandas as pd
 
-def bajada_varillas(df: DataFrame) -> list:
+from .modelo import WellDatasheet
+from .diseno import cantidades, con_cantidad, opcional, texto, unir
+from .registro import registrar
+from .catalogo import PH_BAJADA_VARILLAS, paso
+
+@registrar(
+    "bajada_varillas", orden=40, puntos=(49, 54),
+    activar=lambda ds: ds.hay("varillas_final", "comentario", "BAJA"),
+    requiere=("varillas_final",),
+    tablas=("varillas_final",),
+    mascaras=(("varillas_final", "comentario", "BAJA"),),
+)
+def bajada_varillas(ds: WellDatasheet) -> list:
     """
     Módulo BAJADA DE VARILLAS:
     – Se activa si en INSTALACIÓN FINAL VARILLAS hay 'BAJA' en COMENTARIO.
@@ -14,96 +25,52 @@ def bajada_varillas(df: DataFrame) -> list:
 
     program = []
 
-    # --- Extraer tabla final de varillas ---
-    # Columnas esperadas
-    cols = [c for c in [
-        "ELEMENTO", "CONDICIÓN", "DIÁMETRO NOMINAL (in)",
-        "PROFUNDIDAD", "ACERO V/B", "CUPLA SH/FS", "ACERO CUPLA",
-        "CANTIDAD", "COMENTARIO"
-    ] if c in df.columns]
-    section = df[cols].copy()
+    # --- Tabla final de varillas ---
+    section = ds.varillas_final
 
     # Activación
-    if not section["COMENTARIO"].str.contains("BAJA", case=False, na=False).any():
+    if not ds.hay("varillas_final", "comentario", "BAJA"):
         return program
 
     # 1) ACONDICIONAMIENTO PARA BAJAR VARILLAS
-    program.append({
-        "manobra_normalizada": "ACONDICIONAMIENTO PARA  BAJAR VARILLAS",
-        "punto_programa": 50,
-        "descripcion": "Acondicionar boca de pozo, montar piso de trabajo + herramientas de v/b.",
-        "activity_phase": "SP04",
-        "activity_code": "SP16",
-        "activity_subcode": "254",
-        "tiempo": ""
-    })
+    program.append(paso("ACONDICIONAMIENTO PARA  BAJAR VARILLAS", 50))
 
     # 2) BAJA VARILLAS
-    program.append({
-        "manobra_normalizada": "BAJA VARILLAS",
-        "punto_programa": 51,
-        "descripcion": "Limpiar todas las conexiones con detergente biodegradable.",
-        "activity_phase": "SP04",
-        "activity_code": "SP16",
-        "activity_subcode": "255",
-        "tiempo": ""
-    })
+    program.append(paso("BAJA VARILLAS", 51))
 
     # --- L.1 Selección SIMPLE/DOBLE ---
     mode = None
-    for _, row in section.iterrows():
-        elem = str(row["ELEMENTO"]).upper()
-        if "VARILLA DE BOMBEO" in elem:
-            comm = str(row["COMENTARIO"] or "").upper()
-            if "BAJA EN DOBLE" in comm:
-                mode = "DOBLE"
-            elif "BAJA EN SIMPLE" in comm:
-                mode = "SIMPLE"
-            break
+    es_vb = ds.mascara("varillas_final", "elemento", "VARILLA DE BOMBEO")
+    if es_vb.any():
+        comm = section.loc[es_vb, "comentario_u"].iloc[0]
+        if "BAJA EN DOBLE" in comm:
+            mode = "DOBLE"
+        elif "BAJA EN SIMPLE" in comm:
+            mode = "SIMPLE"
     if not mode:
         # si no se encontró varilla de bombeo, no agregamos maniobra condicional
         mode = "SIMPLE"
 
     # Helper: construir diseño a bajar en orden inverso
     def build_design(sec: pd.DataFrame) -> str:
-        parts = []
-        for _, r in sec.iloc[::-1].iterrows():
-            cant = int(r["CANTIDAD"]) if pd.notna(r["CANTIDAD"]) else None
-            elem = str(r["ELEMENTO"]).strip()
-            cond = r.get("CONDICIÓN")
-            dia  = r.get("DIÁMETRO NOMINAL (in)")
-            prof = r.get("PROFUNDIDAD")
-            avb  = r.get("ACERO V/B")
-            csfs = r.get("CUPLA SH/FS")
-            ac   = r.get("ACERO CUPLA")
-            comm = str(r.get("COMENTARIO") or "")
-
-            if not cant:
-                continue
-
-            part = f"{cant} {elem}"
-            if elem.upper() == "BOMBA CONVENCIONAL INSERTABLE BM" and pd.notna(prof):
-                part += f" {int(prof)} mts"
-            else:
-                if pd.notna(cond):
-                    part += f" {cond}"
-                if pd.notna(dia):
-                    part += f" {dia}"
-                if pd.notna(avb):
-                    part += f" {avb}"
-                if pd.notna(csfs):
-                    part += f" {csfs}"
-                if pd.notna(ac):
-                    part += f" {ac}"
-            if comm:
-                part += f" ({comm})"
-            parts.append(part)
-        return " + ".join(parts)
+        prof = sec["profundidad"]
+        bomba = sec["elemento_u"].eq("BOMBA CONVENCIONAL INSERTABLE BM") & prof.notna()
+        partes = (
+            texto(cantidades(sec)) + " " + sec["elemento"]
+            + opcional(prof, " {} mts", cuando=bomba, convertir=int)
+            + opcional(sec["condicion"], cuando=~bomba)
+            + opcional(sec["diametro"], cuando=~bomba)
+            + opcional(sec["acero_vb"], cuando=~bomba)
+            + opcional(sec["cupla"], cuando=~bomba)
+            + opcional(sec["acero_cupla"], cuando=~bomba)
+            + opcional(sec["comentario"], " ({})", cuando=sec["comentario"].ne(""))
+        )
+        return unir(partes, con_cantidad(sec), invertir=True)
 
     design = build_design(section)
 
     # Condición: vincular on-off
-    vincular = section["ELEMENTO"].str.contains(r"ON-OFF|BBA\.TBG\.PUMP", case=False, na=False).any()
+    vincular = ds.hay("varillas_final", "elemento", r"ON-OFF|BBA\.TBG\.PUMP")
 
     # 3) BAJA VARILLAS EN DOBLE o EN SIMPLE
     desc = (
@@ -113,29 +80,9 @@ def bajada_varillas(df: DataFrame) -> list:
     )
     if vincular:
         desc += " vincular on-off."
-    program.append({
-        "manobra_normalizada": f"BAJA VARILLAS EN {mode}",
-        "punto_programa": 54,
-        "descripcion": desc,
-        "activity_phase": "SP04",
-        "activity_code": "SP16",
-        "activity_subcode": "255",
-        "tiempo": ""
-    })
+    program.append(paso(f"BAJA VARILLAS EN {mode}", 54, desc))
 
     # 4) PRUEBA DE HERMETICIDAD
-    program.append({
-        "manobra_normalizada": "PRUEBA DE HERMETICIDAD",
-        "punto_programa": 49,
-        "descripcion": (
-            "Realizar PH final con 1000, 900 y 800 psi respectivamente. "
-            "Junto a la prueba final, realizar prueba de funcionamiento de bomba. "
-            "Registrar la misma en OpenWells. Si la prueba es deficiente informar a Supervisor de Pulling."
-        ),
-        "activity_phase": "SP03",
-        "activity_code": "SP13",
-        "activity_subcode": "205",
-        "tiempo": ""
-    })
+    program.append(paso("PRUEBA DE HERMETICIDAD", 49, PH_BAJADA_VARILLAS))
 
     return program
@@ -0,0 +1,182 @@
+# pulling-app/backend/app/rules/catalogo.py
+
+from types import MappingProxyType
+from typing import NamedTuple
+
+
+class Maniobra(NamedTuple):
+    """Entrada inmutable del catálogo: códigos y texto fijo de una maniobra."""
+    manobra_normalizada: str
+    punto_programa: int
+    descripcion: str
+    activity_phase: str
+    activity_code: str
+    activity_subcode: str
+
+
+class Paso:
+    """
+    Paso de un programa: referencia a su entrada del catálogo más lo que
+    varía por pozo (descripción dinámica, tiempo). Se convierte al dict
+    de la API recién en el borde (a_dict).
+    """
+    __slots__ = ("maniobra", "_descripcion", "tiempo")
+
+    def __init__(self, maniobra: Maniobra, descripcion: str = None, tiempo: str = ""):
+        self.maniobra = maniobra
+        self._descripcion = descripcion
+        self.tiempo = tiempo
+
+    @property
+    def manobra_normalizada(self) -> str:
+        return self.maniobra.manobra_normalizada
+
+    @property
+    def punto_programa(self) -> int:
+        return self.maniobra.punto_programa
+
+    @property
+    def descripcion(self) -> str:
+        return self._descripcion if self._descripcion is not None else self.maniobra.descripcion
+
+    @property
+    def activity_phase(self) -> str:
+        return self.maniobra.activity_phase
+
+    @property
+    def activity_code(self) -> str:
+        return self.maniobra.activity_code
+
+    @property
+    def activity_subcode(self) -> str:
+        return self.maniobra.activity_subcode
+
+    def a_dict(self) -> dict:
+        m = self.maniobra
+        return {
+            "manobra_normalizada": m.manobra_normalizada,
+            "punto_programa": m.punto_programa,
+            "descripcion": self.descripcion,
+            "activity_phase": m.activity_phase,
+            "activity_code": m.activity_code,
+            "activity_subcode": m.activity_subcode,
+            "tiempo": self.tiempo,
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, Paso) and (
+            self.maniobra, self.descripcion, self.tiempo
+        ) == (other.maniobra, other.descripcion, other.tiempo)
+
+    def __repr__(self):
+        return f"Paso({self.manobra_normalizada!r}, {self.punto_programa})"
+
+
+# --- Textos fijos alternativos (variantes de la misma maniobra) ---
+PH_SACADA_TUBING = (
+    "Realizar PH con 1000, 900 y 800 psi respectivamente. "
+    "Informar si la misma es positiva si es necesario mover columna de tubing."
+)
+PH_BAJADA_TUBING = (
+    "Realizar PH inicial, intermedia y final con 1000, 900 y 800 psi respectivamente. "
+    "Junto a la prueba final, realizar prueba de funcionamiento de bomba. "
+    "Registrar la misma en OpenWells. Si la prueba es deficiente, informar a Supervisor de Pulling."
+)
+PH_BAJADA_TUBING_SHEAR_OUT = (
+    "Realizar PH inicial, final 1000 psi. Expulsar SO de 4 pines con 2023 psi. "
+    "Junto a la prueba final, realizar prueba de funcionamiento de bomba. "
+    "Registrar la misma en OpenWells. Si la prueba es deficiente, informar a Supervisor de Pulling."
+)
+PH_BAJADA_VARILLAS = (
+    "Realizar PH final con 1000, 900 y 800 psi respectivamente. "
+    "Junto a la prueba final, realizar prueba de funcionamiento de bomba. "
+    "Registrar la misma en OpenWells. Si la prueba es deficiente informar a Supervisor de Pulling."
+)
+
+# (manobra, punto, descripción fija o "" si es dinámica, fase, código, subcódigo)
+_ENTRADAS = [
+    # Inicio
+    ("EQUIPO EN TRANSPORTE", 1, "", "S01", "SP10", "200"),
+    ("MONTAJE EQUIPO", 2,
+     "Verificar presiones por directa y por entrecaño. Desarmar puente de producción. Montar equipo según procedimiento.",
+     "S01", "SP10", "201"),
+    ("CONTROL DE POZO", 3,
+     "Controlar presiones por directa y entrecaño, desplazamiento y emanaciones de gas de pozo.",
+     "SP05", "SP20", "220"),
+    ("DESARMA BDP", 4, "Desarmar BDP.", "SP03", "SP34", "210"),
+    ("ARMA HERRAMIENTA", 5, "Armar herramienta.", "SP04", "SP15", "209"),
+
+    # Sacada de varillas
+    ("ACONDICIONA PARA SACAR VARILLAS", 6,
+     "Acondicionar boca de pozo, montar piso de trabajo + htas de v/b. "
+     "Retirar vástago completo. Tomar peso de sarta, y registrar en OW.",
+     "SP03", "SP24", "250"),
+    ("SACA VARILLAS", 7, "Maniobras varias durante la sacada de varillas.", "SP03", "SP24", "251"),
+    ("CIRCULA", 8,
+     "Circular pozo, 2.5 veces la capacidad de tubing por directa hasta retorno limpio "
+     "para asegurar limpieza de los materiales extraídos. Si no se observa circulación "
+     "informar si es por punta de instalación obstruida o porque el pozo admite.",
+     "SP05", "SP20", "218"),
+    ("MANIOBRA HERRAMIENTA", 9, "Maniobrar sarta y herramientas.", "SP04", "SP18", "212"),
+    ("SACA VARILLAS EN PESCA", 10, "", "SP03", "SP24", "251"),
+    ("SACA VARILLAS EN PESCA EN DOBLE", 11, "", "SP03", "SP24", "251"),
+    ("SACA VARILLAS EN DOBLE", 13, "", "SP03", "SP24", "251"),
+    ("SACA VARILLAS EN SIMPLE", 13, "", "SP03", "SP24", "251"),
+    ("DESARMA HERRAMIENTA", 29, "Desarmar herramienta.", "SP03", "SP25", "229"),
+
+    # Sacada de tubing
+    ("ACONDICIONAMIENTO PARA SACAR CAÑOS", 15,
+     "Acondicionar boca de pozo, completar con ASDF, desempaquetar y montar conjunto BOP anular. "
+     "Montar piso de trabajo.",
+     "SP03", "SP24", "252"),
+    ("SACA TUBING", 16, "Tareas generales durante la sacada de tubing.", "SP03", "SP24", "253"),
+    ("SACA TUBING DESAGOTANDO", 17, "", "SP03", "SP24", "253"),
+    ("SACA TUBING EN DOBLE", 20, "", "SP03", "SP24", "253"),
+    ("SACA TUBING EN SIMPLE", 20, "", "SP03", "SP24", "253"),
+
+    # Bajada de tubing
+    ("ACONDICIONAMIENTO PARA BAJAR CAÑOS", 36,
+     "Completar pozo con ASDF y retirar BOP. Empaquetar pozo.", "SP04", "SP16", "256"),
+    ("BAJA TUBING", 37, "Tareas generales durante la bajada de tubing.", "SP04", "SP16", "257"),
+    ("BAJA TUBING DESAGOTANDO", 38, "", "SP04", "SP16", "257"),
+    ("BAJA TUBING EN DOBLE", 38, "", "SP04", "SP16", "257"),
+    ("BAJA TUBING EN SIMPLE", 38, "", "SP04", "SP16", "257"),
+
+    # Prueba hidráulica (compartidas por sacada/bajada)
+    ("ACONDICIONA PARA PH", 47,
+     "Acondicionar superficie para realizar prueba hidráulica.", "SP03", "SP13", "259"),
+    ("PRUEBA DE HERMETICIDAD", 49, PH_SACADA_TUBING, "SP03", "SP13", "205"),
+
+    # Bajada de varillas
+    ("ACONDICIONAMIENTO PARA  BAJAR VARILLAS", 50,
+     "Acondicionar boca de pozo, montar piso de trabajo + herramientas de v/b.",
+     "SP04", "SP16", "254"),
+    ("BAJA VARILLAS", 51, "Limpiar todas las conexiones con detergente biodegradable.", "SP04", "SP16", "255"),
+    ("BAJA VARILLAS EN DOBLE", 54, "", "SP04", "SP16", "255"),
+    ("BAJA VARILLAS EN SIMPLE", 54, "", "SP04", "SP16", "255"),
+
+    # Finalización
+    ("VARIOS", 58, "Tareas varias.", "SPV", "SPV", "SPV"),
+    ("ARMA BDP", 59, "Armar BDP.", "SP04", "SP15", "260"),
+    ("DESMONTA EQUIPO", 61,
+     "Acondicionar boca de pozo, material sobrante y locación, instalar rotador de varillas "
+     "y accesorios de superficie. Desmontar. Informar a Coordinación y Sala de Monitoreo de Pulling "
+     "la finalización de la intervención y transporte a próxima locación. Generar acta de entrega/recepción "
+     "de locación. Indicar si el puente de producción queda armado.",
+     "SP01", "SP11", "202"),
+]
+
+# Catálogo inmutable: (manobra_normalizada, punto_programa) → Maniobra
+CATALOGO = MappingProxyType({
+    (e[0], e[1]): Maniobra(*e) for e in _ENTRADAS
+})
+
+
+def paso(manobra: str, punto: int, descripcion: str = None) -> Paso:
+    """Crea un paso a partir de su entrada del catálogo (KeyError si no existe)."""
+    return Paso(CATALOGO[(manobra, punto)], descripcion)
+
+
+def a_dicts(program: list) -> list:
+    """Serializa una lista de pasos a la forma JSON de la API."""
+    return [p.a_dict() for p in program]
@@ -0,0 +1,87 @@
+# pulling-app/backend/app/rules/diseno.py
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame, Series
+
+# Helpers vectorizados para armar los textos "Diseño a extraer / a bajar".
+# Cada segmento se calcula por columna (Series de strings, "" donde no aplica)
+# y las partes se concatenan al final; no se recorren filas con iterrows().
+
+
+def cantidades(t: DataFrame) -> Series:
+    """CANTIDAD como int (None si la celda está vacía), igual que int(v)."""
+    cant = t["cantidad"]
+    valores = [int(v) if ok else None for v, ok in zip(cant.tolist(), cant.notna().tolist())]
+    return pd.Series(valores, index=cant.index, dtype=object)
+
+
+def con_cantidad(t: DataFrame) -> Series:
+    """Filas que entran al diseño: CANTIDAD con valor distinto de cero."""
+    return cantidades(t).map(bool)
+
+
+def texto(valores: Series) -> Series:
+    """Valores como texto, igual que en un f-string."""
+    return valores.map(lambda v: f"{v}")
+
+
+def opcional(valores: Series, formato: str = " {}", cuando: Series = None,
+             convertir=None) -> Series:
+    """
+    Segmento opcional: `formato` aplicado a cada valor con dato
+    (y donde `cuando` es True); "" en el resto de las filas.
+    `convertir` se aplica al valor antes de formatear (p.ej. int).
+    """
+    mask = valores.notna()
+    if cuando is not None:
+        mask &= cuando
+    seg = np.full(len(valores), "", dtype=object)
+    if mask.any():
+        sel = valores[mask]
+        if convertir is not None:
+            sel = sel.map(convertir)
+        seg[mask.to_numpy(dtype=bool)] = sel.map(formato.format).to_numpy(dtype=object)
+    return pd.Series(seg, index=valores.index, dtype=object)
+
+
+def segun(mask: Series, si: str, no: str = "") -> Series:
+    """Segmento fijo `si` donde `mask` es True, `no` en el resto."""
+    return mask.map({True: si, False: no}).astype(object)
+
+
+def tipo_conexion(comentario_u: Series, patron_simple: str, simple_si_contiene: bool = True) -> Series:
+    """
+    Etiqueta SIMPLE/DOBLE por fila según el comentario:
+    – simple_si_contiene=True:  SIMPLE si contiene `patron_simple`, si no DOBLE
+    – simple_si_contiene=False: DOBLE si contiene `patron_simple`, si no SIMPLE
+    """
+    contiene = comentario_u.str.contains(patron_simple, regex=False)
+    if simple_si_contiene:
+        return segun(contiene, "SIMPLE", "DOBLE")
+    return segun(contiene, "DOBLE", "SIMPLE")
+
+
+def unir(partes: Series, mask: Series = None, invertir: bool = False) -> str:
+    """Une con ' + ' las partes de las filas seleccionadas (orden inverso para bajada)."""
+    if mask is not None:
+        partes = partes[mask]
+    if invertir:
+        partes = partes.iloc[::-1]
+    return " + ".join(partes.tolist())
+
+
+def primera_coincidencia(opciones: list, defecto=None):
+    """
+    Devuelve el valor de la primera fila que cumple alguna máscara.
+    `opciones` es [(mask, valor), ...] en orden de prioridad dentro de
+    una misma fila (equivale al loop con break sobre las filas).
+    """
+    mejor = None
+    for mask, valor in opciones:
+        arr = mask.to_numpy(dtype=bool)
+        if arr.any():
+            pos = int(arr.argmax())
+            if mejor is None or pos < mejor[0]:
+                mejor = (pos, valor)
+    return mejor[1] if mejor else defecto
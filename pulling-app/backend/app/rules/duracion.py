@@ -0,0 +1,269 @@
+# pulling-app/backend/app/rules/duracion.py
+
+import os
+import pickle
+import sys
+import threading
+
+import numpy as np
+
+from .. import config
+from ..metricas import TIEMPOS_ESTIMADOS
+from .catalogo import CATALOGO, Paso
+from .modelo import TABLAS, WellDatasheet
+
+try:
+    import joblib
+except ImportError:   # sin joblib solo se pueden cargar artefactos pickle
+    joblib = None
+
+# Estimación del campo "tiempo" (horas) de cada paso. Todos los pasos de
+# uno o varios programas se convierten en una sola matriz de features y se
+# estiman con una única llamada a predict (o a las reglas de respaldo).
+
+COLUMNAS = (
+    "punto_programa",
+    "fase",             # índice de activity_phase en el catálogo (0 = desconocido)
+    "codigo",           # ídem activity_code
+    "subcodigo",        # ídem activity_subcode
+    "profundidad_m",    # profundidad máxima de la tabla que maniobra el paso
+    "cantidad",         # suma de CANTIDAD de esa tabla
+    "es_tubing",
+    "doble",
+    "simple",
+    "pesca",
+    "desagotando",
+)
+_C = {nombre: i for i, nombre in enumerate(COLUMNAS)}
+
+# Subcódigo → tabla que se saca/baja en ese paso
+TABLA_POR_SUBCODIGO = {
+    "250": "varillas_actual", "251": "varillas_actual",
+    "252": "tubing_actual",   "253": "tubing_actual",
+    "254": "varillas_final",  "255": "varillas_final",
+    "256": "tubing_final",    "257": "tubing_final",
+}
+
+# Vocabularios de los códigos del catálogo (orden alfabético, 1-based)
+_VOCABULARIO = {
+    campo: {v: i + 1 for i, v in enumerate(sorted({getattr(m, campo) for m in CATALOGO.values()}))}
+    for campo in ("activity_phase", "activity_code", "activity_subcode")
+}
+
+# --- Reglas de respaldo (sin modelo) ---
+# Horas fijas por subcódigo de actividad
+HORAS_BASE = {
+    "200": 3.0, "201": 2.0, "202": 2.0, "205": 1.0, "209": 0.5, "210": 0.5,
+    "212": 1.0, "218": 1.5, "220": 1.0, "229": 0.5, "250": 1.0, "251": 0.5,
+    "252": 1.5, "253": 0.5, "254": 1.0, "255": 0.5, "256": 1.0, "257": 0.5,
+    "259": 0.5, "260": 0.5, "SPV": 1.0,
+}
+HORAS_DEFECTO = 1.0
+
+# Minutos por unidad (tubo / varilla) en las maniobras de sacada y bajada
+MIN_POR_UNIDAD = {
+    (True, "SIMPLE"): 3.0, (True, "DOBLE"): 2.0,     # tubing
+    (False, "SIMPLE"): 1.5, (False, "DOBLE"): 1.0,   # varillas
+}
+FACTOR_DESAGOTANDO = 1.5
+FACTOR_PESCA = 1.3
+
+_BASE_POR_SUBCODIGO = np.array(
+    [HORAS_DEFECTO] + [HORAS_BASE.get(s, HORAS_DEFECTO) for s in _VOCABULARIO["activity_subcode"]]
+)
+
+
+def _valores(t, columna: str) -> list:
+    """Valores numéricos de la columna (se descartan vacíos y textos)."""
+    if columna not in t:
+        return []
+    valores = []
+    for v in t[columna].tolist():
+        try:
+            v = float(v)
+        except (TypeError, ValueError):
+            continue
+        if v == v:   # descarta NaN
+            valores.append(v)
+    return valores
+
+
+def _resumen_tablas(ds: WellDatasheet) -> dict:
+    """{tabla: (profundidad máxima, cantidad total)} con 0 donde no hay dato."""
+    resumen = {}
+    for nombre in TABLAS:
+        t = ds.tablas[nombre]
+        profundidades = _valores(t, "profundidad")
+        resumen[nombre] = (max(profundidades, default=0.0), float(sum(_valores(t, "cantidad"))))
+    return resumen
+
+
+def features(programas: list) -> np.ndarray:
+    """Matriz (pasos × COLUMNAS) de todos los pasos de [(ds, [Paso]), ...]."""
+    filas = []
+    for ds, pasos in programas:
+        resumen = _resumen_tablas(ds)
+        desagotando = float(ds.desagotando)
+        for p in pasos:
+            m = p.maniobra
+            tabla = TABLA_POR_SUBCODIGO.get(m.activity_subcode)
+            profundidad, cantidad = resumen[tabla] if tabla else (0.0, 0.0)
+            nombre = m.manobra_normalizada
+            filas.append((
+                m.punto_programa,
+                _VOCABULARIO["activity_phase"].get(m.activity_phase, 0),
+                _VOCABULARIO["activity_code"].get(m.activity_code, 0),
+                _VOCABULARIO["activity_subcode"].get(m.activity_subcode, 0),
+                profundidad,
+                cantidad,
+                float(tabla is not None and tabla.startswith("tubing")),
+                float("EN DOBLE" in nombre),
+                float("EN SIMPLE" in nombre),
+                float("PESCA" in nombre),
+                desagotando if "DESAGOTANDO" in nombre else 0.0,
+            ))
+    return np.array(filas, dtype=float).reshape(len(filas), len(COLUMNAS))
+
+
+def estimar_reglas(X: np.ndarray) -> np.ndarray:
+    """Horas por paso sin modelo: base por subcódigo + unidades × ritmo de maniobra."""
+    horas = _BASE_POR_SUBCODIGO[X[:, _C["subcodigo"]].astype(int)]
+    tubing = X[:, _C["es_tubing"]] == 1
+    doble = X[:, _C["doble"]] == 1
+    pesca = X[:, _C["pesca"]] == 1
+    desagotando = X[:, _C["desagotando"]] == 1
+
+    # Los pasos de pesca se sacan en doble; desagotando, al ritmo de simple
+    ritmo_doble = np.where(tubing, MIN_POR_UNIDAD[(True, "DOBLE")], MIN_POR_UNIDAD[(False, "DOBLE")])
+    ritmo_simple = np.where(tubing, MIN_POR_UNIDAD[(True, "SIMPLE")], MIN_POR_UNIDAD[(False, "SIMPLE")])
+    ritmo = np.where(doble | pesca, ritmo_doble, ritmo_simple)
+    ritmo = ritmo * np.where(desagotando, FACTOR_DESAGOTANDO, 1.0) * np.where(pesca, FACTOR_PESCA, 1.0)
+
+    viaje = doble | pesca | desagotando | (X[:, _C["simple"]] == 1)
+    return horas + np.where(viaje, X[:, _C["cantidad"]] * ritmo / 60, 0.0)
+
+
+class ModeloDuracion:
+    """
+    Artefacto del modelo (joblib/pickle) cargado una vez por proceso.
+    En cada uso se compara mtime y tamaño del archivo: si se reemplazó,
+    se vuelve a cargar sin reiniciar el servicio. El artefacto es el
+    estimador (con .predict) o un dict {"modelo", "version", "columnas"}.
+    """
+
+    def __init__(self, ruta: str = None):
+        self.ruta = ruta
+        self._firma = None
+        self._modelo = None
+        self.version = None
+        self.cargas = 0
+        self._lock = threading.Lock()
+
+    def _firma_actual(self):
+        if not self.ruta:
+            return None
+        try:
+            st = os.stat(self.ruta)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _cargar(self, firma) -> tuple:
+        if firma is None:
+            return None, None
+        try:
+            if joblib is not None:
+                artefacto = joblib.load(self.ruta)
+            else:
+                with open(self.ruta, "rb") as f:
+                    artefacto = pickle.load(f)
+            if isinstance(artefacto, dict):
+                modelo = artefacto["modelo"]
+                columnas = tuple(artefacto.get("columnas") or COLUMNAS)
+                version = str(artefacto.get("version") or f"{firma[0]:x}")
+            else:
+                modelo, columnas, version = artefacto, COLUMNAS, f"{firma[0]:x}"
+            if columnas != COLUMNAS:
+                raise ValueError(f"el modelo espera las columnas {list(columnas)}")
+            if not hasattr(modelo, "predict"):
+                raise ValueError("el artefacto no tiene predict()")
+        except Exception as e:
+            print(f"Modelo de duración {self.ruta} no utilizable ({e}); se usan las reglas.",
+                  file=sys.stderr)
+            return None, None
+        self.cargas += 1
+        return modelo, version
+
+    def obtener(self) -> tuple:
+        """(modelo, versión) vigentes, o (None, None) si no hay modelo utilizable."""
+        firma = self._firma_actual()
+        if firma != self._firma:
+            with self._lock:
+                if firma != self._firma:
+                    self._modelo, self.version = self._cargar(firma)
+                    self._firma = firma
+        return self._modelo, self.version
+
+
+modelo = ModeloDuracion(config.MODELO_DURACION)
+
+
+def estimar(programas: list) -> tuple:
+    """
+    Horas de cada paso de [(ds, [Paso]), ...] con una sola predicción para
+    todos. Devuelve ([array de horas por programa], origen), con origen
+    "modelo:<versión>" o "reglas".
+    """
+    X = features(programas)
+    estimador, version = modelo.obtener()
+    horas, origen = None, "reglas"
+    if estimador is not None and len(X):
+        try:
+            horas = np.asarray(estimador.predict(X), dtype=float).reshape(-1)
+            origen = f"modelo:{version}"
+        except Exception as e:
+            print(f"Error del modelo de duración ({e}); se usan las reglas.", file=sys.stderr)
+            horas = None
+    if horas is None or len(horas) != len(X) or not np.isfinite(horas).all():
+        horas, origen = estimar_reglas(X), "reglas"
+    horas = np.clip(horas, 0, None)
+    TIEMPOS_ESTIMADOS.sumar(origen.split(":")[0], valor=len(X))
+
+    cortes = np.cumsum([len(pasos) for _, pasos in programas])[:-1]
+    return np.split(horas, cortes), origen
+
+
+def formatear(horas: float) -> str:
+    return f"{horas:.1f}"
+
+
+def completar(evaluados: list) -> list:
+    """
+    Copia de cada {módulo: [Paso]} de [(ds, modulos), ...] con el tiempo
+    estimado. No modifica los pasos originales: las re-evaluaciones
+    comparten pasos entre estados.
+    """
+    programas = [(ds, [p for pasos in modulos.values() for p in pasos]) for ds, modulos in evaluados]
+    if not programas:
+        return []
+    por_programa, _ = estimar(programas)
+    completos = []
+    for (_, modulos), horas in zip(evaluados, por_programa):
+        it = iter(horas.tolist())
+        completos.append({
+            nombre: [Paso(p.maniobra, p._descripcion, formatear(next(it))) for p in pasos]
+            for nombre, pasos in modulos.items()
+        })
+    return completos
+
+
+def info() -> dict:
+    estimador, version = modelo.obtener()
+    return {
+        "ruta": modelo.ruta,
+        "origen": "modelo" if estimador is not None else "reglas",
+        "version": version,
+        "cargas": modelo.cargas,
+        "joblib": joblib is not None,
+        "columnas": list(COLUMNAS),
+    }
@@ -0,0 +1,191 @@
+# pulling-app/backend/app/rules/modelo.py
+
+import re
+from functools import cached_property
+
+import pandas as pd
+from pandas import DataFrame
+
+# Nombres canónicos de columnas (los mismos para las 4 tablas)
+COLUMNAS_CANONICAS = {
+    "ELEMENTO":          "elemento",
+    "CONDICIÓN":         "condicion",
+    "DIÁMETRO":          "diametro",
+    "PROFUNDIDAD":       "profundidad",
+    "CANTIDAD":          "cantidad",
+    "COMENTARIO":        "comentario",
+    "LONGITUD ELEMENTO": "longitud",
+    "ACERO V/B":         "acero_vb",
+    "CUPLA SH/FS":       "cupla",
+    "ACERO CUPLA":       "acero_cupla",
+}
+
+TABLAS = ("tubing_actual", "tubing_final", "varillas_actual", "varillas_final")
+
+
+def _texto(valor) -> str:
+    """Valor de celda como texto; vacío si la celda no tiene dato."""
+    if valor is None or (isinstance(valor, float) and pd.isna(valor)):
+        return ""
+    return str(valor).strip()
+
+
+def _numero(valor):
+    try:
+        return None if _texto(valor) == "" else float(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _entero(valor):
+    numero = _numero(valor)
+    return int(numero) if numero is not None else None
+
+
+def normalizar_tabla(t: DataFrame) -> DataFrame:
+    """
+    Renombra a columnas canónicas y agrega las versiones de texto:
+    – elemento:     texto sin espacios en los extremos
+    – comentario:   texto, "" si la celda está vacía
+    – elemento_u / comentario_u: mismas columnas en mayúsculas
+    """
+    t = t.rename(columns=COLUMNAS_CANONICAS).reset_index(drop=True)
+    for col in ("elemento", "comentario"):
+        if col not in t.columns:
+            t[col] = ""
+        t[col] = t[col].map(_texto).astype(object)
+        t[f"{col}_u"] = t[col].str.upper()
+    return t
+
+
+class WellDatasheet:
+    """
+    Datasheet normalizado de un pozo, construido una sola vez por request
+    y compartido por todos los módulos de reglas:
+    – metadatos como campos tipados
+    – las 4 tablas con columnas canónicas y texto en mayúsculas
+    – máscaras booleanas cacheadas (cada búsqueda se calcula una vez)
+    """
+
+    def __init__(self, metadatos: dict, tablas: dict):
+        self._cargar_metadatos(metadatos)
+        self.tablas = {nombre: normalizar_tabla(tablas[nombre]) for nombre in TABLAS}
+        self._mascaras = {}
+
+    def _cargar_metadatos(self, metadatos: dict) -> None:
+        self.metadatos = dict(metadatos)
+        self.pozo = _texto(metadatos.get("POZO"))
+        self.bateria = _texto(metadatos.get("BATERIA"))
+        self.equipo = _texto(metadatos.get("EQUIPO"))
+        self.neta_asociada = _numero(metadatos.get("NETA_ASOCIADA"))
+        self.definicion = _texto(metadatos.get("DEFINICION"))
+        self.motivo = _texto(metadatos.get("MANIOBRAS_MOTIVO"))
+        self.prioridad = _entero(metadatos.get("PRIORIDAD_PROGRAMA"))
+        self.antecedentes = [
+            _texto(metadatos.get(f"ANTECEDENTE_{i}"))
+            for i in range(1, 5) if _texto(metadatos.get(f"ANTECEDENTE_{i}"))
+        ]
+        self.requerimientos = [
+            _texto(metadatos.get(f"REQ_ESP_{i}"))
+            for i in range(1, 5) if _texto(metadatos.get(f"REQ_ESP_{i}"))
+        ]
+
+    @classmethod
+    def desde_datos(cls, datos: dict) -> "WellDatasheet":
+        """Construye el modelo a partir de la salida de datasheet.read_datasheet."""
+        return cls(datos["metadatos"], {nombre: datos[nombre] for nombre in TABLAS})
+
+    def derivar(self, metadatos: dict = None, tablas: dict = None) -> "WellDatasheet":
+        """
+        Copia con metadatos y/o algunas tablas (crudas) reemplazados.
+        Las tablas que no cambian se reutilizan ya normalizadas y con sus
+        máscaras; las condiciones derivadas de metadatos se recalculan.
+        """
+        tablas = tablas or {}
+        nuevo = object.__new__(type(self))
+        nuevo._cargar_metadatos(self.metadatos if metadatos is None else metadatos)
+        nuevo.tablas = dict(self.tablas)
+        for nombre, t in tablas.items():
+            nuevo.tablas[nombre] = normalizar_tabla(t)
+        nuevo._mascaras = {k: v for k, v in self._mascaras.items() if k[0] not in tablas}
+        return nuevo
+
+    # --- Tablas ---
+    @property
+    def tubing_actual(self) -> DataFrame:
+        return self.tablas["tubing_actual"]
+
+    @property
+    def tubing_final(self) -> DataFrame:
+        return self.tablas["tubing_final"]
+
+    @property
+    def varillas_actual(self) -> DataFrame:
+        return self.tablas["varillas_actual"]
+
+    @property
+    def varillas_final(self) -> DataFrame:
+        return self.tablas["varillas_final"]
+
+    # --- Máscaras cacheadas ---
+    def mascara(self, tabla: str, columna: str, patron: str) -> pd.Series:
+        """
+        Filas de `tabla` cuya `columna` (elemento/comentario, en mayúsculas)
+        contiene el patrón regex `patron` (también en mayúsculas).
+        """
+        clave = (tabla, columna, patron)
+        if clave not in self._mascaras:
+            serie = self.tablas[tabla][f"{columna}_u"]
+            self._mascaras[clave] = serie.str.contains(patron, regex=True)
+        return self._mascaras[clave]
+
+    def precalcular(self, busquedas) -> None:
+        """
+        Calcula todas las máscaras (tabla, columna, patrón) pedidas recorriendo
+        cada columna una sola vez, evaluando todos sus patrones por valor.
+        """
+        grupos = {}
+        for tabla, columna, patron in busquedas:
+            if (tabla, columna, patron) not in self._mascaras:
+                grupos.setdefault((tabla, columna), []).append(patron)
+
+        for (tabla, columna), patrones in grupos.items():
+            serie = self.tablas[tabla][f"{columna}_u"]
+            regexes = [re.compile(p) for p in patrones]
+            filas = [[rx.search(v) is not None for rx in regexes] for v in serie.tolist()]
+            for j, patron in enumerate(patrones):
+                self._mascaras[(tabla, columna, patron)] = pd.Series(
+                    [f[j] for f in filas], index=serie.index, dtype=bool
+                )
+
+    def igual(self, tabla: str, columna: str, valor: str) -> pd.Series:
+        """Filas de `tabla` cuya `columna` en mayúsculas es exactamente `valor`."""
+        clave = (tabla, columna, "==" + valor)
+        if clave not in self._mascaras:
+            self._mascaras[clave] = self.tablas[tabla][f"{columna}_u"].eq(valor)
+        return self._mascaras[clave]
+
+    def hay(self, tabla: str, columna: str, patron: str) -> bool:
+        return bool(self.mascara(tabla, columna, patron).any())
+
+    def hay_en_actual(self, patron: str) -> bool:
+        """Patrón en cualquier texto de INSTALACIÓN ACTUAL (tubing o varillas)."""
+        return any(
+            self.hay(tabla, columna, patron)
+            for tabla in ("tubing_actual", "varillas_actual")
+            for columna in ("elemento", "comentario")
+        )
+
+    # --- Condiciones derivadas de metadatos ---
+    @cached_property
+    def es_bm(self) -> bool:
+        return "BM" in self.definicion.upper() or "BM" in self.motivo.upper()
+
+    @cached_property
+    def es_pesca_varilla(self) -> bool:
+        return "PESCA DE VARILLA" in self.motivo.upper()
+
+    @cached_property
+    def desagotando(self) -> bool:
+        """Requerimiento especial 'SACAR/BAJAR TUBING DESAGOTANDO'."""
+        return any("SACAR/BAJAR TUBING DESAGOTANDO" in r.upper() for r in self.requerimientos)
@@ -0,0 +1,144 @@
+# pulling-app/backend/app/rules/registro.py
+
+from typing import Callable, NamedTuple, Optional
+
+from ..metricas import MODULOS, REGLA_SEG, etapa
+from .modelo import WellDatasheet
+
+
+class Regla(NamedTuple):
+    """
+    Declaración de un módulo de reglas:
+    – nombre:     identificador del módulo
+    – orden:      posición en el programa (menor = antes)
+    – puntos:     rango (min, max) de punto_programa que genera
+    – construir:  función ds → lista de maniobras
+    – activar:    predicado ds → bool (None = siempre activo)
+    – requiere:   tablas que deben tener filas; si alguna está vacía
+                  el módulo se saltea sin evaluar el predicado
+    – tablas:     tablas del datasheet que lee
+    – campos:     metadatos que lee (claves de datasheet.META_POS)
+    – mascaras:   búsquedas (tabla, columna, patrón) que usa el predicado,
+                  precalculadas en una sola pasada por el plan
+    """
+    nombre: str
+    orden: int
+    puntos: tuple
+    construir: Callable
+    activar: Optional[Callable] = None
+    requiere: tuple = ()
+    tablas: tuple = ()
+    campos: tuple = ()
+    mascaras: tuple = ()
+
+
+_REGLAS = {}
+
+
+def registrar(nombre: str, orden: int, puntos: tuple, activar=None,
+              requiere=(), tablas=(), campos=(), mascaras=()):
+    """Decorador: registra la función como módulo de reglas del programa."""
+    def decorador(fn):
+        _REGLAS[nombre] = Regla(
+            nombre=nombre, orden=orden, puntos=tuple(puntos), construir=fn,
+            activar=activar, requiere=tuple(requiere), tablas=tuple(tablas),
+            campos=tuple(campos), mascaras=tuple(mascaras),
+        )
+        return fn
+    return decorador
+
+
+def reglas() -> list:
+    """Reglas registradas, en orden de programa."""
+    return sorted(_REGLAS.values(), key=lambda r: (r.orden, r.nombre))
+
+
+class PlanEvaluacion:
+    """
+    Plan compilado a partir del registro: reglas ordenadas y el conjunto
+    de búsquedas que necesitan sus predicados. Al evaluar, primero se
+    calculan todas las máscaras (una pasada por columna) y luego se
+    deciden y construyen los módulos.
+    """
+
+    def __init__(self, lista: list):
+        self.reglas = tuple(lista)
+        vistas = dict.fromkeys(m for r in self.reglas for m in r.mascaras)
+        self.mascaras = tuple(vistas)
+
+    @staticmethod
+    def _aplica(regla: Regla, ds: WellDatasheet) -> bool:
+        if any(ds.tablas[t].empty for t in regla.requiere):
+            return False
+        return regla.activar is None or bool(regla.activar(ds))
+
+    def activas(self, ds: WellDatasheet) -> list:
+        """Reglas que aplican a este datasheet, en orden."""
+        ds.precalcular(self.mascaras)
+        return [regla for regla in self.reglas if self._aplica(regla, ds)]
+
+    def dependientes(self, cambios) -> list:
+        """
+        Reglas afectadas por un cambio en `cambios` (nombres de tablas y/o
+        claves de metadatos), según lo que cada una declara leer.
+        """
+        cambios = set(cambios)
+        return [
+            regla for regla in self.reglas
+            if cambios & (set(regla.tablas) | set(regla.campos) | set(regla.requiere))
+        ]
+
+    def evaluar(self, ds: WellDatasheet) -> dict:
+        """
+        Maniobras por módulo activo: {nombre: [maniobras]} en orden.
+        Mide el plan y cada módulo (ver metricas.etapa).
+        """
+        with etapa("plan"):
+            activas = self.activas(ds)
+        resultado = {}
+        for regla in activas:
+            MODULOS.sumar(regla.nombre)
+            with etapa(regla.nombre, REGLA_SEG):
+                resultado[regla.nombre] = regla.construir(ds)
+        return resultado
+
+    def reevaluar(self, ds: WellDatasheet, anterior: dict, cambios) -> tuple:
+        """
+        Re-evalúa solo las reglas que dependen de `cambios`; el resto
+        conserva sus maniobras de `anterior` ({nombre: [maniobras]}).
+        Devuelve ({nombre: [maniobras]} en orden, [nombres recalculados]).
+        """
+        afectadas = self.dependientes(cambios)
+        nombres = {r.nombre for r in afectadas}
+        ds.precalcular(tuple(dict.fromkeys(m for r in afectadas for m in r.mascaras)))
+
+        resultado = {}
+        for regla in self.reglas:
+            if regla.nombre not in nombres:
+                if regla.nombre in anterior:
+                    resultado[regla.nombre] = anterior[regla.nombre]
+                continue
+            if self._aplica(regla, ds):
+                MODULOS.sumar(regla.nombre)
+                with etapa(regla.nombre, REGLA_SEG):
+                    resultado[regla.nombre] = regla.construir(ds)
+        return resultado, [r.nombre for r in afectadas]
+
+    def describir(self) -> list:
+        return [
+            {
+                "nombre": r.nombre,
+                "orden": r.orden,
+                "puntos": list(r.puntos),
+                "condicional": r.activar is not None,
+                "requiere": list(r.requiere),
+                "tablas": list(r.tablas),
+                "campos": list(r.campos),
+                "mascaras": [list(m) for m in r.mascaras],
+            }
+            for r in self.reglas
+        ]
+
+
+def compilar_plan() -> PlanEvaluacion:
+    return PlanEvaluacion(reglas())
@@ -1,9 +1,19 @@
 # backend/app/rules/sacada_tubing.py
 
-import pandas as pd
-from pandas import DataFrame
-
-def sacada_tubing(df: DataFrame) -> list:
+from .modelo import WellDatasheet
+from .diseno import cantidades, con_cantidad, opcional, primera_coincidencia, texto, tipo_conexion, unir
+from .registro import registrar
+from .catalogo import paso
+
+@registrar(
+    "sacada_tubing", orden=20, puntos=(15, 49),
+    activar=lambda ds: ds.hay("tubing_actual", "comentario", "SACA"),
+    requiere=("tubing_actual",),
+    tablas=("tubing_actual",),
+    campos=("REQ_ESP_1", "REQ_ESP_2", "REQ_ESP_3", "REQ_ESP_4"),
+    mascaras=(("tubing_actual", "comentario", "SACA"),),
+)
+def sacada_tubing(ds: WellDatasheet) -> list:
     """
     Módulo SACADA DE TUBING:
     – Se activa si hay 'SACA' en comentarios de INSTALACIÓN ACTUAL TUBING.
@@ -20,96 +30,48 @@ def sacada_tubing(df: DataFrame) -> list:
     """
 
     # 0) Filtrar tubing a sacar
-    mask = df["COMENTARIO"].str.contains("SACA", case=False, na=False)
-    tubing_rows = df.loc[mask, ["ELEMENTO", "DIÁMETRO (in)", "CANTIDAD", "COMENTARIO"]]
+    instal = ds.tubing_actual
+    tubing_rows = instal[ds.mascara("tubing_actual", "comentario", "SACA")]
     if tubing_rows.empty:
         return []
 
     program = []
 
     # Detectar ANCLA
-    anchor_present = df["ELEMENTO"].str.contains("ANCLA", case=False, na=False).any()
+    anchor_present = ds.hay("tubing_actual", "elemento", "ANCLA")
     anchor_prefix = "Librar ANCLA. " if anchor_present else ""
 
     # 1) ACONDICIONA PARA PH
-    program.append({
-        "manobra_normalizada": "ACONDICIONA PARA PH",
-        "punto_programa": 47,
-        "descripcion": "Acondicionar superficie para realizar prueba hidráulica.",
-        "activity_phase": "SP03",
-        "activity_code": "SP13",
-        "activity_subcode": "259",
-        "tiempo": ""
-    })
+    program.append(paso("ACONDICIONA PARA PH", 47))
 
     # 2) PRUEBA DE HERMETICIDAD
-    program.append({
-        "manobra_normalizada": "PRUEBA DE HERMETICIDAD",
-        "punto_programa": 49,
-        "descripcion": (
-            "Realizar PH con 1000, 900 y 800 psi respectivamente. "
-            "Informar si la misma es positiva si es necesario mover columna de tubing."
-        ),
-        "activity_phase": "SP03",
-        "activity_code": "SP13",
-        "activity_subcode": "205",
-        "tiempo": ""
-    })
+    program.append(paso("PRUEBA DE HERMETICIDAD", 49))
 
     # 3) ACONDICIONAMIENTO PARA SACAR CAÑOS
-    program.append({
-        "manobra_normalizada": "ACONDICIONAMIENTO PARA SACAR CAÑOS",
-        "punto_programa": 15,
-        "descripcion": (
-            "Acondicionar boca de pozo, completar con ASDF, desempaquetar y montar conjunto BOP anular. "
-            "Montar piso de trabajo."
-        ),
-        "activity_phase": "SP03",
-        "activity_code": "SP24",
-        "activity_subcode": "252",
-        "tiempo": ""
-    })
+    program.append(paso("ACONDICIONAMIENTO PARA SACAR CAÑOS", 15))
 
     # 4) SACA TUBING
-    program.append({
-        "manobra_normalizada": "SACA TUBING",
-        "punto_programa": 16,
-        "descripcion": "Tareas generales durante la sacada de tubing.",
-        "activity_phase": "SP03",
-        "activity_code": "SP24",
-        "activity_subcode": "253",
-        "tiempo": ""
-    })
+    program.append(paso("SACA TUBING", 16))
 
     # Construir diseño para cualquier rama
     def build_design(rows):
-        parts = []
-        for _, row in rows.iterrows():
-            elem = str(row["ELEMENTO"]).strip()
-            cant = int(row["CANTIDAD"]) if pd.notna(row["CANTIDAD"]) else None
-            dia = row["DIÁMETRO (in)"]
-            com = str(row["COMENTARIO"] or "")
-            if cant:
-                part = f"{cant} {elem}"
-                if pd.notna(dia):
-                    part += f" {dia}"
-                # Para DESAGOTANDO: tipo conexión si "SACA" en comentario
-                if "SACA" in com.upper():
-                    tipo = "DOBLE" if "DOBLE" in com.upper() else "SIMPLE"
-                    part += f" EN {tipo}"
-                parts.append(part)
-        return " + ".join(parts)
+        com = rows["comentario_u"]
+        partes = (
+            texto(cantidades(rows)) + " " + rows["elemento"]
+            + opcional(rows["diametro"])
+            # Para DESAGOTANDO: tipo conexión si "SACA" en comentario
+            + opcional(tipo_conexion(com, "DOBLE", simple_si_contiene=False), " EN {}",
+                       cuando=com.str.contains("SACA", regex=False))
+        )
+        return unir(partes, con_cantidad(rows))
 
     # 5.a) SACA TUBING DESAGOTANDO
-    req_esp = str(df.iloc[0].get("REQUERIMIENTO ESPECIAL") or "").upper()
-    if "SACAR/BAJAR TUBING DESAGOTANDO" in req_esp:
+    if ds.desagotando:
         # usar todas las filas de tubing actual para el diseño
-        all_rows = df.loc[:, ["ELEMENTO", "DIÁMETRO (in)", "CANTIDAD", "COMENTARIO"]]
-        design = build_design(all_rows)
-        program.append({
-            "manobra_normalizada": "SACA TUBING DESAGOTANDO",
-            "punto_programa": 17,
-            "descripcion": (
+        design = build_design(instal)
+        program.append(paso(
+            "SACA TUBING DESAGOTANDO", 17,
+            (
                 f"{anchor_prefix}"
                 "Desplazar por directa para sacar sarta limpia. "
                 "Sacar sarta de tubing desagotando con copa de pistoneo, buscando pérdida y completando pozo. "
@@ -122,21 +84,9 @@ def sacada_tubing(df: DataFrame) -> list:
                 "Solicitar envío de bomba a taller de inmediato para desarmar e inspeccionar. "
                 "Indicar si evidencia falla visible. Asentar número de bomba y estado de cabezal y filtro."
             ),
-            "activity_phase": "SP03",
-            "activity_code": "SP24",
-            "activity_subcode": "253",
-            "tiempo": ""
-        })
+        ))
         # 6) DESARMA HERRAMIENTA
-        program.append({
-            "manobra_normalizada": "DESARMA HERRAMIENTA",
-            "punto_programa": 29,
-            "descripcion": "Desarmar herramienta.",
-            "activity_phase": "SP03",
-            "activity_code": "SP25",
-            "activity_subcode": "229",
-            "tiempo": ""
-        })
+        program.append(paso("DESARMA HERRAMIENTA", 29))
         return program
 
     # 5.b) L.2: SACA TUBING EN SIMPLE o EN DOBLE
@@ -144,20 +94,15 @@ def sacada_tubing(df: DataFrame) -> list:
     design_simple = build_design(tubing_rows)
 
     # elegir primer tipo según aparición
-    first_type = None
-    for com in tubing_rows["COMENTARIO"].str.upper():
-        if "DOBLE" in com:
-            first_type = "DOBLE"
-            break
-        if "SIMPLE" in com:
-            first_type = "SIMPLE"
-            break
-    first_type = first_type or "SIMPLE"
-
-    program.append({
-        "manobra_normalizada": f"SACA TUBING EN {first_type}",
-        "punto_programa": 20,
-        "descripcion": (
+    saca = ds.mascara("tubing_actual", "comentario", "SACA")
+    first_type = primera_coincidencia([
+        (saca & ds.mascara("tubing_actual", "comentario", "DOBLE"), "DOBLE"),
+        (saca & ds.mascara("tubing_actual", "comentario", "SIMPLE"), "SIMPLE"),
+    ], defecto="SIMPLE")
+
+    program.append(paso(
+        f"SACA TUBING EN {first_type}", 20,
+        (
             f"{anchor_prefix}"
             "Desplazar por directa para sacar sarta limpia. "
             f"Sacar sarta en tiro {first_type}, buscando pérdida y completando pozo. "
@@ -167,21 +112,9 @@ def sacada_tubing(df: DataFrame) -> list:
             "Registrar evidencia fotográfica del estado del material. "
             "Asentar en OW grado de acero del material extraído."
         ),
-        "activity_phase": "SP03",
-        "activity_code": "SP24",
-        "activity_subcode": "253",
-        "tiempo": ""
-    })
+    ))
 
     # 6) DESARMA HERRAMIENTA
-    program.append({
-        "manobra_normalizada": "DESARMA HERRAMIENTA",
-        "punto_programa": 29,
-        "descripcion": "Desarmar herramienta.",
-        "activity_phase": "SP03",
-        "activity_code": "SP25",
-        "activity_subcode": "229",
-        "tiempo": ""
-    })
+    program.append(paso("DESARMA HERRAMIENTA", 29))
 
     return program
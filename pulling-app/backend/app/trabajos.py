@@ -0,0 +1,330 @@
+# pulling-app/backend/app/trabajos.py
+
+import json
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from . import arranque, config
+from .cache import cache
+
+# Estados de un trabajo
+PENDIENTE = "pendiente"
+EN_CURSO = "en_curso"
+TERMINADO = "terminado"
+FALLIDO = "fallido"
+FINALES = (TERMINADO, FALLIDO)
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS trabajos (
+    id          TEXT PRIMARY KEY,
+    estado      TEXT NOT NULL,
+    creado      REAL NOT NULL,
+    actualizado REAL NOT NULL,
+    intentos    INTEGER NOT NULL DEFAULT 0,
+    total       INTEGER NOT NULL,
+    hechos      INTEGER NOT NULL DEFAULT 0,
+    errores     INTEGER NOT NULL DEFAULT 0,
+    error       TEXT
+);
+CREATE INDEX IF NOT EXISTS trabajos_estado ON trabajos (estado, creado);
+CREATE TABLE IF NOT EXISTS archivos (
+    trabajo   TEXT NOT NULL,
+    orden     INTEGER NOT NULL,
+    nombre    TEXT NOT NULL,
+    contenido BLOB,              -- NULL una vez procesado
+    error     TEXT,              -- error al expandir el upload (no se procesa)
+    ok        INTEGER,           -- NULL = pendiente
+    resultado BLOB,              -- JSON del resultado (ok) o mensaje de error
+    PRIMARY KEY (trabajo, orden)
+);
+"""
+
+
+class ColaTrabajos:
+    """
+    Cola persistente en SQLite (un archivo local, sin broker): cada trabajo
+    guarda sus archivos de entrada y el resultado de cada uno a medida que
+    termina. El worker que toma un trabajo lo mantiene con latidos; uno que
+    quedó en curso sin novedades por JOBS_LEASE_SEG (proceso reiniciado o
+    caído) lo retoma cualquier worker, desde los archivos que faltaban.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._local = threading.local()
+        self._hay_trabajo = threading.Event()
+        with self._conexion() as con:
+            con.executescript(_ESQUEMA)
+        self.recuperados = 0
+        self.agotados = 0
+
+    def _conexion(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    # --- Productor ---
+    def encolar(self, archivos: list) -> str:
+        """Guarda un trabajo con sus (nombre, bytes | error str) y devuelve su id."""
+        id = uuid.uuid4().hex
+        ahora = time.time()
+        con = self._conexion()
+        with con:
+            con.execute("BEGIN IMMEDIATE")
+            con.execute(
+                "INSERT INTO trabajos (id, estado, creado, actualizado, total) VALUES (?, ?, ?, ?, ?)",
+                (id, PENDIENTE, ahora, ahora, len(archivos)),
+            )
+            con.executemany(
+                "INSERT INTO archivos (trabajo, orden, nombre, contenido, error) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (id, i, nombre, None if isinstance(datos, str) else datos,
+                     datos if isinstance(datos, str) else None)
+                    for i, (nombre, datos) in enumerate(archivos)
+                ],
+            )
+        self._hay_trabajo.set()
+        self.purgar()
+        return id
+
+    def purgar(self) -> int:
+        """Borra los trabajos terminados hace más de JOBS_TTL_SEG."""
+        limite = time.time() - config.JOBS_TTL_SEG
+        con = self._conexion()
+        with con:
+            con.execute("BEGIN IMMEDIATE")
+            viejos = [r[0] for r in con.execute(
+                "SELECT id FROM trabajos WHERE estado IN (?, ?) AND actualizado < ?", (*FINALES, limite))]
+            con.executemany("DELETE FROM archivos WHERE trabajo = ?", [(v,) for v in viejos])
+            con.executemany("DELETE FROM trabajos WHERE id = ?", [(v,) for v in viejos])
+        return len(viejos)
+
+    # --- Consumidor ---
+    def tomar(self, espera: float = 1.0):
+        """
+        Toma el trabajo pendiente más viejo (o uno en curso abandonado: sin
+        novedades hace JOBS_LEASE_SEG) y lo marca en curso, atómico entre
+        workers y procesos. Uno que ya se tomó JOBS_MAX_INTENTOS veces sin
+        terminar queda fallido. None si no hay ninguno después de `espera` seg.
+        """
+        for intento in range(2):
+            con = self._conexion()
+            with con:
+                con.execute("BEGIN IMMEDIATE")
+                ahora = time.time()
+                for id, estado, intentos in con.execute(
+                    "SELECT id, estado, intentos FROM trabajos "
+                    "WHERE estado = ? OR (estado = ? AND actualizado < ?) ORDER BY creado",
+                    (PENDIENTE, EN_CURSO, ahora - config.JOBS_LEASE_SEG),
+                ).fetchall():
+                    if intentos >= config.JOBS_MAX_INTENTOS:
+                        con.execute(
+                            "UPDATE trabajos SET estado = ?, error = ?, actualizado = ? WHERE id = ?",
+                            (FALLIDO, f"Se interrumpió {intentos} veces sin terminar; no se reintenta.", ahora, id),
+                        )
+                        self.agotados += 1
+                        print(f"Cola de trabajos: {id} agotó sus {intentos} intentos.", file=sys.stderr)
+                        continue
+                    con.execute(
+                        "UPDATE trabajos SET estado = ?, intentos = intentos + 1, actualizado = ? WHERE id = ?",
+                        (EN_CURSO, ahora, id),
+                    )
+                    if estado == EN_CURSO:
+                        self.recuperados += 1
+                        print(f"Cola de trabajos: {id} estaba abandonado, se retoma.", file=sys.stderr)
+                    return id
+            if intento == 0:
+                self._hay_trabajo.wait(espera)
+                self._hay_trabajo.clear()
+        return None
+
+    def latido(self, id: str) -> None:
+        """Renueva el lease del trabajo en curso mientras un archivo tarda."""
+        self._conexion().execute(
+            "UPDATE trabajos SET actualizado = ? WHERE id = ? AND estado = ?", (time.time(), id, EN_CURSO))
+
+    def pendientes_de(self, id: str) -> list:
+        """Archivos del trabajo que todavía no tienen resultado: [(orden, nombre, bytes | error)]."""
+        filas = self._conexion().execute(
+            "SELECT orden, nombre, contenido, error FROM archivos WHERE trabajo = ? AND ok IS NULL ORDER BY orden",
+            (id,),
+        ).fetchall()
+        return [(orden, nombre, error if error is not None else contenido) for orden, nombre, contenido, error in filas]
+
+    def guardar_resultado(self, id: str, orden: int, ok: bool, resultado: bytes) -> None:
+        """Guarda el resultado de un archivo; si ya tenía uno (trabajo retomado) no cuenta dos veces."""
+        con = self._conexion()
+        with con:
+            con.execute("BEGIN IMMEDIATE")
+            nuevo = con.execute(
+                "UPDATE archivos SET ok = ?, resultado = ?, contenido = NULL "
+                "WHERE trabajo = ? AND orden = ? AND ok IS NULL",
+                (int(ok), resultado, id, orden),
+            ).rowcount
+            if not nuevo:
+                return
+            con.execute(
+                "UPDATE trabajos SET hechos = hechos + 1, errores = errores + ?, actualizado = ? WHERE id = ?",
+                (int(not ok), time.time(), id),
+            )
+
+    def terminar(self, id: str, error: str = None) -> None:
+        con = self._conexion()
+        con.execute(
+            "UPDATE trabajos SET estado = ?, error = ?, actualizado = ? WHERE id = ?",
+            (FALLIDO if error else TERMINADO, error, time.time(), id),
+        )
+
+    # --- Consulta ---
+    def estado(self, id: str):
+        """Estado y progreso del trabajo (dict), o None si no existe."""
+        fila = self._conexion().execute(
+            "SELECT id, estado, creado, actualizado, intentos, total, hechos, errores, error "
+            "FROM trabajos WHERE id = ?", (id,),
+        ).fetchone()
+        if fila is None:
+            return None
+        id, estado, creado, actualizado, intentos, total, hechos, errores, error = fila
+        return {
+            "id": id, "estado": estado, "total": total, "hechos": hechos, "errores": errores,
+            "intentos": intentos, "error": error,
+            "creado": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(creado)),
+            "segundos": round((actualizado if estado in FINALES else time.time()) - creado, 3),
+        }
+
+    def resultados(self, id: str) -> list:
+        """[(archivo, ok, bytes)] de los archivos ya procesados, en orden de entrada."""
+        return [
+            (nombre, bool(ok), resultado)
+            for nombre, ok, resultado in self._conexion().execute(
+                "SELECT nombre, ok, resultado FROM archivos WHERE trabajo = ? AND ok IS NOT NULL ORDER BY orden",
+                (id,),
+            )
+        ]
+
+    def stats(self) -> dict:
+        conteo = dict(self._conexion().execute("SELECT estado, count(*) FROM trabajos GROUP BY estado"))
+        return {
+            "db": self.ruta,
+            "recuperados": self.recuperados,
+            "agotados": self.agotados,
+            **{e: conteo.get(e, 0) for e in (PENDIENTE, EN_CURSO, TERMINADO, FALLIDO)},
+        }
+
+
+def cuerpo_estado(cola: ColaTrabajos, id: str):
+    """
+    JSON (bytes) de GET /jobs/{id}: estado, progreso y los resultados ya
+    disponibles; los resultados serializados se insertan sin re-codificar.
+    None si el trabajo no existe.
+    """
+    estado = cola.estado(id)
+    if estado is None:
+        return None
+    partes = []
+    for archivo, ok, resultado in cola.resultados(id):
+        cabecera = json.dumps({"archivo": archivo, "ok": ok}, ensure_ascii=False).encode("utf-8")
+        if ok:
+            partes.append(cabecera[:-1] + b', "resultado": ' + resultado + b"}")
+        else:
+            error = json.dumps(resultado.decode("utf-8"), ensure_ascii=False).encode("utf-8")
+            partes.append(cabecera[:-1] + b', "error": ' + error + b"}")
+    cabecera = json.dumps(estado, ensure_ascii=False).encode("utf-8")
+    return cabecera[:-1] + b', "resultados": [' + b", ".join(partes) + b"]}"
+
+
+# --- Workers ---
+
+def _procesar(cola: ColaTrabajos, id: str) -> None:
+    """
+    Procesa los archivos pendientes del trabajo en el pool de procesos del
+    lote (a lo sumo BATCH_WORKERS a la vez) y guarda cada resultado apenas
+    termina, así el progreso sobrevive un reinicio.
+    """
+    batch = arranque.cargar("app.batch", "jobs")
+    en_vuelo = {}   # futuro → (orden, nombre, clave, pool)
+    pendientes = iter(cola.pendientes_de(id))
+    agotado = False
+    while True:
+        while not agotado and len(en_vuelo) < config.BATCH_WORKERS:
+            siguiente = next(pendientes, None)
+            if siguiente is None:
+                agotado = True
+                break
+            orden, nombre, datos = siguiente
+            if isinstance(datos, str):
+                cola.guardar_resultado(id, orden, False, datos.encode("utf-8"))
+                continue
+            sha, clave, cuerpo = batch.buscar_en_cache(nombre, datos)
+            if cuerpo is not None:
+                cola.guardar_resultado(id, orden, True, cuerpo)
+                continue
+            pool, fut = batch.enviar(nombre, datos, sha)
+            en_vuelo[fut] = (orden, nombre, clave, pool)
+        if not en_vuelo:
+            break
+        listos, _ = wait(en_vuelo, timeout=config.JOBS_LEASE_SEG / 3, return_when=FIRST_COMPLETED)
+        if not listos:
+            cola.latido(id)
+        for fut in listos:
+            orden, nombre, clave, pool = en_vuelo.pop(fut)
+            try:
+                r = fut.result()
+            except BrokenProcessPool:
+                # Murió un worker: error para este archivo y pool nuevo para el resto
+                batch.reiniciar_pool(pool)
+                r = batch.resultado_caido(nombre)
+            if r["ok"]:
+                cache.put(clave, r["cuerpo"])
+                cola.guardar_resultado(id, orden, True, r["cuerpo"])
+            else:
+                cola.guardar_resultado(id, orden, False, r["error"].encode("utf-8"))
+
+
+class Workers:
+    """Threads que toman trabajos de la cola; cada uno procesa un trabajo a la vez."""
+
+    def __init__(self, cola: ColaTrabajos, cantidad: int):
+        self.cola = cola
+        self.cantidad = cantidad
+        self._detener = threading.Event()
+        self._threads = []
+
+    def iniciar(self) -> None:
+        for i in range(self.cantidad):
+            t = threading.Thread(target=self._bucle, name=f"jobs-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def detener(self) -> None:
+        self._detener.set()
+        self.cola._hay_trabajo.set()
+
+    def _bucle(self) -> None:
+        while not self._detener.is_set():
+            id = self.cola.tomar()
+            if id is None:
+                continue
+            try:
+                _procesar(self.cola, id)
+                self.cola.terminar(id)
+            except Exception as e:
+                if self._detener.is_set():
+                    return   # apagado: el trabajo queda en curso y se retoma al vencer su lease
+                print(f"ERROR en el trabajo {id}:", file=sys.stderr)
+                traceback.print_exc(file=sys.stderr)
+                self.cola.terminar(id, f"Error inesperado: {e}")
+
+
+cola = ColaTrabajos(config.JOBS_DB)
+workers = Workers(cola, config.JOBS_WORKERS)
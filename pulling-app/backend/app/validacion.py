@@ -0,0 +1,229 @@
+# pulling-app/backend/app/validacion.py
+
+import io
+import re
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+from posixpath import join, normpath
+
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+from . import config
+from .datasheet import HOJA, META_POS, TABLAS
+from .metricas import etapa
+from .plantillas import VENTANA_DETECCION, normalizar
+
+NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# Firma de los .xls (Excel 97-2003, formato binario OLE2)
+FIRMA_XLS = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+# Celdas del template que se revisan (fila, columna 1-based → texto esperado):
+# la etiqueta POZO y el encabezado ELEMENTO de cada tabla (fila previa al bloque)
+ENCABEZADOS = {
+    (META_POS["POZO"][0] + 1, META_POS["POZO"][1]): "POZO",
+    **{(r0, c0 + 1): cols[0] for r0, _, c0, _, cols in TABLAS.values()},
+}
+_ULTIMA_FILA = max(f for f, _ in ENCABEZADOS)
+
+_REF = re.compile(r"([A-Z]+)(\d+)")
+
+
+class EstructuraInvalida(ValueError):
+    """El archivo no tiene la estructura del datasheet; `errores` los lista todos."""
+
+    def __init__(self, errores: list):
+        super().__init__("; ".join(errores))
+        self.errores = errores
+
+
+def _ruta_hoja(zf: zipfile.ZipFile, rid: str):
+    """Ruta dentro del ZIP de la hoja con relación `rid` en workbook.xml.rels."""
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels.iter(f"{NS_PKG}Relationship"):
+        if rel.get("Id") == rid:
+            destino = rel.get("Target")
+            return destino.lstrip("/") if destino.startswith("/") else normpath(join("xl", destino))
+    return None
+
+
+def _celdas_encabezado(zf: zipfile.ZipFile, ruta: str, ultima_fila: int = _ULTIMA_FILA,
+                       posiciones=ENCABEZADOS) -> dict:
+    """
+    Lee la hoja en streaming hasta `ultima_fila` y devuelve
+    {(fila, col): (tipo, valor)} de las celdas en `posiciones` (todas las
+    que tienen valor si es None), sin cargar el resto.
+    """
+    celdas = {}
+    fila = 0
+    with zf.open(ruta) as f:
+        for evento, elem in ET.iterparse(f, events=("start", "end")):
+            if evento == "start" and elem.tag == f"{NS}row":
+                fila = int(elem.get("r") or fila + 1)
+                col = 0
+                if fila > ultima_fila:
+                    break
+            elif evento == "end" and elem.tag == f"{NS}c":
+                m = _REF.match(elem.get("r") or "")
+                col = column_index_from_string(m.group(1)) if m else col + 1
+                if posiciones is None or (fila, col) in posiciones:
+                    if elem.get("t") == "inlineStr":
+                        valor = "".join(t.text or "" for t in elem.iter(f"{NS}t"))
+                    else:
+                        v = elem.find(f"{NS}v")
+                        valor = v.text if v is not None else None
+                    if valor is not None:
+                        celdas[(fila, col)] = (elem.get("t"), valor)
+            elif evento == "end" and elem.tag == f"{NS}row":
+                elem.clear()
+    return celdas
+
+
+def _textos_compartidos(zf: zipfile.ZipFile, indices: set) -> dict:
+    """Solo los shared strings pedidos (corta al llegar al mayor índice)."""
+    textos = {}
+    if not indices or "xl/sharedStrings.xml" not in zf.NameToInfo:
+        return textos
+    ultimo = max(indices)
+    with zf.open("xl/sharedStrings.xml") as f:
+        i = 0
+        for _, elem in ET.iterparse(f):
+            if elem.tag == f"{NS}si":
+                if i in indices:
+                    textos[i] = "".join(t.text or "" for t in elem.iter(f"{NS}t"))
+                elem.clear()
+                i += 1
+                if i > ultimo:
+                    break
+    return textos
+
+
+def _textos(zf: zipfile.ZipFile, celdas: dict) -> dict:
+    """{(fila, col): texto normalizado} resolviendo los shared strings."""
+    compartidos = _textos_compartidos(zf, {
+        int(v) for t, v in celdas.values() if t == "s" and v and v.isdigit()
+    })
+    textos = {}
+    for pos, (tipo, valor) in celdas.items():
+        if tipo == "s" and valor and valor.isdigit():
+            valor = compartidos.get(int(valor))
+        textos[pos] = normalizar(valor)
+    return textos
+
+
+def _distintos(zf: zipfile.ZipFile, celdas: dict) -> list:
+    """Celdas de ENCABEZADOS que no dicen lo esperado."""
+    textos = _textos(zf, celdas)
+    return [
+        f"{get_column_letter(col)}{fila} debería decir '{esperado}' (dice '{textos.get((fila, col), '')}')"
+        for (fila, col), esperado in ENCABEZADOS.items()
+        if not textos.get((fila, col), "").startswith(normalizar(esperado))
+    ]
+
+
+def validar_estructura(fuente) -> dict:
+    """
+    Revisión rápida del libro sin abrirlo con openpyxl: directorio del ZIP,
+    xl/workbook.xml (hojas), tamaño del XML de 'Data Sheet', macros y las
+    celdas de encabezado del template. Devuelve un reporte con todos los
+    problemas encontrados ("errores" impiden procesar, "advertencias" no).
+    """
+    t0 = time.perf_counter()
+    if isinstance(fuente, (bytes, bytearray, memoryview)):
+        fuente = io.BytesIO(fuente)
+    errores, advertencias = [], []
+    reporte = {"valido": False, "errores": errores, "advertencias": advertencias,
+               "hojas": [], "macros": None, "hoja_bytes": None}
+
+    def terminar():
+        reporte["valido"] = not errores
+        reporte["duracion_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        return reporte
+
+    # 1) Contenedor: .xls binario o ZIP válido
+    fuente.seek(0)
+    if fuente.read(len(FIRMA_XLS)) == FIRMA_XLS:
+        errores.append("Formato .xls (Excel 97-2003) no soportado: guardar como .xlsx o .xlsm.")
+        return terminar()
+    fuente.seek(0)
+    try:
+        zf = zipfile.ZipFile(fuente)
+    except zipfile.BadZipFile:
+        errores.append("El archivo no es un Excel válido (.xlsx/.xlsm): no es un ZIP.")
+        return terminar()
+
+    try:
+        with zf:
+            nombres = zf.NameToInfo
+            faltan = [n for n in ("[Content_Types].xml", "xl/workbook.xml", "xl/_rels/workbook.xml.rels")
+                      if n not in nombres]
+            if faltan:
+                errores.append(f"Libro incompleto: faltan {', '.join(faltan)}.")
+                return terminar()
+            reporte["macros"] = "xl/vbaProject.bin" in nombres
+
+            # 2) Hojas del libro
+            libro = ET.fromstring(zf.read("xl/workbook.xml"))
+            hojas = {h.get("name"): h.get(f"{NS_REL}id") for h in libro.iter(f"{NS}sheet")}
+            reporte["hojas"] = list(hojas)
+            if HOJA not in hojas:
+                errores.append(
+                    f"No encontré la pestaña '{HOJA}' en el Excel "
+                    f"(hojas: {', '.join(hojas) or 'ninguna'})."
+                )
+                return terminar()
+
+            ruta = _ruta_hoja(zf, hojas[HOJA])
+            if ruta is None or ruta not in nombres:
+                errores.append(f"La pestaña '{HOJA}' no tiene contenido en el archivo.")
+                return terminar()
+
+            # 3) Tamaño del XML de la hoja (descomprimido)
+            reporte["hoja_bytes"] = nombres[ruta].file_size
+            if nombres[ruta].file_size > config.HOJA_MAX_BYTES:
+                errores.append(
+                    f"La pestaña '{HOJA}' es demasiado grande "
+                    f"({nombres[ruta].file_size // 1024 ** 2} MB descomprimida)."
+                )
+                return terminar()
+
+            # 4) Celdas de encabezado del template en su lugar fijo
+            celdas = _celdas_encabezado(zf, ruta)
+            distintos = _distintos(zf, celdas)
+
+            # 5) Si no está ninguna, buscar las etiquetas en toda la ventana de
+            #    detección (template con otro layout, ver app/plantillas.py)
+            reubicado = False
+            if len(distintos) == len(ENCABEZADOS):
+                textos = _textos(zf, _celdas_encabezado(zf, ruta, VENTANA_DETECCION[0], None)).values()
+                reubicado = (
+                    sum(t == "ELEMENTO" for t in textos) >= len(TABLAS)
+                    and any(t.startswith("POZO") for t in textos)
+                )
+    except (ET.ParseError, KeyError, zipfile.BadZipFile, OSError, ValueError) as e:
+        errores.append(f"Libro dañado: {e}")
+        return terminar()
+
+    if reubicado:
+        advertencias.append(
+            f"La pestaña '{HOJA}' tiene los encabezados en otra posición; "
+            "se ubican por etiqueta."
+        )
+    elif len(distintos) == len(ENCABEZADOS):
+        errores.append(f"La pestaña '{HOJA}' no tiene el formato del datasheet: " + "; ".join(distintos))
+    elif distintos:
+        advertencias.extend(distintos)
+    return terminar()
+
+
+def verificar(fuente) -> None:
+    """Lanza EstructuraInvalida con todos los errores si el libro no pasa la revisión."""
+    with etapa("preflight"):
+        reporte = validar_estructura(fuente)
+    if hasattr(fuente, "seek"):
+        fuente.seek(0)
+    if not reporte["valido"]:
+        raise EstructuraInvalida(reporte["errores"])
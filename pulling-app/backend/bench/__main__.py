@@ -0,0 +1,97 @@
+# pulling-app/backend/bench/__main__.py
+"""
+Benchmark de /process/ por etapas sobre datasheets sintéticos.
+
+Uso (desde pulling-app/backend):
+    python -m bench                          # medir e imprimir
+    python -m bench --guardar bench/baseline.json
+    python -m bench --comparar bench/baseline.json [--umbral 0.25]
+    python -m bench --generar /tmp/corpus    # solo escribir los .xlsx/.xlsm
+"""
+
+import argparse
+import json
+import platform
+import sys
+import warnings
+from pathlib import Path
+
+from .etapas import Caso, comparar, etapas, medir
+from .generador import corpus
+
+
+def _argumentos(argv=None):
+    p = argparse.ArgumentParser(prog="python -m bench", description=__doc__,
+                                formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--casos", type=int, default=12, help="datasheets sintéticos a generar")
+    p.add_argument("--repeticiones", type=int, default=20, help="corridas por caso y etapa")
+    p.add_argument("--semilla", type=int, default=0)
+    p.add_argument("--etapa", action="append", help="medir solo estas etapas (repetible)")
+    p.add_argument("--guardar", metavar="JSON", help="escribir el resultado como baseline")
+    p.add_argument("--comparar", metavar="JSON", help="comparar contra un baseline")
+    p.add_argument("--umbral", type=float, default=0.25,
+                   help="regresión tolerada en p50/p95 (0.25 = +25%%)")
+    p.add_argument("--umbral-memoria", type=float, default=0.10,
+                   help="regresión tolerada en pico de memoria")
+    p.add_argument("--generar", metavar="DIR", help="escribir el corpus en DIR y salir")
+    return p.parse_args(argv)
+
+
+def _imprimir(resultado: dict):
+    print(f"{'etapa':<26}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'pico KiB':>11}")
+    for nombre, m in resultado["etapas"].items():
+        if m is None:
+            print(f"{nombre:<26}{'—':>6}")
+            continue
+        print(f"{nombre:<26}{m['n']:>6}{m['p50_ms']:>10.3f}{m['p95_ms']:>10.3f}"
+              f"{m['p99_ms']:>10.3f}{m['pico_kib']:>11.1f}")
+
+
+def main(argv=None) -> int:
+    args = _argumentos(argv)
+    warnings.filterwarnings("ignore")
+
+    # 1) Corpus sintético
+    archivos = corpus(args.casos, args.semilla)
+    if args.generar:
+        destino = Path(args.generar)
+        destino.mkdir(parents=True, exist_ok=True)
+        for nombre, data in archivos:
+            (destino / nombre).write_bytes(data)
+        print(f"{len(archivos)} datasheets en {destino}")
+        return 0
+    casos = [Caso(nombre, data) for nombre, data in archivos]
+
+    # 2) Medir cada etapa
+    seleccion = [e for e in etapas() if not args.etapa or e.nombre in args.etapa]
+    resultado = {
+        "entorno": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "casos": args.casos,
+            "repeticiones": args.repeticiones,
+            "semilla": args.semilla,
+        },
+        "etapas": {e.nombre: medir(e, casos, args.repeticiones) for e in seleccion},
+    }
+    _imprimir(resultado)
+
+    # 3) Guardar baseline y/o comparar
+    if args.guardar:
+        Path(args.guardar).write_text(json.dumps(resultado, indent=2, ensure_ascii=False) + "\n")
+        print(f"\nBaseline guardado en {args.guardar}")
+
+    if args.comparar:
+        base = json.loads(Path(args.comparar).read_text())
+        regresiones = comparar(resultado, base, args.umbral, args.umbral_memoria)
+        if regresiones:
+            print(f"\nREGRESIONES contra {args.comparar}:")
+            for nombre, metrica, antes, ahora, variacion in regresiones:
+                print(f"  {nombre:<24}{metrica:<10}{antes:>10.3f} → {ahora:>10.3f}  (+{variacion:.0%})")
+            return 1
+        print(f"\nSin regresiones contra {args.comparar}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+# pulling-app/backend/bench/etapas.py
+
+import io
+import time
+import tracemalloc
+from typing import Callable, NamedTuple
+
+import numpy as np
+from openpyxl import load_workbook
+
+from app.datasheet import cortar, leer_celdas, read_datasheet, ubicar
+from app.processing import a_json, procesar_excel
+from app.rules.modelo import WellDatasheet
+from app.rules.pipeline import PLAN
+
+
+class Etapa(NamedTuple):
+    """
+    Etapa medible:
+    – preparar: caso → argumentos (fuera de la medición, una vez por repetición)
+    – correr:   función medida
+    – aplica:   caso → bool (p. ej. reglas que no se activan para ese caso)
+    """
+    nombre: str
+    preparar: Callable
+    correr: Callable
+    aplica: Callable = lambda caso: True
+
+
+class Caso:
+    """Datasheet sintético con sus resultados intermedios ya calculados."""
+
+    def __init__(self, nombre: str, data: bytes):
+        self.nombre = nombre
+        self.data = data
+        self.celdas = leer_celdas(data)
+        self.datos = read_datasheet(data)
+        self.resultado = procesar_excel(data)
+        self.activas = {r.nombre for r in PLAN.activas(self.ds())}
+
+    def ds(self) -> WellDatasheet:
+        """Datasheet nuevo (sin máscaras cacheadas)."""
+        return WellDatasheet.desde_datos(self.datos)
+
+    def ds_listo(self) -> WellDatasheet:
+        """Datasheet con las búsquedas del plan ya precalculadas."""
+        ds = self.ds()
+        ds.precalcular(PLAN.mascaras)
+        return ds
+
+
+def _abrir(data: bytes):
+    wb = load_workbook(io.BytesIO(data), read_only=True, data_only=True, keep_links=False)
+    wb.close()
+
+
+def _cortar(celdas: list):
+    layout, celdas = ubicar(celdas)
+    return cortar(celdas, layout)
+
+
+def _etapa_regla(regla) -> Etapa:
+    return Etapa(
+        f"regla:{regla.nombre}",
+        preparar=lambda caso: (caso.ds_listo(),),
+        correr=regla.construir,
+        aplica=lambda caso: regla.nombre in caso.activas,
+    )
+
+
+def etapas() -> list:
+    """Etapas del procesamiento de /process/, de la apertura del libro a la respuesta."""
+    return [
+        Etapa("abrir_libro", lambda caso: (caso.data,), _abrir),
+        Etapa("leer_hoja", lambda caso: (caso.data,), leer_celdas),
+        Etapa("cortar_tablas", lambda caso: (caso.celdas,), _cortar),
+        Etapa("modelo", lambda caso: (caso.datos,), WellDatasheet.desde_datos),
+        Etapa("plan_activas", lambda caso: (caso.ds(),), PLAN.activas),
+        *(_etapa_regla(r) for r in PLAN.reglas),
+        Etapa("serializar", lambda caso: (caso.resultado,), a_json),
+        Etapa("process", lambda caso: (caso.data,), lambda data: a_json(procesar_excel(data))),
+    ]
+
+
+def medir(etapa: Etapa, casos: list, repeticiones: int) -> dict:
+    """
+    Corre la etapa `repeticiones` veces por caso y devuelve percentiles
+    de latencia (ms) y el pico de memoria (KiB) de una corrida trazada.
+    None si la etapa no aplica a ningún caso.
+    """
+    tiempos = []
+    pico = 0
+    for caso in casos:
+        if not etapa.aplica(caso):
+            continue
+        for _ in range(repeticiones):
+            args = etapa.preparar(caso)
+            t0 = time.perf_counter()
+            etapa.correr(*args)
+            tiempos.append(time.perf_counter() - t0)
+
+        # Memoria en una corrida aparte: tracemalloc distorsiona los tiempos
+        args = etapa.preparar(caso)
+        tracemalloc.start()
+        try:
+            etapa.correr(*args)
+            pico = max(pico, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+    if not tiempos:
+        return None
+    p50, p95, p99 = np.percentile(np.array(tiempos) * 1000, [50, 95, 99])
+    return {
+        "n": len(tiempos),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "pico_kib": round(pico / 1024, 1),
+    }
+
+
+def comparar(actual: dict, base: dict, umbral: float, umbral_mem: float) -> list:
+    """
+    Regresiones de `actual` contra `base` (ambos {"etapas": {...}}):
+    p50/p95 más de `umbral` por encima, o pico de memoria más de `umbral_mem`.
+    Devuelve [(etapa, métrica, base, actual, variación)].
+    """
+    regresiones = []
+    for nombre, m in actual["etapas"].items():
+        b = base["etapas"].get(nombre)
+        if not b or not m:
+            continue
+        for metrica, limite in (("p50_ms", umbral), ("p95_ms", umbral), ("pico_kib", umbral_mem)):
+            if b[metrica] <= 0:
+                continue
+            variacion = m[metrica] / b[metrica] - 1
+            if variacion > limite:
+                regresiones.append((nombre, metrica, b[metrica], m[metrica], variacion))
+    return regresiones
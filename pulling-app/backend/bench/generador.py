@@ -0,0 +1,212 @@
+# pulling-app/backend/bench/generador.py
+
+import io
+import random
+import zipfile
+from typing import NamedTuple
+
+from openpyxl import Workbook
+
+from app.datasheet import ETIQUETAS, HOJA, META_POS, TABLAS
+
+# Filas de datos disponibles por bloque (la fila anterior es el encabezado)
+MAX_FILAS_TUBING = TABLAS["tubing_actual"][1] - TABLAS["tubing_actual"][0]
+MAX_FILAS_VARILLAS = TABLAS["varillas_actual"][1] - TABLAS["varillas_actual"][0]
+
+DIAMETROS_TUBING = (2.375, 2.875, 3.5)
+DIAMETROS_VARILLA = (0.75, 0.875, 1.0)
+
+XLSM_CONTENT_TYPE = b"application/vnd.ms-excel.sheet.macroEnabled.main+xml"
+XLSX_CONTENT_TYPE = b"application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"
+
+
+class Variante(NamedTuple):
+    """Parámetros de un datasheet sintético."""
+    filas_tubing: int = 3
+    filas_varillas: int = 3
+    pesca: bool = False
+    desagotando: bool = False
+    on_off: bool = False
+    shear_out: bool = False
+    formato: str = "xlsx"
+
+    @property
+    def nombre(self) -> str:
+        flags = [f for f in ("pesca", "desagotando", "on_off", "shear_out") if getattr(self, f)]
+        sufijo = "-".join(flags) or "normal"
+        return f"t{self.filas_tubing}-v{self.filas_varillas}-{sufijo}.{self.formato}"
+
+
+def _modo(rng: random.Random) -> str:
+    return rng.choice(("EN DOBLE", "EN SIMPLE"))
+
+
+def _tubing_actual(rng, v: Variante) -> list:
+    """ELEMENTO, DIÁMETRO, PROFUNDIDAD, CANTIDAD, COMENTARIO"""
+    diam = rng.choice(DIAMETROS_TUBING)
+    fijos = [("ANCLA", diam, None, 1, "SACA"), ("ZAPATO", diam, None, 1, "SACA")]
+    if v.on_off:
+        fijos.insert(0, ("ON-OFF", diam, None, 1, "SACA"))
+    n_tubing = max(1, v.filas_tubing - len(fijos))
+    filas = [
+        ("TUBING", diam, None, rng.randint(20, 180), f"SACA {_modo(rng)}")
+        for _ in range(n_tubing)
+    ] + fijos
+    return _con_profundidad(filas[:v.filas_tubing], rng)
+
+
+def _tubing_final(rng, v: Variante) -> list:
+    """ELEMENTO, CONDICIÓN, DIÁMETRO, PROFUNDIDAD, CANTIDAD, COMENTARIO, LONGITUD ELEMENTO"""
+    diam = rng.choice(DIAMETROS_TUBING)
+    modo = _modo(rng)
+    fijos = [("ANCLA", "USADO", diam, None, 1, "BAJA", 0.8)]
+    if v.shear_out:
+        fijos.append(("SHEAR OUT", "NUEVO", diam, None, 1, "BAJA", 0.3))
+    n_tubing = max(1, v.filas_tubing - len(fijos))
+    filas = [
+        ("TUBING", rng.choice(("NUEVO", "USADO")), diam, None,
+         rng.randint(20, 180), f"BAJA {modo}", 9.6)
+        for _ in range(n_tubing)
+    ] + fijos
+    return _con_profundidad(filas[:v.filas_tubing], rng, col=3)
+
+
+def _varillas_actual(rng, v: Variante) -> list:
+    """ELEMENTO, DIÁMETRO, PROFUNDIDAD, CANTIDAD, COMENTARIO"""
+    filas = [("VÁSTAGO", 1.5, 0, 1, "SACA EN SIMPLE")]
+    for _ in range(max(1, v.filas_varillas - 2)):
+        elemento = rng.choice(("VARILLA DE BOMBEO", "VARILLA DE BOMBEO", "TROZO VARILLA"))
+        filas.append((elemento, rng.choice(DIAMETROS_VARILLA), None,
+                      rng.randint(1, 150), f"SACA {_modo(rng)}"))
+    filas.append(("BOMBA CONVENCIONAL INSERTABLE BM", 1.75, None, 1, "SACA"))
+    return _con_profundidad(filas[:max(v.filas_varillas, 1)], rng)
+
+
+def _varillas_final(rng, v: Variante) -> list:
+    """ELEMENTO, CONDICIÓN, DIÁMETRO, PROFUNDIDAD, ACERO V/B, CUPLA SH/FS, ACERO CUPLA, CANTIDAD, COMENTARIO"""
+    modo = _modo(rng)
+    filas = [
+        ("VARILLA DE BOMBEO", "NUEVO", rng.choice(DIAMETROS_VARILLA), None,
+         "GRADO D", rng.choice(("SH", "FS")), "SM", rng.randint(1, 150), f"BAJA {modo}")
+        for _ in range(max(1, v.filas_varillas - 1))
+    ]
+    filas.append(("BOMBA CONVENCIONAL INSERTABLE BM", "NUEVO", 1.75, None,
+                  None, None, None, 1, "BAJA"))
+    return _con_profundidad(filas[:max(v.filas_varillas, 1)], rng, col=3)
+
+
+def _con_profundidad(filas: list, rng, col: int = 2) -> list:
+    """Completa la columna PROFUNDIDAD con valores crecientes."""
+    prof = rng.randint(300, 600)
+    salida = []
+    for fila in filas:
+        fila = list(fila)
+        if fila[col] is None:
+            prof += rng.randint(5, 200)
+            fila[col] = prof
+        salida.append(fila)
+    return salida
+
+
+def _a_xlsm(data: bytes) -> bytes:
+    """Reempaqueta un .xlsx como libro habilitado para macros (.xlsm)."""
+    origen = zipfile.ZipFile(io.BytesIO(data))
+    salida = io.BytesIO()
+    with zipfile.ZipFile(salida, "w", zipfile.ZIP_DEFLATED) as destino:
+        for item in origen.infolist():
+            contenido = origen.read(item.filename)
+            if item.filename == "[Content_Types].xml":
+                contenido = contenido.replace(XLSX_CONTENT_TYPE, XLSM_CONTENT_TYPE)
+            destino.writestr(item, contenido)
+    return salida.getvalue()
+
+
+def generar_datasheet(v: Variante, semilla: int = 0) -> bytes:
+    """
+    Arma un libro con la pestaña 'Data Sheet' en el layout que espera
+    app.datasheet (metadatos en D/E, tablas en sus bloques fijos) y lo
+    devuelve serializado como .xlsx o .xlsm.
+    """
+    rng = random.Random(semilla)
+    wb = Workbook()
+    ws = wb.active
+    ws.title = HOJA
+    # Una hoja extra, como los libros reales
+    wb.create_sheet("Resumen")["A1"] = "Generado para benchmark"
+
+    # 1) Metadatos
+    motivo = "Cambio de bomba BM" + (" Pesca de varilla" if v.pesca else "")
+    valores = {
+        "POZO": f"YPF.Nq.BENCH-{semilla}",
+        "BATERIA": f"BAT-{rng.randint(1, 20)}",
+        "EQUIPO": f"EQ-{rng.randint(1, 40)}",
+        "NETA_ASOCIADA": round(rng.uniform(1, 40), 1),
+        "DEFINICION": "BM",
+        "MANIOBRAS_MOTIVO": motivo,
+        "PRIORIDAD_PROGRAMA": rng.randint(1, 5),
+        "ANTECEDENTE_1": "Pozo con arena",
+        "ANTECEDENTE_2": rng.choice(("Corrosión", None)),
+        "REQ_ESP_1": "SACAR/BAJAR TUBING DESAGOTANDO" if v.desagotando else None,
+    }
+    for clave, (r, c) in META_POS.items():
+        if clave in ETIQUETAS:
+            ws.cell(r + 1, c, ETIQUETAS[clave])
+        if valores.get(clave) is not None:
+            ws.cell(r + 1, c + 1, valores[clave])
+
+    # 2) Tablas: encabezado en la fila previa al bloque, datos desde r0
+    generadores = {
+        "tubing_actual": _tubing_actual,
+        "tubing_final": _tubing_final,
+        "varillas_actual": _varillas_actual,
+        "varillas_final": _varillas_final,
+    }
+    for nombre, (r0, r1, c0, c1, cols) in TABLAS.items():
+        for j, col in enumerate(cols):
+            ws.cell(r0, c0 + 1 + j, col)
+        for i, fila in enumerate(generadores[nombre](rng, v)[:r1 - r0]):
+            for j, valor in enumerate(fila):
+                if valor is not None:
+                    ws.cell(r0 + 1 + i, c0 + 1 + j, valor)
+
+    # 3) Algo de contenido fuera de los rangos leídos
+    ws.cell(100, 2, "nota fuera de rango")
+
+    salida = io.BytesIO()
+    wb.save(salida)
+    data = salida.getvalue()
+    return _a_xlsm(data) if v.formato == "xlsm" else data
+
+
+def variantes(casos: int, semilla: int = 0) -> list:
+    """
+    Combinaciones reproducibles de tamaños, variantes y formatos.
+    Los primeros casos cubren siempre los extremos (tablas mínimas y llenas).
+    """
+    rng = random.Random(semilla)
+    fijas = [
+        Variante(1, 2),
+        Variante(MAX_FILAS_TUBING, MAX_FILAS_VARILLAS, formato="xlsm"),
+        Variante(6, 8, pesca=True, on_off=True),
+        Variante(10, 12, desagotando=True, shear_out=True, formato="xlsm"),
+    ]
+    lista = fijas[:casos]
+    while len(lista) < casos:
+        lista.append(Variante(
+            filas_tubing=rng.randint(1, MAX_FILAS_TUBING),
+            filas_varillas=rng.randint(2, MAX_FILAS_VARILLAS),
+            pesca=rng.random() < 0.3,
+            desagotando=rng.random() < 0.3,
+            on_off=rng.random() < 0.2,
+            shear_out=rng.random() < 0.3,
+            formato=rng.choice(("xlsx", "xlsm")),
+        ))
+    return lista
+
+
+def corpus(casos: int, semilla: int = 0) -> list:
+    """[(nombre, bytes)] de `casos` datasheets sintéticos."""
+    return [
+        (f"{i:03d}-{v.nombre}", generar_datasheet(v, semilla + i))
+        for i, v in enumerate(variantes(casos, semilla))
+    ]